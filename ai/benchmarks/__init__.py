@@ -0,0 +1 @@
+"""Synthetic input generators and a benchmark runner for the hot paths."""
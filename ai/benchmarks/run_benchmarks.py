@@ -0,0 +1,268 @@
+"""Benchmark the analyzer, healing and training hot paths.
+
+Synthetic Playwright JSON / JUnit XML reports, DOM snapshots and a trace archive
+are generated at the chosen scale (see `synthetic.py`), then each benchmark is
+timed over several repetitions and run once more under tracemalloc to record
+its peak Python memory. Results are written as JSON so runs can be compared
+between commits.
+
+Usage examples:
+  # Run every benchmark at the default (small) scale and print a table
+  python -m ai.benchmarks.run_benchmarks
+
+  # Larger inputs, save the results for later comparison
+  python -m ai.benchmarks.run_benchmarks --scale medium --output reports/bench/HEAD.json
+
+  # Compare against a previous run (ratio > 1 means slower than the baseline)
+  python -m ai.benchmarks.run_benchmarks --scale medium --compare reports/bench/main.json
+
+  # Only some benchmarks, with custom report size
+  python -m ai.benchmarks.run_benchmarks --only analyze_report get_error_stats --tests 5000 --stack-depth 20
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from . import synthetic
+
+SCALES: Dict[str, Dict[str, int]] = {
+    'tiny': {'tests': 20, 'retries': 1, 'errors_per_result': 1, 'stack_depth': 3, 'dom_elements': 100, 'trace_actions': 5},
+    'small': {'tests': 500, 'retries': 1, 'errors_per_result': 1, 'stack_depth': 5, 'dom_elements': 1000, 'trace_actions': 50},
+    'medium': {'tests': 5000, 'retries': 2, 'errors_per_result': 2, 'stack_depth': 10, 'dom_elements': 10000, 'trace_actions': 200},
+    'large': {'tests': 50000, 'retries': 2, 'errors_per_result': 2, 'stack_depth': 20, 'dom_elements': 50000, 'trace_actions': 500},
+}
+
+
+def _reset_caches() -> None:
+    """Clear process-wide caches so every repetition measures a cold run."""
+    from ai.healing import dom_document
+    from ai.healing import report_analyzer as ra
+
+    ra.message_cache.clear()
+    dom_document.clear_cache()
+
+
+def _prepare(workdir: str, params: Dict[str, int], seed: int) -> Dict[str, str]:
+    """Write the synthetic inputs into `workdir` and return their paths."""
+    report_args = {k: params[k] for k in ('tests', 'retries', 'errors_per_result', 'stack_depth')}
+    paths = {
+        'json': os.path.join(workdir, 'report.json'),
+        'junit': os.path.join(workdir, 'report.xml'),
+        'dom': os.path.join(workdir, 'dom.html'),
+        'trace': os.path.join(workdir, 'trace.zip'),
+        'playwright_trace': os.path.join(workdir, 'playwright-trace.zip'),
+    }
+    with open(paths['json'], 'w', encoding='utf-8') as f:
+        json.dump(synthetic.playwright_report(seed=seed, **report_args), f)
+    junit_args = dict(report_args)
+    del junit_args['retries']
+    with open(paths['junit'], 'w', encoding='utf-8') as f:
+        f.write(synthetic.junit_report(seed=seed, **junit_args))
+    html = synthetic.dom_snapshot(elements=params['dom_elements'], seed=seed)
+    with open(paths['dom'], 'w', encoding='utf-8') as f:
+        f.write(html)
+    synthetic.write_trace(paths['trace'], html, selector='#place-order-btn')
+    synthetic.write_playwright_trace(paths['playwright_trace'], actions=params['trace_actions'],
+                                     elements=max(1, params['dom_elements'] // 3), seed=seed)
+    return paths
+
+
+def build_benchmarks(paths: Dict[str, str]) -> Dict[str, Callable[[], Any]]:
+    """Return the benchmark callables, keyed by name, over the prepared inputs."""
+    from ai.healing import report_analyzer as ra
+    from ai.healing.dom_analyzer import analyze_dom
+    from ai.healing.healing_engine import heal
+    from ai.healing.locator_recovery import suggest_alternative_locator
+    from ai.train_model import extract_feature_frame, extract_features
+
+    with open(paths['dom'], 'r', encoding='utf-8') as f:
+        html = f.read()
+    parsed = ra.load_report(path=paths['json'])
+
+    benchmarks: Dict[str, Callable[[], Any]] = {
+        'load_report': lambda: ra.load_report(path=paths['json']),
+        'load_report_junit': lambda: ra.load_report(path=paths['junit']),
+        'analyze_report': lambda: ra.analyze_report(report=parsed),
+        'analyze_report_path': lambda: ra.analyze_report(path=paths['json']),
+        'analyze_report_stream': lambda: ra.analyze_report(path=paths['json'], stream=True),
+        'analyze_report_junit': lambda: ra.analyze_report(path=paths['junit']),
+        'get_error_stats': lambda: ra.get_error_stats(report=parsed),
+        'analyze_dom': lambda: analyze_dom(html, 'button.btn-primary'),
+        'analyze_dom_missing': lambda: analyze_dom(html, '#place-order-btn'),
+        'suggest_alternative_locator': lambda: suggest_alternative_locator(html, '#btn-place-order'),
+        'heal': lambda: heal(trace_path=paths['trace']),
+        'heal_playwright_trace': lambda: heal(trace_path=paths['playwright_trace']),
+        'heal_playwright_trace_noindex': lambda: heal(trace_path=paths['playwright_trace'], use_index=False),
+        'extract_features': lambda: extract_features(parsed),
+        'extract_feature_frame': lambda: extract_feature_frame(parsed),
+    }
+    try:
+        from ai.healing.locator_scoring import candidate_matrix, rank_candidates
+    except ImportError:
+        # ranked scoring needs numpy
+        pass
+    else:
+        benchmarks['rank_candidates'] = lambda: rank_candidates(html, '#btn-place-order')
+        # per-query latency once the document is parsed and its candidate matrix built
+        from ai.healing.dom_document import parse_dom
+
+        document = parse_dom(html)
+        candidate_matrix(document)
+        benchmarks['rank_candidates_warm'] = lambda: rank_candidates(document, '#btn-place-order')
+    return benchmarks
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5, warmup: int = 1, reset: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """Time `fn` over `repeat` runs, then run it once under tracemalloc for its peak memory."""
+    for _ in range(warmup):
+        if reset:
+            reset()
+        fn()
+    times = []
+    for _ in range(repeat):
+        if reset:
+            reset()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    if reset:
+        reset()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'times': times,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.fmean(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'peak_memory_bytes': peak,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, timeout=10,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+    except Exception:
+        return None
+    return out.stdout.strip() or None
+
+
+def run(scale: str = 'small', overrides: Optional[Dict[str, int]] = None, only: Optional[List[str]] = None,
+        repeat: int = 5, warmup: int = 1, warm_caches: bool = False, seed: int = 0) -> Dict[str, Any]:
+    """Run the benchmarks and return the results document."""
+    params = dict(SCALES[scale])
+    params.update({k: v for k, v in (overrides or {}).items() if v is not None})
+    workdir = tempfile.mkdtemp(prefix='auto_test_bot_bench_')
+    try:
+        paths = _prepare(workdir, params, seed)
+        benchmarks = build_benchmarks(paths)
+        unknown = set(only or ()) - set(benchmarks)
+        if unknown:
+            raise ValueError(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+        results = {}
+        for name, fn in benchmarks.items():
+            if only and name not in only:
+                continue
+            results[name] = measure(fn, repeat=repeat, warmup=warmup, reset=None if warm_caches else _reset_caches)
+        sizes = {kind: os.path.getsize(path) for kind, path in paths.items()}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'scale': scale,
+        'params': dict(params, seed=seed, repeat=repeat, warm_caches=warm_caches),
+        'input_bytes': sizes,
+        'results': results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Return per-benchmark median time and peak memory ratios (current / baseline)."""
+    ratios = {}
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+        ratios[name] = {
+            'time': result['median'] / base['median'] if base['median'] else float('inf'),
+            'memory': (result['peak_memory_bytes'] / base['peak_memory_bytes']
+                       if base['peak_memory_bytes'] else float('inf')),
+        }
+    return ratios
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark report analysis, healing and feature extraction')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small', help='Size of the synthetic inputs')
+    parser.add_argument('--tests', type=int, help='Override the number of tests in the synthetic reports')
+    parser.add_argument('--retries', type=int, help='Override retries per failing test')
+    parser.add_argument('--errors-per-result', type=int, help='Override errors per failed result')
+    parser.add_argument('--stack-depth', type=int, help='Override stack frames per error message')
+    parser.add_argument('--dom-elements', type=int, help='Override the size of the synthetic DOM snapshot')
+    parser.add_argument('--trace-actions', type=int, help='Override the number of actions in the synthetic Playwright trace')
+    parser.add_argument('--only', nargs='+', help='Only run these benchmarks')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed repetitions per benchmark')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed runs before timing')
+    parser.add_argument('--warm-caches', action='store_true', help='Keep message caches between repetitions')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write the results as JSON to this path')
+    parser.add_argument('--compare', metavar='BASELINE', help='Results JSON of a previous run to compare against')
+    args = parser.parse_args()
+
+    overrides = {
+        'tests': args.tests,
+        'retries': args.retries,
+        'errors_per_result': args.errors_per_result,
+        'stack_depth': args.stack_depth,
+        'dom_elements': args.dom_elements,
+        'trace_actions': args.trace_actions,
+    }
+    doc = run(args.scale, overrides=overrides, only=args.only, repeat=args.repeat,
+              warmup=args.warmup, warm_caches=args.warm_caches, seed=args.seed)
+    ratios = {}
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            ratios = compare(doc, json.load(f))
+        doc['compare'] = {'baseline': args.compare, 'ratios': ratios}
+
+    print(f"Scale {doc['scale']}: {doc['params']}")
+    print(f"{'benchmark':32} {'median ms':>10} {'min ms':>10} {'peak KiB':>10}" + ('  vs baseline' if ratios else ''))
+    for name, result in doc['results'].items():
+        line = (f"{name:32} {result['median'] * 1000:10.2f} {result['min'] * 1000:10.2f} "
+                f"{result['peak_memory_bytes'] / 1024:10.1f}")
+        if name in ratios:
+            line += f"  time x{ratios[name]['time']:.2f}, memory x{ratios[name]['memory']:.2f}"
+        print(line)
+
+    if args.output:
+        out_dir = os.path.dirname(args.output)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(doc, f, indent=2)
+        print(f'\nWrote results to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+"""Synthetic inputs for benchmarks.
+
+Deterministic generators for Playwright JSON reports, JUnit XML reports, DOM
+snapshots and trace archives at configurable scale, shaped like the artifacts
+this project produces (page objects under pages/, specs under tests/, the
+chromium and webkit projects from playwright.config.ts).
+"""
+import json
+import random
+import zipfile
+from typing import Any, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+PROJECTS = ('chromium', 'webkit')
+PAGE_FILES = ('pages/BasePage.ts', 'pages/CartPage.ts', 'pages/HeaderPage.ts', 'pages/HomePage.ts', 'pages/ProductPage.ts')
+SPEC_FILES = ('tests/001_Product_List_Information.spec.ts', 'tests/002_Place_Order.spec.ts',
+              'tests/003_Login.spec.ts', 'tests/004_Contact_Form_Send_Message.spec.ts')
+ERROR_TEMPLATES = (
+    "TimeoutError: locator.click: Timeout {n}ms exceeded.\nCall log:\n  - waiting for getByRole('button', {{ name: 'Place order' }})",
+    'Error: strict mode violation: locator(\'.btn\') resolved to {n} elements',
+    'Test timeout of {n}ms exceeded.',
+    'Error: page.goto: net::ERR_CONNECTION_REFUSED at https://www.demoblaze.com/cart.html#{n}',
+    "TypeError: Cannot read properties of undefined (reading 'click') #{n}",
+    'Error: expect(locator).toBeVisible() failed\nLocator: #orderModal\nExpected: visible\nReceived: hidden ({n})',
+    'Error: element is not attached to the DOM ({n})',
+)
+
+
+def _error_message(rng: random.Random, stack_depth: int, ansi: bool = True) -> str:
+    message = rng.choice(ERROR_TEMPLATES).format(n=rng.choice((5000, 10000, 30000, 2, 3)))
+    frames = []
+    for _ in range(stack_depth):
+        frames.append(f'    at {rng.choice(PAGE_FILES + SPEC_FILES)}:{rng.randint(1, 120)}:{rng.randint(1, 40)}')
+    if ansi:
+        message = '\x1b[31m' + message + '\x1b[39m'
+    if frames:
+        message += '\n' + '\n'.join(frames)
+    return message
+
+
+def playwright_report(tests: int = 100, retries: int = 1, errors_per_result: int = 1, stack_depth: int = 5,
+                      failure_rate: float = 0.3, suites: int = 10, attachment_bytes: int = 0,
+                      seed: int = 0) -> Dict[str, Any]:
+    """Return a Playwright JSON reporter style dict.
+
+    Each test runs in every project; failing tests get `retries` extra results, each
+    with `errors_per_result` errors whose stack has `stack_depth` frames. A base64-like
+    attachment of `attachment_bytes` is inlined in every result when non-zero.
+    """
+    rng = random.Random(seed)
+    suite_list: List[Dict[str, Any]] = []
+    per_suite = max(1, tests // max(1, suites))
+    made = 0
+    while made < tests:
+        specs = []
+        for _ in range(min(per_suite, tests - made)):
+            failing = rng.random() < failure_rate
+            test_entries = []
+            for project in PROJECTS:
+                results = []
+                for retry in range((retries + 1) if failing else 1):
+                    errors = [{'message': _error_message(rng, stack_depth)} for _ in range(errors_per_result)] if failing else []
+                    result = {
+                        'workerIndex': rng.randint(0, 1),
+                        'status': 'failed' if failing else 'passed',
+                        'duration': rng.randint(200, 30000),
+                        'errors': errors,
+                        'stdout': [],
+                        'stderr': [],
+                        'retry': retry,
+                        'startTime': f'2026-01-01T10:{made % 60:02d}:00.000Z',
+                        'attachments': [{'name': 'trace', 'contentType': 'application/zip', 'body': 'A' * attachment_bytes}] if attachment_bytes else [],
+                    }
+                    results.append(result)
+                test_entries.append({'timeout': 30000, 'projectId': project, 'projectName': project,
+                                     'expectedStatus': 'passed', 'results': results,
+                                     'status': 'unexpected' if failing else 'expected'})
+            specs.append({'title': f'{made:05d} - synthetic test', 'ok': not failing, 'tests': test_entries,
+                          'file': rng.choice(SPEC_FILES), 'line': rng.randint(1, 80), 'column': 5})
+            made += 1
+        suite_list.append({'title': f'suite-{len(suite_list):03d}.spec.ts', 'file': rng.choice(SPEC_FILES), 'specs': specs})
+    return {'config': {'workers': 2, 'projects': [{'name': p} for p in PROJECTS]}, 'suites': suite_list,
+            'errors': [], 'stats': {'startTime': '2026-01-01T10:00:00.000Z', 'duration': 1000.0}}
+
+
+def junit_report(tests: int = 100, errors_per_result: int = 1, stack_depth: int = 5, failure_rate: float = 0.3,
+                 suites: int = 10, output_bytes: int = 0, seed: int = 0) -> str:
+    """Return a JUnit XML document; `output_bytes` of <system-out> is added to every testcase.
+
+    Messages carry no ANSI colour codes (control characters are not valid XML 1.0).
+    """
+    rng = random.Random(seed)
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>']
+    per_suite = max(1, tests // max(1, suites))
+    made = 0
+    while made < tests:
+        parts.append(f'<testsuite name="suite-{made // per_suite:03d}" timestamp="2026-01-01T10:00:00">')
+        for _ in range(min(per_suite, tests - made)):
+            parts.append(f'<testcase name="{made:05d} - synthetic test" classname="{rng.choice(PROJECTS)}" time="{rng.uniform(0.2, 30):.3f}">')
+            if rng.random() < failure_rate:
+                for _ in range(errors_per_result):
+                    parts.append(f'<failure message="failed">{escape(_error_message(rng, stack_depth, ansi=False))}</failure>')
+            if output_bytes:
+                parts.append(f"<system-out>{'o' * output_bytes}</system-out>")
+            parts.append('</testcase>')
+            made += 1
+        parts.append('</testsuite>')
+    parts.append('</testsuites>')
+    return ''.join(parts)
+
+
+def dom_snapshot(elements: int = 1000, depth: int = 6, seed: int = 0) -> str:
+    """Return an e-commerce like HTML page with roughly `elements` elements."""
+    rng = random.Random(seed)
+    parts = ['<html><head><title>Store</title></head><body>']
+    made = 0
+    section = 0
+    while made < elements:
+        section += 1
+        parts.append(f'<div class="section section-{section}" id="section-{section}">')
+        opened = 1
+        for level in range(1, depth):
+            parts.append(f'<div class="wrapper level-{level}">')
+            opened += 1
+        for item in range(min(20, max(1, elements - made))):
+            kind = rng.random()
+            n = made + item
+            if kind < 0.25:
+                parts.append(f'<button id="btn-{n}" class="btn btn-primary" data-testid="add-to-cart-{n}">Add to cart {n}</button>')
+            elif kind < 0.5:
+                parts.append(f'<a class="hrefch nav-link" href="prod.html?idp_={n}">Product {n}</a>')
+            elif kind < 0.6:
+                parts.append(f'<input type="text" name="field-{n}" id="input-{n}" aria-label="Field {n}" value="">')
+            elif kind < 0.7:
+                parts.append(f'<div role="button" class="card-action" aria-label="Open card {n}">Open {n}</div>')
+            else:
+                parts.append(f'<span class="price">${rng.randint(100, 1000)}</span><p class="card-text">Description {n}</p>')
+        made += 20 + depth
+        parts.append('</div>' * opened)
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def write_trace(path: str, html: str, selector: Optional[str] = '#place-order-btn') -> str:
+    """Write a trace zip holding one JSON document with the error selector and DOM snapshot."""
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('trace.json', json.dumps({'error': {'selector': selector}, 'snapshot': {'dom': html}}))
+    return path
+
+
+def _compact(event: Dict[str, Any]) -> str:
+    # Playwright writes events with JSON.stringify, i.e. without whitespace
+    return json.dumps(event, separators=(',', ':'))
+
+
+def _snapshot_tree(elements: int, seed: int) -> List[Any]:
+    """Return a frame-snapshot node tree (`[tag, attrs, *children]`) with about `elements` elements."""
+    rng = random.Random(seed)
+    cards: List[Any] = []
+    for n in range(elements):
+        cards.append(['DIV', {'class': 'card', 'id': f'card-{n}'},
+                      ['A', {'class': 'hrefch', 'href': f'prod.html?idp_={n}'}, f'Product {n}'],
+                      ['SPAN', {'class': 'price'}, f'${rng.randint(100, 1000)}']])
+    return ['HTML', {}, ['HEAD', {}, ['TITLE', {}, 'Store']],
+            ['BODY', {}, ['DIV', {'id': 'tbodyid'}, *cards],
+             ['BUTTON', {'class': 'btn btn-success', 'data-testid': 'place-order'}, 'Place Order']]]
+
+
+def write_playwright_trace(path: str, actions: int = 50, elements: int = 200, selector: str = '#place-order-btn',
+                           screencast_bytes: int = 0, seed: int = 0) -> str:
+    """Write a Playwright-format trace zip whose last action fails on `selector`.
+
+    Every action gets before/after frame snapshots; snapshots after the first reference
+    the first snapshot's <head> the way Playwright deduplicates unchanged subtrees.
+    `screencast_bytes` pads each action with a screencast event to mimic video-heavy traces.
+    """
+    page = 'page@1'
+    frame = 'frame@1'
+    lines = [_compact({'type': 'context-options', 'version': 7, 'browserName': 'chromium'})]
+    for i in range(1, actions + 1):
+        call_id = f'call@{i}'
+        failing = i == actions
+        params = {'selector': selector if failing else f'#card-{i % max(1, elements)} >> a'}
+        lines.append(_compact({'type': 'before', 'callId': call_id, 'startTime': i * 10.0, 'apiName': 'locator.click',
+                                 'class': 'Frame', 'method': 'click', 'params': params, 'pageId': page,
+                                 'beforeSnapshot': f'before@{call_id}'}))
+        for phase, offset in (('before', 0.0), ('after', 5.0)):
+            tree = _snapshot_tree(elements, seed + i)
+            index = 2 * (i - 1) + (phase == 'after')
+            if index:
+                # the <head> (post-order index 2: 'Store', TITLE, HEAD) was last expanded in snapshot 0
+                tree[2] = [[index, 2]]
+            lines.append(_compact({'type': 'frame-snapshot', 'snapshot': {
+                'callId': call_id, 'snapshotName': f'{phase}@{call_id}', 'pageId': page, 'frameId': frame,
+                'frameUrl': 'https://www.demoblaze.com/cart.html', 'doctype': 'html', 'html': tree,
+                'viewport': {'width': 1280, 'height': 720}, 'timestamp': i * 10.0 + offset, 'isMainFrame': True}}))
+        if screencast_bytes:
+            lines.append(_compact({'type': 'screencast-frame', 'pageId': page, 'sha1': f'{i:040x}',
+                                     'timestamp': i * 10.0 + 1, 'padding': 'x' * screencast_bytes}))
+        after: Dict[str, Any] = {'type': 'after', 'callId': call_id, 'endTime': i * 10.0 + 5,
+                                 'afterSnapshot': f'after@{call_id}'}
+        if failing:
+            after['error'] = {'name': 'TimeoutError', 'message': f'Timeout 5000ms exceeded.\nwaiting for locator({selector!r})'}
+        lines.append(_compact(after))
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('trace.trace', '\n'.join(lines) + '\n')
+        zf.writestr('trace.network', _compact({'type': 'resource-snapshot', 'snapshot': {'request': {'url': 'https://www.demoblaze.com/'}}}) + '\n')
+        zf.writestr('trace.stacks', _compact({'files': [], 'stacks': []}))
+    return path
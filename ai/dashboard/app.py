@@ -16,6 +16,7 @@ st.sidebar.header("Report settings")
 report_path = st.sidebar.text_input('Report path', value='reports/report.json')
 uploaded = st.sidebar.file_uploader('Or upload report (JSON)', type=['json'])
 dedupe = st.sidebar.checkbox('Deduplicate results', value=True, help='Group suggestions by (test,title, error type)')
+store_path = st.sidebar.text_input('Failure store (SQLite)', value='', help='Optional history database built with `python -m ai.healing.failure_store ingest`')
 
 
 @st.cache_data
@@ -46,7 +47,9 @@ if parsed is None:
     st.warning("No report loaded yet. Please provide a valid JSON report or path.")
 else:
     # Ask analyzer for detailed suggestions (including raw message and parsed location)
-    suggestions = analyzer.analyze_report(report=parsed, dedupe=dedupe, return_details=True)
+    # and error stats in a single pass over the report
+    analysis = analyzer.analyze(report=parsed, dedupe=dedupe, return_details=True)
+    suggestions = analysis.suggestions
     if suggestions:
         st.subheader("❌ Suggestions for Fixing Tests ")
         for item in suggestions:
@@ -98,7 +101,7 @@ else:
         st.success("✅ Critical errors not found!")
 
     st.subheader("📊 Errors distribution")
-    stats = analyzer.get_error_stats(report=parsed, dedupe=dedupe)
+    stats = analysis.stats
     fig = px.pie(
         names=list(stats.keys()),
         values=list(stats.values()),
@@ -107,3 +110,17 @@ else:
     )
     st.plotly_chart(fig, use_container_width=True)
 
+
+if store_path and os.path.exists(store_path):
+    from ai.healing.failure_store import FailureStore
+
+    with FailureStore(store_path) as store:
+        st.subheader("🗂️ Failure history")
+        history_stats = store.error_stats(dedupe=dedupe)
+        st.caption(f"{len(store.runs())} ingested runs")
+        if history_stats:
+            st.bar_chart(dict(history_stats.most_common()))
+        flaky = store.flaky_tests()
+        if flaky:
+            st.markdown('**Flaky tests (passed and failed across runs):**')
+            st.table(flaky)
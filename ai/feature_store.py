@@ -0,0 +1,277 @@
+"""Persisted training features, materialized once per report.
+
+Historical reports never change, yet every training run used to parse them and
+extract their features again. `FeatureStore` writes each report's features
+once, as one `.npy` file per column under `<root>/<report hash>/`, next to the
+report's message table (per-message test and text ids and the distinct texts).
+Loading maps the column files read-only (`np.load(mmap_mode='r')`) and hands
+them to pandas without copying, and only the requested columns are opened, so
+training reads just the feature and label columns.
+
+Entries are keyed by the report's content hash and `SCHEMA_VERSION`; a version
+change rebuilds an entry from its report. Each error-type column also records a
+fingerprint of the matchers it depends on: the matchers up to the last one of
+its type, since the first match wins. When `DEFAULT_MATCHERS` (or the matchers
+passed in) change, only the columns whose fingerprint differs are recounted,
+from the stored message table, without reading the report again. A path index
+(size, mtime, hash) avoids re-hashing reports that have not been touched.
+
+Usage examples:
+  # Materialize every report under reports/archive (only new or changed ones are processed)
+  python -m ai.feature_store build reports/archive
+
+  # Entries, columns and size of the store
+  python -m ai.feature_store --root ai/models/features stats
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+from ai.healing import report_analyzer as ra
+from ai.healing.matchers import compile_matchers
+from ai.train_model import ID_COLUMNS, LABEL_COLUMN, base_columns, error_type_counts, message_table
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# outside reports/, whose JSON files are all taken for reports
+DEFAULT_ROOT = 'ai/models/features'
+# bump when the non-matcher features or the on-disk layout change
+SCHEMA_VERSION = 1
+BASE_COLUMNS = ('num_errors', 'total_msg_len')
+_TABLE = ('test_suite', 'test_title', 'msg_test', 'msg_text')
+
+
+def column_signatures(matchers=None) -> Dict[str, str]:
+    """Fingerprint of the matchers each error-type column depends on, in column order.
+
+    A message counts for a type if its first matching matcher has that type, so
+    the column depends on every matcher up to the last one of its type; `others`
+    depends on all of them.
+    """
+    engine = compile_matchers(ra.DEFAULT_MATCHERS if matchers is None else matchers)
+    key = [(p.pattern, p.flags, t) for p, t, _ in engine]
+    last = {err_type: idx for idx, (_, err_type, _) in enumerate(engine)}
+    signatures = {'others': engine.signature}
+    for err_type in dict.fromkeys(t for _, t, _ in engine):
+        signatures[err_type] = hashlib.sha1(repr(key[:last[err_type] + 1]).encode('utf-8')).hexdigest()
+    return signatures
+
+
+def _column_file(name: str) -> str:
+    return f"col-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:16]}.npy"
+
+
+def _save(directory: str, filename: str, values: Any) -> None:
+    import numpy as np
+
+    tmp_path = os.path.join(directory, f'{filename}.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.save(f, np.ascontiguousarray(values))
+    os.replace(tmp_path, os.path.join(directory, filename))
+
+
+def _write_json(path: str, data: Any) -> None:
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class FeatureStore:
+    """Per-report column files of training features, rebuilt per column when the matchers change."""
+
+    def __init__(self, root: str = DEFAULT_ROOT, matchers=None):
+        self.root = root
+        self.matchers = compile_matchers(ra.DEFAULT_MATCHERS if matchers is None else matchers)
+        self.signatures = column_signatures(self.matchers)
+        os.makedirs(root, exist_ok=True)
+        self._index_path = os.path.join(root, 'index.json')
+        self.index: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self._index_path):
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+
+    @property
+    def columns(self) -> List[str]:
+        """Column order of `train_model.extract_feature_frame` for the store's matchers."""
+        return [*ID_COLUMNS, *BASE_COLUMNS, *self.signatures, LABEL_COLUMN]
+
+    def digest(self, path: str) -> str:
+        """Content hash of the report at `path`, reusing the indexed one while size and mtime match."""
+        key = os.path.abspath(path)
+        st = os.stat(key)
+        entry = self.index.get(key)
+        if entry and entry['size'] == st.st_size and entry['mtime'] == st.st_mtime:
+            return entry['hash']
+        digest = ra.report_digest(key)
+        self.index[key] = {'size': st.st_size, 'mtime': st.st_mtime, 'hash': digest}
+        _write_json(self._index_path, self.index)
+        return digest
+
+    def _entry(self, digest: str) -> str:
+        return os.path.join(self.root, digest)
+
+    def _meta(self, digest: str) -> Optional[Dict[str, Any]]:
+        meta_path = os.path.join(self._entry(digest), 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        return meta if meta.get('version') == SCHEMA_VERSION else None
+
+    def _build(self, path: str, digest: str) -> Dict[str, Any]:
+        table = message_table(ra.stream_report(path))
+        entry = self._entry(digest)
+        tmp_entry = f'{entry}.tmp-{os.getpid()}'
+        shutil.rmtree(tmp_entry, ignore_errors=True)
+        os.makedirs(tmp_entry)
+        for name in _TABLE:
+            _save(tmp_entry, f'{name}.npy', table[name])
+        with open(os.path.join(tmp_entry, 'texts.json'), 'w', encoding='utf-8') as f:
+            json.dump(table['texts'], f)
+        meta: Dict[str, Any] = {
+            'version': SCHEMA_VERSION,
+            'path': path,
+            'rows': len(table['test_suite']),
+            'created_at': time.time(),
+            'suites': table['suites'],
+            'titles': table['titles'],
+            'columns': {},
+        }
+        for name, values in base_columns(table).items():
+            _save(tmp_entry, _column_file(name), values)
+            meta['columns'][name] = {'file': _column_file(name), 'signature': None}
+        self._write_counts(tmp_entry, meta, table['texts'], table['msg_test'], table['msg_text'], list(self.signatures))
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp_entry, entry)
+        return meta
+
+    def _write_counts(self, entry: str, meta: Dict[str, Any], texts: List[str], msg_test: Any, msg_text: Any,
+                      names: List[str]) -> None:
+        counts = error_type_counts(texts, msg_test, msg_text, meta['rows'], self.matchers)
+        for name in names:
+            _save(entry, _column_file(name), counts[name])
+            meta['columns'][name] = {'file': _column_file(name), 'signature': self.signatures[name]}
+        _write_json(os.path.join(entry, 'meta.json'), meta)
+
+    def _refresh(self, digest: str, meta: Dict[str, Any]) -> List[str]:
+        """Recount the error-type columns whose matchers changed; returns their names."""
+        import numpy as np
+
+        entry = self._entry(digest)
+        stale = [name for name, signature in self.signatures.items()
+                 if meta['columns'].get(name, {}).get('signature') != signature]
+        # columns of error types the matchers no longer have
+        dropped = [name for name, column in meta['columns'].items()
+                   if column['signature'] is not None and name not in self.signatures]
+        for name in dropped:
+            del meta['columns'][name]
+            os.remove(os.path.join(entry, _column_file(name)))
+        if not stale:
+            if dropped:
+                _write_json(os.path.join(entry, 'meta.json'), meta)
+            return []
+        with open(os.path.join(entry, 'texts.json'), 'r', encoding='utf-8') as f:
+            texts = json.load(f)
+        msg_test = np.load(os.path.join(entry, 'msg_test.npy'), mmap_mode='r')
+        msg_text = np.load(os.path.join(entry, 'msg_text.npy'), mmap_mode='r')
+        self._write_counts(entry, meta, texts, msg_test, msg_text, stale)
+        return stale
+
+    def materialize(self, path: str) -> Dict[str, Any]:
+        """Make sure the features of `path` are stored and current.
+
+        Returns {'digest', 'status': 'built' | 'updated' | 'cached', 'columns': recounted columns}.
+        """
+        digest = self.digest(path)
+        meta = self._meta(digest)
+        if meta is None:
+            self._build(path, digest)
+            return {'digest': digest, 'status': 'built', 'columns': list(self.signatures)}
+        stale = self._refresh(digest, meta)
+        return {'digest': digest, 'status': 'updated' if stale else 'cached', 'columns': stale}
+
+    def update(self, paths: Iterable[str]) -> Dict[str, Any]:
+        """Materialize every report; returns the built, updated (with their columns) and cached counts."""
+        summary: Dict[str, Any] = {'built': [], 'updated': {}, 'cached': 0}
+        for path in paths:
+            result = self.materialize(path)
+            if result['status'] == 'built':
+                summary['built'].append(path)
+            elif result['status'] == 'updated':
+                summary['updated'][path] = result['columns']
+            else:
+                summary['cached'] += 1
+        return summary
+
+    def load(self, path: str, columns: Optional[Iterable[str]] = None) -> 'pd.DataFrame':
+        """Features of the report at `path` (materialized first if needed) as memory-mapped columns.
+
+        `columns` defaults to every column of `extract_feature_frame`, in its order.
+        """
+        import numpy as np
+        import pandas as pd
+
+        digest = self.materialize(path)['digest']
+        meta = self._meta(digest)
+        entry = self._entry(digest)
+        data: Dict[str, Any] = {}
+        for name in self.columns if columns is None else columns:
+            if name in ID_COLUMNS:
+                suite = name == 'suite'
+                codes = np.load(os.path.join(entry, 'test_suite.npy' if suite else 'test_title.npy'))
+                categories = meta['suites'] if suite else meta['titles']
+                data[name] = pd.Categorical.from_codes(codes, categories=categories)
+            elif name in meta['columns']:
+                # a plain ndarray view of the mapping: no copy, behaves like extracted features
+                data[name] = np.load(os.path.join(entry, meta['columns'][name]['file']), mmap_mode='r').view(np.ndarray)
+            else:
+                raise KeyError(f'{name!r} is not a feature column for these matchers')
+        return pd.DataFrame(data, copy=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of entries, their rows and bytes on disk."""
+        entries = rows = size = 0
+        for name in os.listdir(self.root):
+            entry = os.path.join(self.root, name)
+            meta = self._meta(name) if os.path.isdir(entry) else None
+            if meta is None:
+                continue
+            entries += 1
+            rows += meta['rows']
+            size += sum(os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry))
+        return {'entries': entries, 'rows': rows, 'bytes': size, 'columns': len(self.columns)}
+
+
+def main():
+    from ai.healing.batch_analyzer import find_reports
+
+    parser = argparse.ArgumentParser(description='Materialize and inspect stored training features')
+    parser.add_argument('--root', default=DEFAULT_ROOT, help='Feature store directory')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_build = sub.add_parser('build', help='Materialize the features of a report file, directory or glob')
+    p_build.add_argument('target')
+    sub.add_parser('stats', help='Print entries, rows and size')
+    args = parser.parse_args()
+
+    store = FeatureStore(args.root)
+    if args.command == 'build':
+        start = time.perf_counter()
+        summary = store.update(find_reports(args.target))
+        print(f"Built {len(summary['built'])}, updated {len(summary['updated'])}, "
+              f"{summary['cached']} already current ({time.perf_counter() - start:.1f}s)")
+        for path, columns in summary['updated'].items():
+            print(f"  {path}: recounted {', '.join(columns)}")
+    elif args.command == 'stats':
+        stats = store.stats()
+        print(f"{stats['entries']} reports, {stats['rows']} rows, {stats['columns']} columns, "
+              f"{stats['bytes'] / 1024:.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
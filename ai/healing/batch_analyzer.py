@@ -0,0 +1,158 @@
+"""Analyze many reports at once.
+
+Fan `report_analyzer.analyze` out over a process pool for a directory (or glob)
+of archived Playwright JSON / JUnit XML reports and merge the per-report results
+into one `ReportAnalysis`. Results are yielded as each report completes, so a
+single huge report does not hold back the others.
+
+Usage examples:
+  # Analyze every report under reports/history with 8 worker processes
+  python -m ai.healing.batch_analyzer reports/history --workers 8
+
+  # Glob patterns work too; write the merged result as JSON
+  python -m ai.healing.batch_analyzer "reports/**/report*.json" --output reports/summary.json
+
+  # Only analyze reports that are new or changed since the last run
+  python -m ai.healing.batch_analyzer reports/ --incremental reports/manifest.json
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .report_analyzer import ReportAnalysis, analyze
+
+REPORT_EXTENSIONS = ('.json', '.xml', '.junit')
+
+
+def find_reports(target: str) -> List[str]:
+    """Return the report files for a file, a directory (searched recursively) or a glob pattern."""
+    if os.path.isdir(target):
+        paths = []
+        for root, _, files in os.walk(target):
+            paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(REPORT_EXTENSIONS))
+    elif os.path.isfile(target):
+        paths = [target]
+    else:
+        paths = [p for p in glob.glob(target, recursive=True)
+                 if os.path.isfile(p) and p.lower().endswith(REPORT_EXTENSIONS)]
+    return sorted(paths)
+
+
+def _analyze_path(path: str, dedupe: bool, return_details: bool, matchers) -> ReportAnalysis:
+    return analyze(path=path, matchers=matchers, dedupe=dedupe, return_details=return_details, stream=True)
+
+
+def iter_analyze_many(paths: Iterable[str],
+                      workers: Optional[int] = None,
+                      dedupe: bool = True,
+                      return_details: bool = False,
+                      matchers=None) -> Iterator[Tuple[str, Optional[ReportAnalysis], Optional[str]]]:
+    """Yield (path, analysis, error) for each report as soon as it has been analyzed.
+
+    Reports are read in streaming mode. `workers` is the process pool size (default:
+    CPU count); with workers=1 everything runs in the current process. A report
+    that fails to parse yields analysis=None and the error message.
+    """
+    paths = list(paths)
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            try:
+                yield path, _analyze_path(path, dedupe, return_details, matchers), None
+            except Exception as e:
+                yield path, None, f'{type(e).__name__}: {e}'
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_analyze_path, path, dedupe, return_details, matchers): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                yield path, future.result(), None
+            except Exception as e:
+                yield path, None, f'{type(e).__name__}: {e}'
+
+
+def analyze_many(paths: Iterable[str],
+                 workers: Optional[int] = None,
+                 dedupe: bool = True,
+                 return_details: bool = False,
+                 matchers=None) -> ReportAnalysis:
+    """Analyze `paths` in parallel and return the merged `ReportAnalysis`."""
+    merged = ReportAnalysis()
+    for _, result, _ in iter_analyze_many(paths, workers=workers, dedupe=dedupe,
+                                          return_details=return_details, matchers=matchers):
+        if result is not None:
+            merged.merge(result, dedupe=dedupe)
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyze a directory or glob of test reports in parallel')
+    parser.add_argument('target', help='Report file, directory (searched recursively) or glob pattern')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--no-dedupe', action='store_true', help='Count every error instead of once per (test, error type)')
+    parser.add_argument('--top', type=int, default=10, help='Number of most frequently failing tests to print')
+    parser.add_argument('--output', help='Write the merged stats as JSON to this path')
+    parser.add_argument('--incremental', metavar='MANIFEST',
+                        help='Keep running totals in this manifest and only analyze new or changed reports')
+    args = parser.parse_args()
+
+    paths = find_reports(args.target)
+    if not paths:
+        print(f'No reports found for {args.target}')
+        return
+    dedupe = not args.no_dedupe
+    failed = 0
+    start = time.perf_counter()
+    if args.incremental:
+        from .incremental import IncrementalAnalyzer
+
+        incremental = IncrementalAnalyzer(args.incremental, dedupe=dedupe)
+        summary = incremental.update(paths, workers=args.workers)
+        merged = incremental.totals
+        failed = len(summary['failed'])
+        for path, error in summary['failed'].items():
+            print(f'{path}: {error}')
+        print(f"{len(summary['added'])} added, {len(summary['changed'])} changed, "
+              f"{len(summary['removed'])} removed, {summary['unchanged']} unchanged")
+    else:
+        merged = ReportAnalysis()
+        for done, (path, result, error) in enumerate(iter_analyze_many(paths, workers=args.workers, dedupe=dedupe), start=1):
+            if result is None:
+                failed += 1
+                print(f'[{done}/{len(paths)}] {path}: {error}')
+                continue
+            merged.merge(result, dedupe=dedupe)
+            print(f'[{done}/{len(paths)}] {path}: {result.tests} tests, {sum(result.stats.values())} errors')
+    elapsed = time.perf_counter() - start
+
+    print(f'\nAnalyzed {len(paths) - failed} reports ({failed} failed) in {elapsed:.2f}s')
+    print('\nError types:')
+    for err_type, count in merged.stats.most_common():
+        print(f'  {count:6d}  {err_type}')
+    print(f'\nMost frequently failing tests (top {args.top}):')
+    ranked = sorted(merged.by_test.items(), key=lambda kv: sum(kv[1].values()), reverse=True)
+    for title, counts in ranked[:args.top]:
+        print(f'  {sum(counts.values()):6d}  {title}  {dict(counts.most_common(3))}')
+
+    if args.output:
+        out_dir = os.path.dirname(args.output)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'reports': len(paths) - failed,
+                'failed_reports': failed,
+                'tests': merged.tests,
+                'stats': dict(merged.stats),
+                'by_suite': {k: dict(v) for k, v in merged.by_suite.items()},
+                'by_test': {k: dict(v) for k, v in merged.by_test.items()},
+            }, f, indent=2)
+        print(f'\nWrote merged stats to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
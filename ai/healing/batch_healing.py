@@ -0,0 +1,272 @@
+"""Heal many traces at once.
+
+Fan `healing_engine.heal` out over a process pool for a directory (or glob) of
+Playwright `trace.zip` files, e.g. the `retain-on-failure` traces under
+test-results/ after a bad deploy. Results are yielded as each trace completes,
+and every trace gets its own time budget so one pathological DOM cannot stall
+the batch. Workers share a `healing_cache.HealingCache`, so failures with the
+same snapshot and broken selector are healed once.
+
+Usage examples:
+  # Heal every trace under test-results with 8 worker processes
+  python -m ai.healing.batch_healing test-results --workers 8
+
+  # Glob patterns work too; give each trace at most 20s and keep the results
+  python -m ai.healing.batch_healing "test-results/**/trace.zip" --timeout 20 --output reports/healing.json
+
+  # Heal everything from scratch, without reading or writing the result cache
+  python -m ai.healing.batch_healing test-results --no-cache
+"""
+import argparse
+import glob
+import json
+import os
+import signal
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .healing_cache import DEFAULT_PATH, open_cache
+from .healing_engine import heal
+
+TRACE_EXTENSIONS = ('.zip',)
+# extra seconds the parent waits past a trace's budget, so the worker's own timer fires first
+DEADLINE_GRACE = 1.0
+
+
+class HealingTimeout(Exception):
+    """Raised inside a worker when a trace exceeds its time budget."""
+
+
+def find_traces(target: str) -> List[str]:
+    """Return the trace archives for a file, a directory (searched recursively) or a glob pattern."""
+    if os.path.isdir(target):
+        paths = []
+        for root, _, files in os.walk(target):
+            paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(TRACE_EXTENSIONS))
+    elif os.path.isfile(target):
+        paths = [target]
+    else:
+        paths = [p for p in glob.glob(target, recursive=True)
+                 if os.path.isfile(p) and p.lower().endswith(TRACE_EXTENSIONS)]
+    return sorted(paths)
+
+
+def _on_timeout(signum, frame):
+    raise HealingTimeout()
+
+
+def _can_alarm() -> bool:
+    return hasattr(signal, 'setitimer') and threading.current_thread() is threading.main_thread()
+
+
+def _heal_path(path: str, timeout: Optional[float], use_index: bool, cache_path: Optional[str] = None) -> Dict[str, Any]:
+    """Heal one trace, interrupting it after `timeout` seconds where SIGALRM is available."""
+    armed = bool(timeout) and _can_alarm()
+    if armed:
+        previous = signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    try:
+        result = heal(trace_path=path, use_index=use_index, cache=open_cache(cache_path) if cache_path else None)
+    except HealingTimeout:
+        raise HealingTimeout(f'timed out after {timeout}s') from None
+    finally:
+        if armed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    result['elapsed'] = time.perf_counter() - start
+    return result
+
+
+def _terminate(pool: ProcessPoolExecutor) -> None:
+    # a running job cannot be cancelled, only its process stopped
+    for process in list((getattr(pool, '_processes', None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _timed_out(timeout: float) -> str:
+    return f'{HealingTimeout.__name__}: timed out after {timeout}s'
+
+
+def iter_heal_many(paths: Iterable[str],
+                   workers: Optional[int] = None,
+                   timeout: Optional[float] = None,
+                   use_index: bool = True,
+                   cache_path: Optional[str] = None) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+    """Yield (path, result, error) for each trace as soon as it has been healed.
+
+    `workers` is the process pool size (default: CPU count); with workers=1 everything
+    runs in the current process. `timeout` is the per-trace budget in seconds. Workers
+    enforce it with a SIGALRM timer where there is one; the parent also tracks a
+    deadline per trace (`DEADLINE_GRACE` seconds later) and, when one passes, stops
+    waiting for that trace, replaces the pool and resubmits the traces that were
+    still running. Without SIGALRM, workers=1 therefore uses a one-process pool.
+    `cache_path` is the healing cache database shared by the workers (None disables
+    it). A trace that fails or times out yields result=None and the error message.
+    """
+    paths = list(paths)
+    if (workers == 1 or len(paths) <= 1) and (not timeout or _can_alarm()):
+        for path in paths:
+            try:
+                yield path, _heal_path(path, timeout, use_index, cache_path), None
+            except Exception as e:
+                yield path, None, f'{type(e).__name__}: {e}'
+        return
+    size = workers or os.cpu_count() or 1
+    pending = deque(paths)
+    # only `size` traces are submitted at a time, so a deadline counts running time, not queueing
+    running: Dict[Future, Tuple[str, float]] = {}
+    pool = ProcessPoolExecutor(max_workers=size)
+    try:
+        while pending or running:
+            while pending and len(running) < size:
+                try:
+                    future = pool.submit(_heal_path, pending[0], timeout, use_index, cache_path)
+                except BrokenProcessPool:
+                    # a worker died (e.g. killed for memory); the pool takes no more work
+                    _terminate(pool)
+                    pool = ProcessPoolExecutor(max_workers=size)
+                    continue
+                running[future] = (pending.popleft(), time.monotonic())
+            budget = None
+            if timeout:
+                first = min(started for _, started in running.values())
+                budget = max(0.0, first + timeout + DEADLINE_GRACE - time.monotonic())
+            done, _ = wait(running, timeout=budget, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, _ = running.pop(future)
+                try:
+                    yield path, future.result(), None
+                except Exception as e:
+                    yield path, None, f'{type(e).__name__}: {e}'
+            if not timeout:
+                continue
+            now = time.monotonic()
+            expired = [f for f, (_, started) in running.items() if now >= started + timeout + DEADLINE_GRACE]
+            if not expired:
+                continue
+            for future in expired:
+                yield running.pop(future)[0], None, _timed_out(timeout)
+            # the stuck worker only stops with its pool; the traces it shared it with start over
+            pending.extendleft(reversed([path for path, _ in running.values()]))
+            running.clear()
+            _terminate(pool)
+            pool = ProcessPoolExecutor(max_workers=size)
+    finally:
+        if running:
+            _terminate(pool)
+        else:
+            pool.shutdown()
+
+
+def outcome(result: Optional[Dict[str, Any]], error: Optional[str]) -> str:
+    """Classify one trace: healed (selector still matches), suggested, unresolved, timeout or error."""
+    if result is None:
+        return 'timeout' if error and error.startswith(HealingTimeout.__name__) else 'error'
+    if result.get('ok'):
+        return 'healed'
+    return 'suggested' if result.get('suggestions') else 'unresolved'
+
+
+def heal_many(paths: Iterable[str],
+              workers: Optional[int] = None,
+              timeout: Optional[float] = None,
+              use_index: bool = True,
+              cache_path: Optional[str] = None,
+              on_result: Optional[Callable[[int, int, str, Optional[Dict[str, Any]], Optional[str]], None]] = None
+              ) -> Dict[str, Any]:
+    """Heal `paths` in parallel and return the per-trace results with a summary.
+
+    The summary has the trace count, counts per outcome (see `outcome`), the errors
+    by path, wall-clock time, throughput in traces per second and the healing cache
+    hits of this batch. `on_result(done, total, path, result, error)` is called as
+    each trace completes, e.g. to report progress.
+    """
+    paths = list(paths)
+    results: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    outcomes: Counter = Counter()
+    start = time.perf_counter()
+    healed = iter_heal_many(paths, workers=workers, timeout=timeout, use_index=use_index, cache_path=cache_path)
+    for done, (path, result, error) in enumerate(healed, start=1):
+        outcomes[outcome(result, error)] += 1
+        if result is None:
+            errors[path] = error
+        else:
+            results[path] = result
+        if on_result is not None:
+            on_result(done, len(paths), path, result, error)
+    return {'results': results, 'summary': _summary(len(paths), outcomes, errors, time.perf_counter() - start, results)}
+
+
+def _summary(total: int, outcomes: Counter, errors: Dict[str, str], elapsed: float,
+             results: Dict[str, Any]) -> Dict[str, Any]:
+    cache_hits = sum(1 for r in results.values() if r.get('cached'))
+    return {
+        'traces': total,
+        'outcomes': dict(outcomes),
+        'failed': len(errors),
+        'errors': errors,
+        'elapsed': elapsed,
+        'throughput': total / elapsed if elapsed else 0.0,
+        'cache_hits': cache_hits,
+        'cache_hit_rate': cache_hits / len(results) if results else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Heal a directory or glob of Playwright traces in parallel')
+    parser.add_argument('target', help='Trace file, directory (searched recursively) or glob pattern')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Seconds allowed per trace (0 disables)')
+    parser.add_argument('--no-index', action='store_true', help='Do not read or write trace index sidecars')
+    parser.add_argument('--cache', default=DEFAULT_PATH, help=f'Healing cache database (default: {DEFAULT_PATH})')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the healing cache')
+    parser.add_argument('--output', help='Write the results and summary as JSON to this path')
+    args = parser.parse_args()
+
+    paths = find_traces(args.target)
+    if not paths:
+        print(f'No traces found for {args.target}')
+        return
+
+    def progress(done, total, path, result, error):
+        if result is None:
+            print(f'[{done}/{total}] {path}: {error}')
+            return
+        kind = outcome(result, error)
+        detail = result.get('selector') or ''
+        if kind == 'suggested':
+            detail += f" -> {result['suggestions'][0]}"
+        if result.get('cached'):
+            detail += ' [cached]'
+        print(f"[{done}/{total}] {path}: {kind} {detail} ({result['elapsed']:.2f}s)")
+
+    report = heal_many(paths, workers=args.workers, timeout=args.timeout or None, use_index=not args.no_index,
+                       cache_path=None if args.no_cache else args.cache, on_result=progress)
+    summary = report['summary']
+
+    print(f"\nHealed {summary['traces']} traces in {summary['elapsed']:.2f}s "
+          f"({summary['throughput']:.1f} traces/s), {summary['failed']} failed")
+    for kind, count in sorted(summary['outcomes'].items(), key=lambda kv: -kv[1]):
+        print(f'  {count:6d}  {kind}')
+    if not args.no_cache:
+        print(f"Cache: {summary['cache_hits']} hits ({summary['cache_hit_rate']:.1%}) this batch, "
+              f"{open_cache(args.cache).stats()['hit_rate']:.1%} overall")
+
+    if args.output:
+        out_dir = os.path.dirname(args.output)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'summary': summary, 'results': report['results']}, f, indent=2)
+        print(f'\nWrote results to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
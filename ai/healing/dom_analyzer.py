@@ -2,22 +2,23 @@
 
 Provide small, testable utilities to check whether a selector exists and
 to return lightweight metadata about candidate elements. These helpers are
-framework-agnostic and accept raw HTML or a BeautifulSoup object.
+framework-agnostic and accept raw HTML, a BeautifulSoup object or a shared
+`DomDocument` (see `dom_document.parse_dom`).
 """
 from bs4 import BeautifulSoup
 from typing import Dict, List, Optional, Union
 import logging
 
-logging.basicConfig(level=logging.INFO)
+from .dom_document import DomDocument, parse_dom
 
+logger = logging.getLogger(__name__)
 
-def to_soup(html_or_soup: Union[str, BeautifulSoup]) -> BeautifulSoup:
-    if isinstance(html_or_soup, BeautifulSoup):
-        return html_or_soup
-    return BeautifulSoup(html_or_soup or "", 'html.parser')
 
+def to_soup(html_or_soup: Union[str, BeautifulSoup, DomDocument]) -> BeautifulSoup:
+    return parse_dom(html_or_soup).soup
 
-def analyze_dom(html_content: Union[str, BeautifulSoup], expected_selector: str) -> Dict[str, Optional[Union[int, List[Dict[str, str]]]]]:
+
+def analyze_dom(html_content: Union[str, BeautifulSoup, DomDocument], expected_selector: str) -> Dict[str, Optional[Union[int, List[Dict[str, str]]]]]:
     """Return analysis for `expected_selector` in the provided HTML.
 
     Returns a dict with keys:
@@ -26,12 +27,12 @@ def analyze_dom(html_content: Union[str, BeautifulSoup], expected_selector: str)
     - selector: the selector queried
     """
     try:
-        soup = to_soup(html_content)
+        document = parse_dom(html_content)
         if not expected_selector:
-            logging.info("No selector provided to analyze_dom")
+            logger.info("No selector provided to analyze_dom")
             return {"selector": expected_selector, "matches": 0, "samples": []}
 
-        candidates = soup.select(expected_selector)
+        candidates = document.select(expected_selector)
         samples: List[Dict[str, str]] = []
         for el in candidates[:5]:
             samples.append({
@@ -41,8 +42,8 @@ def analyze_dom(html_content: Union[str, BeautifulSoup], expected_selector: str)
                 "class": ' '.join(el.get('class', [])) if el.get('class') else ''
             })
 
-        logging.info(f"Found {len(candidates)} elements matching '{expected_selector}'")
+        logger.info(f"Found {len(candidates)} elements matching '{expected_selector}'")
         return {"selector": expected_selector, "matches": len(candidates), "samples": samples}
     except Exception as e:
-        logging.exception(f"Error analyzing DOM: {e}")
+        logger.exception(f"Error analyzing DOM: {e}")
         return {"selector": expected_selector, "matches": 0, "samples": []}
\ No newline at end of file
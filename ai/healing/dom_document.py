@@ -0,0 +1,131 @@
+"""Parsed DOM snapshots shared by the healing helpers.
+
+`parse_dom` turns an HTML snapshot into a `DomDocument` once, with the fastest
+available BeautifulSoup tree builder (lxml when installed, else html.parser),
+and keeps recently parsed documents in an LRU keyed by a hash of the HTML, so
+the same snapshot seen again (retries, both browser projects, the dashboard
+re-running a heal) is not parsed again. `dom_analyzer`, `locator_recovery` and
+`healing_engine.heal` all consume the shared document.
+
+Cached documents are shared: callers must treat `DomDocument.soup` as read-only.
+"""
+import hashlib
+import importlib.util
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+
+from bs4 import BeautifulSoup
+
+from .dom_index import DomIndex
+
+PREFERRED_PARSERS = ('lxml', 'html.parser')
+
+
+def default_parser() -> str:
+    """Return the fastest installed BeautifulSoup HTML tree builder."""
+    for parser in PREFERRED_PARSERS:
+        if parser == 'html.parser' or importlib.util.find_spec(parser) is not None:
+            return parser
+    return 'html.parser'
+
+
+def html_digest(html: str) -> str:
+    return hashlib.blake2b(html.encode('utf-8', errors='surrogatepass'), digest_size=16).hexdigest()
+
+
+class DomDocument:
+    """An HTML snapshot parsed once, with memoized selector queries and attribute index."""
+
+    def __init__(self, html: str, parser: Optional[str] = None, digest: Optional[str] = None,
+                 soup: Optional[BeautifulSoup] = None):
+        self.html = html or ''
+        self.parser = parser or default_parser()
+        self.digest = digest
+        self.soup = soup if soup is not None else BeautifulSoup(self.html, self.parser)
+        self._selections: Dict[str, List[Any]] = {}
+        self._index: Optional[DomIndex] = None
+
+    @classmethod
+    def from_soup(cls, soup: BeautifulSoup) -> 'DomDocument':
+        """Wrap an already-parsed soup (not cached, since it may be mutated by its owner)."""
+        return cls('', parser='html.parser', soup=soup)
+
+    def select(self, selector: str) -> List[Any]:
+        """Return the elements matching a CSS selector; repeated queries are answered from memory."""
+        if selector not in self._selections:
+            self._selections[selector] = self.soup.select(selector)
+        return self._selections[selector]
+
+    @property
+    def index(self) -> DomIndex:
+        """The document's `dom_index.DomIndex`, built on first use."""
+        if self._index is None:
+            self._index = DomIndex(self.soup)
+        return self._index
+
+    def __len__(self) -> int:
+        return len(self.html)
+
+
+class _DocumentCache:
+    """LRU of parsed documents bounded by count and by total HTML size."""
+
+    def __init__(self, maxsize: int = 16, max_bytes: int = 64 << 20):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._docs: 'OrderedDict[tuple, DomDocument]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, html: str, parser: str) -> DomDocument:
+        key = (html_digest(html), parser)
+        with self._lock:
+            doc = self._docs.get(key)
+            if doc is not None:
+                self._docs.move_to_end(key)
+                self.hits += 1
+                return doc
+            self.misses += 1
+        # parse outside the lock; a concurrent parse of the same HTML only costs time
+        doc = DomDocument(html, parser=parser, digest=key[0])
+        with self._lock:
+            if key not in self._docs:
+                self._docs[key] = doc
+                self._bytes += len(doc)
+            while self._docs and (len(self._docs) > self.maxsize or self._bytes > self.max_bytes):
+                _, evicted = self._docs.popitem(last=False)
+                self._bytes -= len(evicted)
+        return doc
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._docs), 'bytes': self._bytes}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._docs.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+
+document_cache = _DocumentCache()
+
+
+def parse_dom(html_or_doc: Union[str, BeautifulSoup, DomDocument, None], parser: Optional[str] = None) -> DomDocument:
+    """Return the shared `DomDocument` for raw HTML, a BeautifulSoup object or a document."""
+    if isinstance(html_or_doc, DomDocument):
+        return html_or_doc
+    if isinstance(html_or_doc, BeautifulSoup):
+        return DomDocument.from_soup(html_or_doc)
+    return document_cache.get(html_or_doc or '', parser or default_parser())
+
+
+def cache_info() -> Dict[str, int]:
+    return document_cache.info()
+
+
+def clear_cache() -> None:
+    document_cache.clear()
@@ -0,0 +1,144 @@
+"""Attribute inverted index over a parsed DOM snapshot.
+
+`DomIndex` walks the document once and maps the values of the attributes locator
+recovery cares about (id, class tokens, name, data-testid, aria-label, role) and
+each element's normalized own text to the elements carrying them, in document
+order. Substring lookups go through a trigram index over the distinct values,
+so finding "the first element whose id contains X" no longer walks the whole
+tree per token. Build it through `DomDocument.index`, which keeps one per
+snapshot for every broken selector healed against it.
+"""
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from bs4 import NavigableString, Tag
+
+INDEXED_ATTRIBUTES = ('id', 'class', 'name', 'data-testid', 'aria-label', 'role')
+TEXT_FIELD = 'text'
+FIELDS = INDEXED_ATTRIBUTES + (TEXT_FIELD,)
+
+_GRAM = 3
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Lower-case and collapse whitespace, the form text values are indexed and looked up in."""
+    return _SPACE_RE.sub(' ', text).strip().lower()
+
+
+class _SubstringIndex:
+    """Map values to element positions, with trigram-accelerated substring search over the values."""
+
+    def __init__(self):
+        self.values: Dict[str, List[int]] = {}
+        self._grams: Optional[Dict[str, Set[str]]] = None
+
+    def add(self, value: str, position: int) -> None:
+        positions = self.values.setdefault(value, [])
+        if not positions or positions[-1] != position:
+            positions.append(position)
+
+    def _gram_index(self) -> Dict[str, Set[str]]:
+        if self._grams is None:
+            grams: Dict[str, Set[str]] = defaultdict(set)
+            for value in self.values:
+                for i in range(len(value) - _GRAM + 1):
+                    grams[value[i:i + _GRAM]].add(value)
+            self._grams = dict(grams)
+        return self._grams
+
+    def containing(self, token: str) -> List[str]:
+        """Return the distinct values that contain `token`."""
+        if len(token) < _GRAM:
+            return [value for value in self.values if token in value]
+        grams = self._gram_index()
+        candidates: Optional[Set[str]] = None
+        # intersect the rarest posting lists first
+        for gram in sorted({token[i:i + _GRAM] for i in range(len(token) - _GRAM + 1)},
+                           key=lambda g: len(grams.get(g, ()))):
+            posting = grams.get(gram)
+            if not posting:
+                return []
+            candidates = set(posting) if candidates is None else candidates & posting
+            if not candidates:
+                return []
+        return [value for value in candidates if token in value]
+
+    def positions(self, token: str) -> List[int]:
+        """Return the positions of elements with a value containing `token`, in document order."""
+        found: Set[int] = set()
+        for value in self.containing(token):
+            found.update(self.values[value])
+        return sorted(found)
+
+    def first(self, token: str) -> Optional[int]:
+        firsts = [self.values[value][0] for value in self.containing(token)]
+        return min(firsts) if firsts else None
+
+
+class DomIndex:
+    """One-pass index of a document's elements by attribute values, own text and tag name."""
+
+    def __init__(self, soup: Tag):
+        self.elements: List[Tag] = []
+        self.fields: Dict[str, _SubstringIndex] = {field: _SubstringIndex() for field in FIELDS}
+        self.by_tag: Dict[str, List[int]] = defaultdict(list)
+        self._texts: Dict[int, str] = {}
+        for position, element in enumerate(soup.find_all(True)):
+            self.elements.append(element)
+            self.by_tag[element.name].append(position)
+            attrs = element.attrs
+            for attr in INDEXED_ATTRIBUTES:
+                value = attrs.get(attr)
+                if not value:
+                    continue
+                if isinstance(value, list):
+                    for item in value:
+                        self.fields[attr].add(item, position)
+                    if attr != 'class':
+                        self.fields[attr].add(' '.join(value), position)
+                else:
+                    self.fields[attr].add(value, position)
+            own_text = ' '.join(child for child in element.contents if type(child) is NavigableString)
+            own_text = normalize_text(own_text) if own_text else ''
+            if own_text:
+                self.fields[TEXT_FIELD].add(own_text, position)
+        self.by_tag = dict(self.by_tag)
+
+    def find(self, field: str, token: str) -> Optional[Tag]:
+        """Return the first element (in document order) whose `field` contains `token`.
+
+        For `class` the match is against each class name; for `text` the token is
+        normalized first.
+        """
+        if field == TEXT_FIELD:
+            token = normalize_text(token)
+        position = self.fields[field].first(token)
+        return self.elements[position] if position is not None else None
+
+    def find_all(self, field: str, token: str) -> List[Tag]:
+        """Return every element whose `field` contains `token`, in document order."""
+        if field == TEXT_FIELD:
+            token = normalize_text(token)
+        return [self.elements[position] for position in self.fields[field].positions(token)]
+
+    def exact(self, field: str, value: str) -> List[Tag]:
+        """Return the elements whose `field` equals `value` (a single class name for `class`)."""
+        if field == TEXT_FIELD:
+            value = normalize_text(value)
+        return [self.elements[position] for position in self.fields[field].values.get(value, ())]
+
+    def tags(self, names: Iterable[str]) -> List[Tag]:
+        """Return the elements with any of the tag `names`, in document order."""
+        positions: List[int] = []
+        for name in names:
+            positions.extend(self.by_tag.get(name, ()))
+        return [self.elements[position] for position in sorted(positions)]
+
+    def text(self, element: Tag) -> str:
+        """Return the element's stripped full text (memoized)."""
+        key = id(element)
+        if key not in self._texts:
+            self._texts[key] = element.get_text(strip=True)
+        return self._texts[key]
@@ -0,0 +1,276 @@
+"""Persistent failure store.
+
+Ingest the output of `report_analyzer` once per report into a local SQLite
+database so analysis, stats, training and the dashboard can query history
+without re-reading raw report files. Every test result is stored (with project,
+status and duration) and every error becomes a failure row with its error type,
+message hash and parsed location. Failures are indexed by test title, error
+type and time. Re-ingesting a report that is already stored is a no-op.
+
+Usage examples:
+  # Ingest every report found under reports/ (already-ingested ones are skipped)
+  python -m ai.healing.failure_store ingest reports/ --db reports/failures.db
+
+  # Error type counts and the flakiest tests over the stored history
+  python -m ai.healing.failure_store stats --db reports/failures.db
+  python -m ai.healing.failure_store flaky --db reports/failures.db
+"""
+import argparse
+import os
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from . import report_analyzer as ra
+from .matchers import compile_matchers
+from .message_cache import ClassificationCache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    content_hash TEXT NOT NULL UNIQUE,
+    size INTEGER,
+    mtime REAL,
+    started_at REAL,
+    ingested_at REAL,
+    results INTEGER DEFAULT 0,
+    failures INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS results (
+    result_id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    suite TEXT,
+    test_title TEXT,
+    project TEXT,
+    status TEXT,
+    retry INTEGER,
+    duration_ms REAL,
+    started_at REAL
+);
+CREATE TABLE IF NOT EXISTS failures (
+    failure_id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    result_id INTEGER NOT NULL REFERENCES results(result_id) ON DELETE CASCADE,
+    suite TEXT,
+    test_title TEXT,
+    project TEXT,
+    error_type TEXT,
+    message_hash TEXT,
+    message TEXT,
+    file TEXT,
+    line INTEGER,
+    col INTEGER,
+    duration_ms REAL,
+    started_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_path ON runs(path, size, mtime);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_results_title ON results(test_title);
+CREATE INDEX IF NOT EXISTS idx_failures_title ON failures(test_title);
+CREATE INDEX IF NOT EXISTS idx_failures_type ON failures(error_type);
+CREATE INDEX IF NOT EXISTS idx_failures_started ON failures(started_at);
+CREATE INDEX IF NOT EXISTS idx_failures_hash ON failures(message_hash);
+"""
+
+
+def _to_epoch(value: Any) -> Optional[float]:
+    """Convert an ISO-8601 string or epoch number into epoch seconds."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def _time_filter(column: str, since: Optional[float], until: Optional[float], clauses: List[str], params: List[Any]) -> None:
+    if since is not None:
+        clauses.append(f'{column} >= ?')
+        params.append(since)
+    if until is not None:
+        clauses.append(f'{column} < ?')
+        params.append(until)
+
+
+class FailureStore:
+    """SQLite-backed history of test results and failures."""
+
+    def __init__(self, db_path: str = 'reports/failures.db', matchers=None):
+        out_dir = os.path.dirname(db_path)
+        if out_dir and db_path != ':memory:':
+            os.makedirs(out_dir, exist_ok=True)
+        self.db_path = db_path
+        self.matchers = compile_matchers(ra.DEFAULT_MATCHERS if matchers is None else matchers)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> 'FailureStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- ingestion -----------------------------------------------------
+
+    def ingest(self, path: str, stream: bool = True) -> Optional[int]:
+        """Store every result and failure of the report at `path`.
+
+        Returns the new run id, or None when the report was already ingested.
+        """
+        st = os.stat(path)
+        abs_path = os.path.abspath(path)
+        if self.conn.execute('SELECT 1 FROM runs WHERE path = ? AND size = ? AND mtime = ?',
+                             (abs_path, st.st_size, st.st_mtime)).fetchone():
+            return None
+        content_hash = ra.report_digest(path)
+        if self.conn.execute('SELECT 1 FROM runs WHERE content_hash = ?', (content_hash,)).fetchone():
+            return None
+
+        meta: Dict[str, Any] = {}
+        with self.conn:
+            cur = self.conn.execute(
+                'INSERT INTO runs (path, content_hash, size, mtime, started_at, ingested_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (abs_path, content_hash, st.st_size, st.st_mtime, st.st_mtime, time.time()))
+            run_id = cur.lastrowid
+            n_results = n_failures = 0
+            for record in ra.iter_result_records(path=path, stream=stream, meta=meta):
+                started = _to_epoch(record.get('start_time'))
+                cur = self.conn.execute(
+                    'INSERT INTO results (run_id, suite, test_title, project, status, retry, duration_ms, started_at)'
+                    ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (run_id, record['suite'], record['test_title'], record['project'], record['status'],
+                     record['retry'], record['duration'], started))
+                result_id = cur.lastrowid
+                n_results += 1
+                rows = []
+                for msg in record['errors']:
+                    text = ra.message_text(msg)
+                    matched = ra.classify_message(text, self.matchers)
+                    loc = ra.message_location(msg, text) or {}
+                    rows.append((run_id, result_id, record['suite'], record['test_title'], record['project'],
+                                 self.matchers[matched[0]][1] if matched else 'Others',
+                                 ClassificationCache.key(text).hex(), text,
+                                 loc.get('file'), loc.get('line'), loc.get('col'), record['duration'], started))
+                if rows:
+                    self.conn.executemany(
+                        'INSERT INTO failures (run_id, result_id, suite, test_title, project, error_type, message_hash,'
+                        ' message, file, line, col, duration_ms, started_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        rows)
+                    n_failures += len(rows)
+            started_at = _to_epoch((meta.get('stats') or {}).get('startTime')) or st.st_mtime
+            self.conn.execute('UPDATE runs SET started_at = ?, results = ?, failures = ? WHERE run_id = ?',
+                              (started_at, n_results, n_failures, run_id))
+            # results without their own start time inherit the run's
+            self.conn.execute('UPDATE results SET started_at = ? WHERE run_id = ? AND started_at IS NULL', (started_at, run_id))
+            self.conn.execute('UPDATE failures SET started_at = ? WHERE run_id = ? AND started_at IS NULL', (started_at, run_id))
+        return run_id
+
+    def ingest_many(self, paths: Iterable[str], stream: bool = True) -> Dict[str, Optional[int]]:
+        """Ingest several reports; maps each path to its new run id (None when skipped)."""
+        return {path: self.ingest(path, stream=stream) for path in paths}
+
+    # -- queries -------------------------------------------------------
+
+    def runs(self) -> List[Dict[str, Any]]:
+        return [dict(r) for r in self.conn.execute('SELECT * FROM runs ORDER BY started_at')]
+
+    def error_stats(self, since: Optional[float] = None, until: Optional[float] = None,
+                    test_title: Optional[str] = None, dedupe: bool = True) -> Counter:
+        """Counter of error types; with dedupe each (run, test, error type) counts once."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        _time_filter('started_at', since, until, clauses, params)
+        if test_title is not None:
+            clauses.append('test_title = ?')
+            params.append(test_title)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        count = 'COUNT(DISTINCT run_id || char(0) || test_title)' if dedupe else 'COUNT(*)'
+        rows = self.conn.execute(f'SELECT error_type, {count} AS n FROM failures {where} GROUP BY error_type', params)
+        return Counter({r['error_type']: r['n'] for r in rows})
+
+    def failures(self, test_title: Optional[str] = None, error_type: Optional[str] = None,
+                 since: Optional[float] = None, until: Optional[float] = None,
+                 limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return failure rows (newest first) filtered by test title, error type and time."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if test_title is not None:
+            clauses.append('test_title = ?')
+            params.append(test_title)
+        if error_type is not None:
+            clauses.append('error_type = ?')
+            params.append(error_type)
+        _time_filter('started_at', since, until, clauses, params)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        sql = f'SELECT * FROM failures {where} ORDER BY started_at DESC'
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+        return [dict(r) for r in self.conn.execute(sql, params)]
+
+    def test_history(self, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Per-test aggregates: runs, results, failed results, mean/max duration, last seen."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        _time_filter('started_at', since, None, clauses, params)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self.conn.execute(
+            'SELECT suite, test_title, COUNT(DISTINCT run_id) AS runs, COUNT(*) AS results,'
+            " SUM(CASE WHEN status IN ('failed', 'timedOut', 'interrupted') THEN 1 ELSE 0 END) AS failed,"
+            ' AVG(duration_ms) AS mean_duration_ms, MAX(duration_ms) AS max_duration_ms, MAX(started_at) AS last_seen'
+            f' FROM results {where} GROUP BY suite, test_title', params)
+        return [dict(r) for r in rows]
+
+    def flaky_tests(self, min_runs: int = 2, limit: int = 20) -> List[Dict[str, Any]]:
+        """Tests that both passed and failed across runs, ordered by failure rate."""
+        rows = self.conn.execute(
+            'SELECT test_title, COUNT(DISTINCT run_id) AS runs,'
+            " COUNT(DISTINCT CASE WHEN status IN ('failed', 'timedOut', 'interrupted') THEN run_id END) AS failed_runs,"
+            " COUNT(DISTINCT CASE WHEN status = 'passed' THEN run_id END) AS passed_runs"
+            ' FROM results GROUP BY test_title HAVING runs >= ? AND failed_runs > 0 AND passed_runs > 0'
+            ' ORDER BY CAST(failed_runs AS REAL) / runs DESC, runs DESC LIMIT ?', (min_runs, limit))
+        return [dict(r) for r in rows]
+
+
+def main():
+    from .batch_analyzer import find_reports
+
+    parser = argparse.ArgumentParser(description='Ingest test reports into and query the failure store')
+    parser.add_argument('--db', default='reports/failures.db', help='SQLite database path')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_ingest = sub.add_parser('ingest', help='Ingest a report file, directory or glob')
+    p_ingest.add_argument('target')
+    sub.add_parser('stats', help='Print error type counts')
+    p_flaky = sub.add_parser('flaky', help='Print tests that both passed and failed')
+    p_flaky.add_argument('--min-runs', type=int, default=2)
+    p_flaky.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    with FailureStore(args.db) as store:
+        if args.command == 'ingest':
+            paths = find_reports(args.target)
+            added = 0
+            for path in paths:
+                run_id = store.ingest(path)
+                added += run_id is not None
+                print(f"{path}: {'ingested as run ' + str(run_id) if run_id else 'already ingested'}")
+            print(f'{added} new of {len(paths)} reports')
+        elif args.command == 'stats':
+            for err_type, count in store.error_stats().most_common():
+                print(f'{count:6d}  {err_type}')
+        elif args.command == 'flaky':
+            for row in store.flaky_tests(min_runs=args.min_runs, limit=args.limit):
+                print(f"{row['failed_runs']:4d}/{row['runs']:<4d}  {row['test_title']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""Persistent, content-addressed cache of healing results.
+
+The same broken selector against the same page shows up in many failing tests
+of a run (shared page objects, retries, browser projects). `HealingCache` keys
+each `heal` result by a hash of (normalized DOM snapshot, broken selector,
+heuristic version) and keeps it in a small SQLite database, so repeated
+failures skip parsing and suggestion entirely. The database is bounded by
+entry count and total size, evicting the least recently used entries, and
+keeps hit/miss counters that are shared by every process using it. Entry and
+byte totals are kept in those counters by triggers, so a put never scans the
+table; eviction reads only the oldest rows, through the `last_access` index.
+
+Usage examples:
+  # Hit rate and size of the default cache
+  python -m ai.healing.healing_cache stats
+
+  # Drop every cached result (e.g. after editing the heuristics locally)
+  python -m ai.healing.healing_cache --db reports/healing-cache.db clear
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_PATH = 'reports/healing-cache.db'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL,
+    last_access REAL,
+    hits INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# keep the `entries` and `bytes` counters in step with the table
+_TOTAL_TRIGGERS = (
+    """CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+        UPDATE counters SET value = value + 1 WHERE name = 'entries';
+        UPDATE counters SET value = value + new.size WHERE name = 'bytes';
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+        UPDATE counters SET value = value - 1 WHERE name = 'entries';
+        UPDATE counters SET value = value - old.size WHERE name = 'bytes';
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS entries_resize AFTER UPDATE OF size ON entries BEGIN
+        UPDATE counters SET value = value + new.size - old.size WHERE name = 'bytes';
+    END""",
+)
+
+_BETWEEN_TAGS_RE = re.compile(r'>\s+<')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_dom(html: str) -> str:
+    """Collapse whitespace so snapshots differing only in formatting share a key."""
+    return _SPACE_RE.sub(' ', _BETWEEN_TAGS_RE.sub('><', html or '')).strip()
+
+
+def cache_key(html: str, selector: Optional[str], version: str) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    for part in (normalize_dom(html), selector or '', version):
+        digest.update(part.encode('utf-8', errors='surrogatepass'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class HealingCache:
+    """SQLite-backed LRU of healing results, bounded by entry count and total bytes."""
+
+    def __init__(self, db_path: str = DEFAULT_PATH, max_entries: int = 10000, max_bytes: int = 256 << 20):
+        out_dir = os.path.dirname(db_path)
+        if out_dir and db_path != ':memory:':
+            os.makedirs(out_dir, exist_ok=True)
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # hits and misses of this instance; the database keeps the totals
+        self.hits = 0
+        self.misses = 0
+        # batch healing workers share the file: wait for each other's writes; threads
+        # of one process (the service's thread pool) share the connection under a lock
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.conn.row_factory = sqlite3.Row
+        if db_path != ':memory:':
+            self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.executescript(_SCHEMA)
+        self._init_totals()
+
+    def _init_totals(self) -> None:
+        """Install the total triggers, seeding the totals from the table (once per database)."""
+        with self.conn:
+            # one write transaction, so no entry lands between counting and the triggers
+            self.conn.execute('BEGIN IMMEDIATE')
+            installed = self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' "
+                                          "AND name = 'entries_insert'").fetchone()
+            if installed:
+                return
+            count, total = self.conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+            self.conn.executemany('INSERT OR REPLACE INTO counters(name, value) VALUES (?, ?)',
+                                  [('entries', count), ('bytes', total)])
+            for trigger in _TOTAL_TRIGGERS:
+                self.conn.execute(trigger)
+
+    def _totals(self) -> Tuple[int, int]:
+        rows = dict(self.conn.execute("SELECT name, value FROM counters WHERE name IN ('entries', 'bytes')"))
+        return rows.get('entries', 0), rows.get('bytes', 0)
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    def __enter__(self) -> 'HealingCache':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _count(self, name: str) -> None:
+        self.conn.execute('INSERT INTO counters(name, value) VALUES (?, 1) '
+                          'ON CONFLICT(name) DO UPDATE SET value = value + 1', (name,))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for `key`, or None, and record the hit or miss."""
+        with self._lock, self.conn:
+            row = self.conn.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                self._count('misses')
+                return None
+            self.hits += 1
+            self._count('hits')
+            self.conn.execute('UPDATE entries SET last_access = ?, hits = hits + 1 WHERE key = ?', (time.time(), key))
+        return json.loads(row['value'])
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a result, then evict least recently used entries beyond the bounds."""
+        data = json.dumps(value, default=str)
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute('INSERT INTO entries(key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?) '
+                              'ON CONFLICT(key) DO UPDATE SET value = excluded.value, size = excluded.size, '
+                              'created_at = excluded.created_at, last_access = excluded.last_access, hits = 0',
+                              (key, data, len(data), now, now))
+            self._evict()
+
+    def _evict(self) -> None:
+        count, total = self._totals()
+        evict = max(0, count - self.max_entries)
+        surplus = total - self.max_bytes
+        if surplus > 0:
+            # walk the oldest entries only as far as the bytes to free
+            rows = 0
+            for (size,) in self.conn.execute('SELECT size FROM entries ORDER BY last_access'):
+                rows += 1
+                surplus -= size
+                if surplus <= 0:
+                    break
+            evict = max(evict, rows)
+        if not evict:
+            return
+        self.conn.execute('DELETE FROM entries WHERE key IN '
+                          '(SELECT key FROM entries ORDER BY last_access LIMIT ?)', (evict,))
+        self.conn.execute('INSERT INTO counters(name, value) VALUES (?, ?) '
+                          'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value', ('evictions', evict))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the totals recorded in the database: hits, misses, hit_rate, evictions, entries, bytes."""
+        with self._lock:
+            counters = {row['name']: row['value'] for row in self.conn.execute('SELECT name, value FROM counters')}
+        hits, misses = counters.get('hits', 0), counters.get('misses', 0)
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+            'evictions': counters.get('evictions', 0),
+            'entries': counters.get('entries', 0),
+            'bytes': counters.get('bytes', 0),
+        }
+
+    def clear(self) -> None:
+        with self._lock, self.conn:
+            # the triggers bring the entry and byte totals back to 0
+            self.conn.execute('DELETE FROM entries')
+            self.conn.execute("DELETE FROM counters WHERE name NOT IN ('entries', 'bytes')")
+
+
+_open_caches: Dict[str, HealingCache] = {}
+_open_caches_lock = threading.Lock()
+
+
+def open_cache(db_path: str = DEFAULT_PATH) -> HealingCache:
+    """Return this process's `HealingCache` for `db_path`, opening it on first use (shared by its threads)."""
+    with _open_caches_lock:
+        cache = _open_caches.get(db_path)
+        if cache is None:
+            cache = _open_caches[db_path] = HealingCache(db_path)
+        return cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or clear the healing result cache')
+    parser.add_argument('--db', default=DEFAULT_PATH, help='SQLite database path')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats', help='Print hit rate, evictions and size')
+    sub.add_parser('clear', help='Remove every entry and reset the counters')
+    args = parser.parse_args()
+
+    with HealingCache(args.db) as cache:
+        if args.command == 'stats':
+            stats = cache.stats()
+            print(f"{stats['entries']} entries, {stats['bytes'] / 1024:.1f} KiB")
+            print(f"{stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate), "
+                  f"{stats['evictions']} evictions")
+        elif args.command == 'clear':
+            cache.clear()
+            print(f'Cleared {args.db}')
+
+
+if __name__ == '__main__':
+    main()
@@ -3,19 +3,78 @@
 Expose a small, framework-agnostic `heal` function that accepts either a
 trace path or already-parsed trace data. Returns a structured dict with
 diagnosis and suggestions.
+
+Playwright traces are read through their `trace_index.TraceIndex` sidecar, so
+healing the same trace again does not rescan the archive. When NumPy is
+installed, suggestions are ordered by `locator_scoring.rank_candidates`.
+Given a `healing_cache.HealingCache`, results are reused for any failure with
+the same DOM snapshot and broken selector.
+
+BeautifulSoup and NumPy are imported on first use, so importing this module
+(e.g. for a cached or trace-only code path) stays cheap.
 """
-from typing import Any, Dict, Optional
+import functools
+import importlib.util
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .healing_cache import HealingCache, cache_key
 from .trace_parser import extract_trace_data
-from .dom_analyzer import analyze_dom
-from .locator_recovery import suggest_alternative_locator
+from .trace_index import TraceIndex
+
+logger = logging.getLogger(__name__)
+
+MAX_SUGGESTIONS = 5
+# bump when analysis or suggestion logic changes, so cached results are not reused
+HEURISTIC_VERSION = '1' + ('+ranked' if importlib.util.find_spec('numpy') is not None else '')
+
+
+@functools.lru_cache(maxsize=None)
+def ranker() -> Optional[Callable[..., List[Dict[str, Any]]]]:
+    """Return `locator_scoring.rank_candidates`, or None when NumPy is not installed."""
+    try:
+        from .locator_scoring import rank_candidates
+    except ImportError:  # numpy is optional; fall back to the heuristic suggestions
+        return None
+    return rank_candidates
 
 
-def heal(trace_path: Optional[str] = None, trace_data: Optional[Any] = None) -> Dict[str, Any]:
+def rank_suggestions(document: Any, broken_selector: Optional[str], suggestions: List[str],
+                     max_suggestions: int = MAX_SUGGESTIONS) -> Tuple[List[str], Optional[List[Dict[str, Any]]]]:
+    """Put the ranked candidates ahead of the heuristic `suggestions`; returns (suggestions, ranked or None)."""
+    rank_candidates = ranker()
+    if rank_candidates is None:
+        return suggestions, None
+    ranked = rank_candidates(document, broken_selector, top_k=max_suggestions)
+    merged = [r['selector'] for r in ranked]
+    merged += [s for s in suggestions if s not in merged]
+    return merged[:max_suggestions], ranked
+
+
+def _load_trace(trace_path: str, use_index: bool = True) -> Optional[Any]:
+    """Return the failure context of a trace, from its index when it is a Playwright trace."""
+    if use_index:
+        try:
+            index = TraceIndex.load(trace_path)
+        except Exception as e:
+            logger.debug(f'Trace index unavailable for {trace_path}: {e}')
+        else:
+            if index is not None:
+                return index.failure()
+    return extract_trace_data(trace_path)
+
+
+def heal(trace_path: Optional[str] = None, trace_data: Optional[Any] = None, use_index: bool = True,
+         cache: Optional[HealingCache] = None) -> Dict[str, Any]:
     """Attempt to heal from a trace file or trace data.
 
-    Returns a dict with keys: ok (bool), reason (str), selector (opt), suggestions (list)
+    With use_index (default), Playwright traces are read via their sidecar index.
+    With a `cache`, a result already computed for the same snapshot and selector
+    is returned with `cached` set instead of being recomputed.
+    Returns a dict with keys: ok (bool), reason (str), selector (opt), suggestions (list).
+    With NumPy available, suggestions start with the ranked candidates and the
+    result has `ranked` (selector, score, confidence and features of each).
     """
-    trace = trace_data or (extract_trace_data(trace_path) if trace_path else None)
+    trace = trace_data or (_load_trace(trace_path, use_index) if trace_path else None)
     if not trace:
         return {"ok": False, "reason": "No trace data found", "suggestions": []}
 
@@ -38,10 +97,34 @@ def heal(trace_path: Optional[str] = None, trace_data: Optional[Any] = None) ->
     if not html:
         return {"ok": False, "reason": "No DOM snapshot found in trace", "suggestions": []}
 
-    analysis = analyze_dom(html, broken_selector)
+    if cache is None:
+        return _diagnose(html, broken_selector)
+    key = cache_key(html, broken_selector, HEURISTIC_VERSION)
+    result = cache.get(key)
+    if result is not None:
+        result['cached'] = True
+        return result
+    result = _diagnose(html, broken_selector)
+    cache.put(key, result)
+    return result
+
+
+def _diagnose(html: str, broken_selector: Optional[str]) -> Dict[str, Any]:
+    """Check `broken_selector` against the snapshot and propose alternatives when it is missing."""
+    from .dom_analyzer import analyze_dom
+    from .dom_document import parse_dom
+    from .locator_recovery import suggest_alternative_locator
+
+    # parse once; both helpers share the document
+    document = parse_dom(html)
+    analysis = analyze_dom(document, broken_selector)
     if analysis.get('matches', 0) > 0:
         return {"ok": True, "reason": "Selector found", "selector": broken_selector, "matches": analysis.get('matches'), "samples": analysis.get('samples', [])}
 
     # propose alternatives
-    suggestions = suggest_alternative_locator(html, broken_selector)
-    return {"ok": False, "reason": "Selector not found", "selector": broken_selector, "suggestions": suggestions, "analysis": analysis}
\ No newline at end of file
+    suggestions = suggest_alternative_locator(document, broken_selector)
+    suggestions, ranked = rank_suggestions(document, broken_selector, suggestions)
+    result = {"ok": False, "reason": "Selector not found", "selector": broken_selector, "suggestions": suggestions, "analysis": analysis}
+    if ranked is not None:
+        result['ranked'] = ranked
+    return result
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""Incremental analysis of a growing set of reports.
+
+`IncrementalAnalyzer` keeps a JSON manifest of the reports it has processed
+(path, size, mtime, content hash) together with each report's aggregates
+(`ReportAnalysis.to_dict()`) and the running totals. On every `update` only new
+or changed reports are analyzed; their deltas are applied to the totals, so
+the cost is proportional to the new data instead of the whole history.
+
+Messages no matcher recognised are kept as counts per (suite, test title,
+message) in `IncrementalAnalyzer.others`, at most `MAX_OTHERS` distinct ones
+per report, so removing a report costs the size of its sample; the totals' own
+`others` list stays empty.
+
+Usage example (via the batch CLI):
+  python -m ai.healing.batch_analyzer reports/ --incremental reports/manifest.json
+"""
+import json
+import os
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+from .batch_analyzer import iter_analyze_many
+from .matchers import compile_matchers
+from .report_analyzer import DEFAULT_MATCHERS, ReportAnalysis, report_digest
+
+MANIFEST_VERSION = 2
+# distinct unmatched messages kept per report, the most frequent first
+MAX_OTHERS = 100
+
+
+def _count_others(others: Iterable[Any]) -> Counter:
+    """Counts of the `MAX_OTHERS` most frequent (suite, test_title, message) of a report."""
+    return Counter(dict(Counter(tuple(o) for o in others).most_common(MAX_OTHERS)))
+
+
+def _dump_others(others: Counter) -> List[List[Any]]:
+    return [[*key, count] for key, count in others.items()]
+
+
+def _load_others(rows: Iterable[List[Any]]) -> Counter:
+    return Counter({tuple(row[:3]): row[3] for row in rows})
+
+
+def _apply(totals: ReportAnalysis, aggregate: ReportAnalysis, sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) a report's aggregates (without `others`) from the running totals."""
+    if sign > 0:
+        totals.merge(aggregate)
+        return
+    totals.stats.subtract(aggregate.stats)
+    totals.stats = +totals.stats
+    for target, source in ((totals.by_suite, aggregate.by_suite), (totals.by_test, aggregate.by_test)):
+        for name, counts in source.items():
+            remaining = target.get(name)
+            if remaining is None:
+                continue
+            remaining.subtract(counts)
+            remaining = +remaining
+            if remaining:
+                target[name] = remaining
+            else:
+                del target[name]
+    totals.tests -= aggregate.tests
+    totals.messages -= aggregate.messages
+
+
+class IncrementalAnalyzer:
+    """Maintain running analysis totals over reports, re-analyzing only what changed."""
+
+    def __init__(self, manifest_path: str, dedupe: bool = True, matchers=None):
+        self.manifest_path = manifest_path
+        self.dedupe = dedupe
+        self.matchers = compile_matchers(DEFAULT_MATCHERS if matchers is None else matchers)
+        self.reports: Dict[str, Dict[str, Any]] = {}
+        self.totals = ReportAnalysis()
+        # (suite, test_title, message) -> count of unmatched messages, over every report's sample
+        self.others: Counter = Counter()
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.manifest_path):
+            return
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        # cached aggregates are only valid for the same matchers and dedupe setting
+        if (manifest.get('version') != MANIFEST_VERSION or manifest.get('dedupe') != self.dedupe
+                or manifest.get('matchers') != self.matchers.signature):
+            return
+        self.reports = manifest.get('reports', {})
+        self.totals = ReportAnalysis.from_dict(manifest.get('totals', {}))
+        self.others = _load_others(manifest.get('others', []))
+
+    def save(self) -> None:
+        """Atomically write the manifest."""
+        out_dir = os.path.dirname(self.manifest_path)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': MANIFEST_VERSION,
+                'dedupe': self.dedupe,
+                'matchers': self.matchers.signature,
+                'reports': self.reports,
+                'totals': self.totals.to_dict(),
+                'others': _dump_others(self.others),
+            }, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _remove(self, entry: Dict[str, Any]) -> None:
+        _apply(self.totals, ReportAnalysis.from_dict(entry['aggregate']), -1)
+        # per key, so the cost follows the report's sample rather than the totals
+        for key, count in _load_others(entry['others']).items():
+            left = self.others[key] - count
+            if left > 0:
+                self.others[key] = left
+            else:
+                self.others.pop(key, None)
+
+    def _changed(self, paths: Iterable[str]) -> Dict[str, str]:
+        """Map new or content-changed paths to their hash, refreshing stat info of merely touched files."""
+        changed = {}
+        for path in paths:
+            st = os.stat(path)
+            entry = self.reports.get(path)
+            if entry and entry['size'] == st.st_size and entry['mtime'] == st.st_mtime:
+                continue
+            digest = report_digest(path)
+            if entry and entry['hash'] == digest:
+                entry['size'], entry['mtime'] = st.st_size, st.st_mtime
+                continue
+            changed[path] = digest
+        return changed
+
+    def update(self, paths: Iterable[str], workers: Optional[int] = 1, prune: bool = True, save: bool = True) -> Dict[str, Any]:
+        """Bring the totals up to date with `paths` and return what was done.
+
+        New and changed reports are analyzed (in parallel when workers != 1); with
+        prune, reports that disappeared from `paths` are removed from the totals.
+        """
+        paths = [os.path.abspath(p) for p in paths]
+        summary: Dict[str, Any] = {'added': [], 'changed': [], 'removed': [], 'failed': {}, 'unchanged': 0}
+        if prune:
+            current = set(paths)
+            for path in [p for p in self.reports if p not in current]:
+                self._remove(self.reports.pop(path))
+                summary['removed'].append(path)
+
+        todo = self._changed(paths)
+        summary['unchanged'] = len(paths) - len(todo)
+        for path, result, error in iter_analyze_many(list(todo), workers=workers, dedupe=self.dedupe, matchers=self.matchers):
+            if result is None:
+                summary['failed'][path] = error
+                continue
+            previous = self.reports.get(path)
+            if previous is not None:
+                self._remove(previous)
+                summary['changed'].append(path)
+            else:
+                summary['added'].append(path)
+            # only aggregates are tracked incrementally; unmatched messages as capped counts
+            others = _count_others(result.others)
+            result.suggestions = []
+            result.others = []
+            _apply(self.totals, result, 1)
+            self.others.update(others)
+            st = os.stat(path)
+            self.reports[path] = {
+                'size': st.st_size,
+                'mtime': st.st_mtime,
+                'hash': todo[path],
+                'aggregate': result.to_dict(),
+                'others': _dump_others(others),
+            }
+        if save:
+            self.save()
+        return summary
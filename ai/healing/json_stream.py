@@ -0,0 +1,184 @@
+"""Incremental JSON reading helpers.
+
+Provide a small pull parser over a text stream so large JSON documents (for
+example multi-hundred MB Playwright reports) can be walked one value at a time
+instead of being materialized with `json.load`. Only the standard library is
+used: scalars and small sub-documents are decoded with `json.JSONDecoder.raw_decode`
+and unwanted values are skipped without building Python objects.
+"""
+import json
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
+
+_WS = re.compile(r'[ \t\n\r]*')
+# run of characters that are neither structural nor the start of a string
+_PLAIN = re.compile(r'[^"{}\[\]]*')
+# body of a JSON string up to (not including) the closing quote
+_STRING_BODY = re.compile(r'(?:[^"\\]|\\.)*', re.S)
+_DECODER = json.JSONDecoder()
+
+
+class JsonStream:
+    """Pull parser reading a JSON document from `fp` in chunks.
+
+    The stream keeps only the unconsumed tail of the current chunk in memory.
+    Use `iter_object`/`iter_array` to descend into containers, `read_value` to
+    decode the next value and `skip_value` to discard it.
+    """
+
+    def __init__(self, fp: TextIO, chunk_size: int = 1 << 16):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, min_size: int = 0) -> bool:
+        """Append at least one chunk to the buffer; return False at end of input."""
+        if self._eof:
+            return False
+        data = self._fp.read(max(self._chunk_size, min_size))
+        if not data:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at end)."""
+        while True:
+            self._pos = _WS.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found or 'end of input'!r}")
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """Decode and return the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # value continues past the buffer: grow geometrically to keep retries cheap
+                if not self._fill(len(self._buf) - self._pos):
+                    raise
+                continue
+            # a number ending exactly at the buffer edge may be truncated
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def skip_value(self) -> None:
+        """Consume the next JSON value without building it."""
+        first = self.peek()
+        if first == '"':
+            self._pos += 1
+            self._skip_string_body()
+            return
+        if first not in ('{', '['):
+            self.read_value()
+            return
+        depth = 0
+        while True:
+            self._pos = _PLAIN.match(self._buf, self._pos).end()
+            if self._pos >= len(self._buf):
+                if not self._fill():
+                    raise ValueError('Unexpected end of input while skipping value')
+                continue
+            char = self._buf[self._pos]
+            self._pos += 1
+            if char == '"':
+                self._skip_string_body()
+            elif char in '{[':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def _skip_string_body(self) -> None:
+        while True:
+            self._pos = _STRING_BODY.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf) and self._buf[self._pos] == '"':
+                self._pos += 1
+                return
+            # buffer ended inside the string (possibly right after a backslash)
+            if not self._fill():
+                raise ValueError('Unterminated string')
+
+    def iter_object(self) -> Iterator[str]:
+        """Yield the keys of the next object; the caller must consume each value.
+
+        A non-object value (e.g. null) is skipped and yields nothing.
+        """
+        if self.peek() != '{':
+            self.skip_value()
+            return
+        self._pos += 1
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(':')
+            yield key
+            sep = self.peek()
+            self._pos += 1
+            if sep == '}':
+                return
+            if sep != ',':
+                raise ValueError(f"Expected ',' or '}}' in object but found {sep or 'end of input'!r}")
+
+    def iter_array(self) -> Iterator[None]:
+        """Yield once per element of the next array; the caller must consume each element.
+
+        A non-array value (e.g. null) is skipped and yields nothing.
+        """
+        if self.peek() != '[':
+            self.skip_value()
+            return
+        self._pos += 1
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield None
+            sep = self.peek()
+            self._pos += 1
+            if sep == ']':
+                return
+            if sep != ',':
+                raise ValueError(f"Expected ',' or ']' in array but found {sep or 'end of input'!r}")
+
+    def read_object(self, fields: Optional[Dict[str, Callable[['JsonStream'], Any]]] = None,
+                    skip: frozenset = frozenset()) -> Any:
+        """Read the next object, using `fields` readers for selected keys and dropping `skip` keys."""
+        if self.peek() != '{':
+            return self.read_value()
+        obj: Dict[str, Any] = {}
+        for key in self.iter_object():
+            if key in skip:
+                self.skip_value()
+            elif fields and key in fields:
+                obj[key] = fields[key](self)
+            else:
+                obj[key] = self.read_value()
+        return obj
+
+    def read_array(self, reader: Callable[['JsonStream'], Any]) -> Any:
+        """Read the next array, decoding every element with `reader`."""
+        if self.peek() != '[':
+            return self.read_value()
+        items: List[Any] = []
+        for _ in self.iter_array():
+            items.append(reader(self))
+        return items
@@ -2,29 +2,36 @@
 
 Provide functions that, given an HTML snapshot (or soup) and a broken selector,
 try to propose alternative locators (css selectors or textual heuristics).
+HTML is parsed through the shared `dom_document.parse_dom` cache.
 """
 from bs4 import BeautifulSoup
 from typing import List, Optional, Union
 import logging
 
-logging.basicConfig(level=logging.INFO)
+from .dom_document import DomDocument, parse_dom
 
+# attributes (besides id and class) whose values are matched against broken selector tokens
+SUGGESTED_ATTRIBUTES = ('data-testid', 'name', 'aria-label')
 
-def to_soup(html_or_soup: Union[str, BeautifulSoup]) -> BeautifulSoup:
-    if isinstance(html_or_soup, BeautifulSoup):
-        return html_or_soup
-    return BeautifulSoup(html_or_soup or "", 'html.parser')
+logger = logging.getLogger(__name__)
 
 
-def suggest_alternative_locator(html_or_soup: Union[str, BeautifulSoup], broken_selector: Optional[str] = None, max_suggestions: int = 5) -> List[str]:
+def to_soup(html_or_soup: Union[str, BeautifulSoup, DomDocument]) -> BeautifulSoup:
+    return parse_dom(html_or_soup).soup
+
+
+def suggest_alternative_locator(html_or_soup: Union[str, BeautifulSoup, DomDocument], broken_selector: Optional[str] = None, max_suggestions: int = 5) -> List[str]:
     """Return a list of suggested locators.
 
     Strategies:
-    - suggest elements with similar attributes (id, name, class)
+    - suggest elements with similar attributes (id, class, data-testid, name, aria-label)
     - suggest by visible text for buttons/links
     - suggest positional selectors as a last resort
+
+    Candidates come from the document's attribute index (`DomDocument.index`), which
+    is built once per snapshot and reused for every broken selector.
     """
-    soup = to_soup(html_or_soup)
+    index = parse_dom(html_or_soup).index
     suggestions: List[str] = []
 
     # 1) If broken_selector is provided, try to find nearby elements by tag
@@ -35,22 +42,27 @@ def suggest_alternative_locator(html_or_soup: Union[str, BeautifulSoup], broken_
             for token in tokens:
                 token = token.strip('.#')
                 # id match
-                el = soup.find(id=lambda i: i and token in i)
-                if el:
-                    sel = f"#{el.get('id')}"
-                    suggestions.append(sel)
+                el = index.find('id', token)
+                if el is not None:
+                    suggestions.append(f"#{el.get('id')}")
                 # class match
-                elc = soup.find(class_=lambda c: c and token in ' '.join(c))
-                if elc:
-                    cls = ' '.join(elc.get('class', [])).split()[0]
-                    suggestions.append(f".{cls}")
+                elc = index.find('class', token)
+                if elc is not None:
+                    suggestions.append(f".{elc.get('class')[0]}")
+                # test id / form name / accessible name match (too noisy for very short tokens)
+                for attr in SUGGESTED_ATTRIBUTES if len(token) >= 3 else ():
+                    ela = index.find(attr, token)
+                    if ela is not None:
+                        sel = f'[{attr}="{ela.get(attr)}"]'
+                        if sel not in suggestions:
+                            suggestions.append(sel)
 
     except Exception:
-        logging.debug("Error searching by broken_selector heuristics", exc_info=True)
+        logger.debug("Error searching by broken_selector heuristics", exc_info=True)
 
     # 2) Suggest by visible text for common tags
-    for tag in soup.find_all(['button', 'a', 'input']):
-        text = (tag.get_text(strip=True) or tag.get('value') or '').strip()
+    for tag in index.tags(['button', 'a', 'input']):
+        text = (index.text(tag) or tag.get('value') or '').strip()
         if text:
             sel = f"{tag.name}:has-text('{text[:80]}')"
             if sel not in suggestions:
@@ -61,10 +73,10 @@ def suggest_alternative_locator(html_or_soup: Union[str, BeautifulSoup], broken_
     # 3) As fallback, give nth-of-type suggestions for first few elements of a tag
     if not suggestions:
         for tag_name in ['button', 'a', 'input', 'div', 'span']:
-            els = soup.find_all(tag_name)
+            els = index.tags([tag_name])
             for idx, el in enumerate(els[:3], start=1):
                 suggestions.append(f"{tag_name}:nth-of-type({idx})")
             if suggestions:
                 break
 
-    return suggestions[:max_suggestions]
\ No newline at end of file
+    return suggestions[:max_suggestions]
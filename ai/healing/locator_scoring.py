@@ -0,0 +1,321 @@
+"""Ranked similarity scoring of locator candidates.
+
+Every interactive element of a snapshot (buttons, links, form controls and
+anything with a role or data-testid) becomes a row of features measured against
+the broken selector:
+
+- attr:    overlap of the selector's id/class/attribute words with the element's
+           id, class, name, data-testid, aria-label, placeholder and title words
+- text:    character-trigram similarity of the selector's text (or its words when
+           it has none) with the element's visible text
+- tag:     the element has the selector's tag
+- role:    the element's explicit or implicit ARIA role is the selector's role
+- depth:   how shallow the element is in the DOM
+- sibling: how early the element is among same-tag siblings
+- hidden:  the element is hidden (`hidden`, `type=hidden`, `aria-hidden=true`)
+
+Per-document arrays (hashed token and trigram ids with their owners, tag and
+role codes, depth, sibling position) are built once per `DomDocument` and
+cached; scoring a selector is then a handful of NumPy operations over all
+candidates at once, and `rank_candidates` returns the top-k with a locator and
+a softmax confidence for each.
+"""
+import re
+import weakref
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from bs4 import BeautifulSoup, Tag
+
+from .dom_document import DomDocument, parse_dom
+from .dom_index import normalize_text
+
+CANDIDATE_TAGS = ('button', 'a', 'input', 'select', 'textarea', 'label', 'summary', 'option')
+FEATURES = ('attr', 'text', 'tag', 'role', 'depth', 'sibling', 'hidden')
+WEIGHTS = np.array([0.45, 0.30, 0.10, 0.10, 0.02, 0.03, -0.50], dtype=np.float32)
+# candidates below this score only agree on depth/sibling position and are not suggested
+MIN_SCORE = 0.1
+# softmax temperature: a score margin of 0.1 makes a candidate ~7x as likely
+TEMPERATURE = 0.05
+TOKEN_ATTRIBUTES = ('id', 'class', 'name', 'data-testid', 'aria-label', 'placeholder', 'title')
+
+_WORD_RE = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+')
+_ID_RE = re.compile(r'#([\w-]+)')
+_CLASS_RE = re.compile(r'\.([A-Za-z_][\w-]*)')
+_QUOTED_RE = re.compile(r'"[^"]*"|\'[^\']*\'|\[[^\]]*\]')
+_ATTR_RE = re.compile(r'\[\s*([\w-]+)\s*[*^$|~]?=\s*(["\']?)(.*?)\2\s*[is]?\s*\]')
+_TEXT_RES = (
+    re.compile(r':(?:has-)?text(?:-is)?\(\s*(["\'])(.*?)\1\s*\)'),
+    re.compile(r'^(?:internal:)?text=(["\']?)(.*?)\1[is]?$'),
+)
+_ROLE_RE = re.compile(r'(?:internal:)?role=([\w-]+)')
+_TAG_RE = re.compile(r'^([A-Za-z][\w-]*)')
+_CSS_IDENT_RE = re.compile(r'^[A-Za-z][\w-]*$')
+
+_IMPLICIT_ROLES = {
+    'button': 'button', 'a': 'link', 'select': 'combobox', 'textarea': 'textbox', 'option': 'option',
+    'summary': 'button', 'label': 'label',
+}
+_INPUT_ROLES = {
+    'button': 'button', 'submit': 'button', 'reset': 'button', 'image': 'button', 'checkbox': 'checkbox',
+    'radio': 'radio', 'range': 'slider', 'search': 'searchbox', 'number': 'spinbutton',
+}
+
+_matrices: 'weakref.WeakKeyDictionary[DomDocument, CandidateMatrix]' = weakref.WeakKeyDictionary()
+
+
+def _hash(token: str) -> int:
+    return zlib.crc32(token.encode('utf-8'))
+
+
+def words(value: str) -> List[str]:
+    """Split an identifier or phrase into lower-case words (camelCase, kebab-case, snake_case)."""
+    return [w.lower() for w in _WORD_RE.findall(value)]
+
+
+def _attr_tokens(values: Iterable[str]) -> set:
+    tokens = set()
+    for value in values:
+        value = value.strip()
+        if not value:
+            continue
+        tokens.add('=' + value.lower())  # the whole value, so exact matches weigh more
+        tokens.update(words(value))
+    return tokens
+
+
+def _trigrams(text: str) -> set:
+    text = f' {normalize_text(text)} '
+    return {text[i:i + 3] for i in range(len(text) - 2)} if len(text) > 3 else set()
+
+
+def role_of(element: Tag) -> Optional[str]:
+    """Return the element's explicit role, else the implicit ARIA role of its tag."""
+    if element.get('role'):
+        return str(element.get('role')).split()[0].lower()
+    if element.name == 'input':
+        input_type = str(element.get('type') or 'text').lower()
+        return _INPUT_ROLES.get(input_type, 'textbox')
+    if element.name == 'a' and element.get('href') is None:
+        return None
+    return _IMPLICIT_ROLES.get(element.name)
+
+
+def parse_selector(selector: str) -> Dict[str, Any]:
+    """Pull the target tag, role, text and attribute words out of a CSS or Playwright selector."""
+    selector = selector or ''
+    last = re.split(r'\s*(?:>>|[\s>+~])\s*(?![^\[]*\])(?![^(]*\))', selector.strip())[-1] if selector.strip() else ''
+    tag_match = _TAG_RE.match(last)
+    tag = tag_match.group(1).lower() if tag_match and '=' not in last.split('[')[0] else None
+    role_match = _ROLE_RE.search(selector)
+    text = None
+    for pattern in _TEXT_RES:
+        match = pattern.search(selector)
+        if match:
+            text = match.group(2)
+            break
+    bare = _QUOTED_RE.sub(' ', selector)  # ids and classes outside attribute values and text
+    values = _ID_RE.findall(bare) + _CLASS_RE.findall(bare)
+    role = role_match.group(1).lower() if role_match else None
+    for name, _, value in _ATTR_RE.findall(selector):
+        if name == 'role':
+            role = value.lower()
+        elif name == 'name' and role_match and text is None:
+            # internal:role=button[name="Place order"i] names the accessible text
+            text = value
+        else:
+            values.append(value)
+    if role is None and tag:
+        role = _IMPLICIT_ROLES.get(tag)
+    if not values and text is None and not role_match and tag is None:
+        # free-form text such as "Place order"
+        text = selector
+    return {'tag': tag, 'role': role, 'text': text, 'values': values}
+
+
+class CandidateMatrix:
+    """Feature arrays for the interactive elements of one document."""
+
+    def __init__(self, document: DomDocument):
+        index = document.index
+        positions = set()
+        for tag in CANDIDATE_TAGS:
+            positions.update(index.by_tag.get(tag, ()))
+        for field in ('role', 'data-testid'):
+            for owners in index.fields[field].values.values():
+                positions.update(owners)
+        self.elements: List[Tag] = [index.elements[p] for p in sorted(positions)]
+        self.index = index
+        n = len(self.elements)
+
+        tag_codes: Dict[str, int] = {}
+        role_codes: Dict[str, int] = {}
+        self.tag_codes = tag_codes
+        self.role_codes = role_codes
+        tags = np.empty(n, dtype=np.int32)
+        roles = np.full(n, -1, dtype=np.int32)
+        depth = np.empty(n, dtype=np.float32)
+        sibling = np.empty(n, dtype=np.float32)
+        hidden = np.zeros(n, dtype=np.float32)
+        attr_ids: List[int] = []
+        attr_owner: List[int] = []
+        text_ids: List[int] = []
+        text_owner: List[int] = []
+        self.texts: List[str] = []
+        sibling_maps: Dict[int, Dict[int, int]] = {}
+        for row, element in enumerate(self.elements):
+            tags[row] = tag_codes.setdefault(element.name, len(tag_codes))
+            role = role_of(element)
+            if role:
+                roles[row] = role_codes.setdefault(role, len(role_codes))
+            depth[row] = sum(1 for _ in element.parents)
+            parent = element.parent
+            if parent is not None:
+                key = id(parent)
+                if key not in sibling_maps:
+                    counts: Dict[str, int] = {}
+                    positions_in_parent = {}
+                    for child in parent.children:
+                        if isinstance(child, Tag):
+                            positions_in_parent[id(child)] = counts.get(child.name, 0)
+                            counts[child.name] = counts.get(child.name, 0) + 1
+                    sibling_maps[key] = positions_in_parent
+                sibling[row] = sibling_maps[key].get(id(element), 0)
+            else:
+                sibling[row] = 0
+            if (element.has_attr('hidden') or str(element.get('type', '')).lower() == 'hidden'
+                    or str(element.get('aria-hidden', '')).lower() == 'true'):
+                hidden[row] = 1.0
+            values = []
+            for attr in TOKEN_ATTRIBUTES:
+                value = element.get(attr)
+                if value:
+                    values.extend(value if isinstance(value, list) else [value])
+            for token in _attr_tokens(values):
+                attr_ids.append(_hash(token))
+                attr_owner.append(row)
+            text = index.text(element)
+            if not text and element.name in ('input', 'textarea', 'select'):
+                text = element.get('value') or element.get('aria-label') or element.get('placeholder') or ''
+            self.texts.append(text)
+            for gram in _trigrams(text):
+                text_ids.append(_hash(gram))
+                text_owner.append(row)
+
+        self.size = n
+        self.tags = tags
+        self.roles = roles
+        max_depth = float(depth.max()) if n else 1.0
+        self.shallow = 1.0 - depth / max(max_depth, 1.0)
+        self.sibling = 1.0 / (1.0 + sibling)
+        self.hidden = hidden
+        self.attr_ids = np.array(attr_ids, dtype=np.uint32)
+        self.attr_owner = np.array(attr_owner, dtype=np.int32)
+        self.attr_norm = np.bincount(self.attr_owner, minlength=n).astype(np.float32)
+        self.text_ids = np.array(text_ids, dtype=np.uint32)
+        self.text_owner = np.array(text_owner, dtype=np.int32)
+        self.text_norm = np.bincount(self.text_owner, minlength=n).astype(np.float32)
+
+    def _cosine(self, ids: np.ndarray, owner: np.ndarray, norm: np.ndarray, query: Iterable[str]) -> np.ndarray:
+        q = np.unique(np.array([_hash(t) for t in query], dtype=np.uint32))
+        if not q.size or not ids.size:
+            return np.zeros(self.size, dtype=np.float32)
+        overlap = np.bincount(owner, weights=np.isin(ids, q, assume_unique=False), minlength=self.size)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cosine = overlap / np.sqrt(norm * q.size)
+        return np.nan_to_num(cosine).astype(np.float32)
+
+    def features(self, selector: str) -> np.ndarray:
+        """Return the (candidates x FEATURES) matrix for a broken selector."""
+        parsed = parse_selector(selector)
+        attr = self._cosine(self.attr_ids, self.attr_owner, self.attr_norm, _attr_tokens(parsed['values']))
+        query_text = parsed['text'] if parsed['text'] is not None else ' '.join(
+            ' '.join(words(v)) for v in parsed['values'])
+        text = self._cosine(self.text_ids, self.text_owner, self.text_norm, _trigrams(query_text))
+        tag_code = self.tag_codes.get(parsed['tag']) if parsed['tag'] else None
+        tag = (self.tags == tag_code).astype(np.float32) if tag_code is not None else np.zeros(self.size, np.float32)
+        role_code = self.role_codes.get(parsed['role']) if parsed['role'] else None
+        role = (self.roles == role_code).astype(np.float32) if role_code is not None else np.zeros(self.size, np.float32)
+        return np.column_stack([attr, text, tag, role, self.shallow, self.sibling, self.hidden]).astype(np.float32)
+
+    def scores(self, selector: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (features, scores) for every candidate."""
+        matrix = self.features(selector) if self.size else np.zeros((0, len(FEATURES)), np.float32)
+        return matrix, matrix @ WEIGHTS
+
+
+def candidate_matrix(html_or_doc: Union[str, BeautifulSoup, DomDocument]) -> CandidateMatrix:
+    """Return the cached `CandidateMatrix` of a document."""
+    document = parse_dom(html_or_doc)
+    matrix = _matrices.get(document)
+    if matrix is None:
+        matrix = CandidateMatrix(document)
+        _matrices[document] = matrix
+    return matrix
+
+
+def _quote(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def locator_for(element: Tag, matrix: CandidateMatrix, text: str) -> str:
+    """Build the most specific stable locator for an element, preferring unique test ids, ids and names."""
+    index = matrix.index
+    testid = element.get('data-testid')
+    if testid and len(index.exact('data-testid', testid)) == 1:
+        return f'[data-testid="{_quote(testid)}"]'
+    element_id = element.get('id')
+    if element_id and _CSS_IDENT_RE.match(element_id) and len(index.exact('id', element_id)) == 1:
+        return f'#{element_id}'
+    name = element.get('name')
+    if name and len(index.exact('name', name)) == 1:
+        return f'{element.name}[name="{_quote(name)}"]'
+    label = element.get('aria-label')
+    if label and len(index.exact('aria-label', label)) == 1:
+        return f'[aria-label="{_quote(label)}"]'
+    if text:
+        short = text[:80].replace("'", "\\'")
+        return f"{element.name}:has-text('{short}')"
+    classes = [c for c in element.get('class', []) if _CSS_IDENT_RE.match(c)]
+    if classes:
+        return element.name + ''.join(f'.{c}' for c in classes)
+    return element.name
+
+
+def rank_candidates(html_or_doc: Union[str, BeautifulSoup, DomDocument], broken_selector: Optional[str],
+                    top_k: int = 5, min_score: float = MIN_SCORE) -> List[Dict[str, Any]]:
+    """Score every interactive element against `broken_selector` and return the best `top_k`.
+
+    Each entry has the suggested `selector`, its `score`, a softmax `confidence`
+    over all candidates, the element's tag and text and the feature values.
+    Candidates scoring below `min_score` are left out.
+    """
+    matrix = candidate_matrix(html_or_doc)
+    if not matrix.size:
+        return []
+    features, scores = matrix.scores(broken_selector or '')
+    shifted = np.exp((scores - scores.max()) / TEMPERATURE)
+    confidence = shifted / shifted.sum()
+    order = np.argsort(-scores, kind='stable')
+    ranked: List[Dict[str, Any]] = []
+    seen = set()
+    for row in order[:max(top_k * 3, top_k)]:
+        if scores[row] < min_score:
+            break
+        element = matrix.elements[row]
+        selector = locator_for(element, matrix, matrix.texts[row])
+        if selector in seen:
+            continue
+        seen.add(selector)
+        ranked.append({
+            'selector': selector,
+            'score': round(float(scores[row]), 4),
+            'confidence': round(float(confidence[row]), 4),
+            'tag': element.name,
+            'text': matrix.texts[row][:80],
+            'features': {name: round(float(value), 4) for name, value in zip(FEATURES, features[row])},
+        })
+        if len(ranked) >= top_k:
+            break
+    return ranked
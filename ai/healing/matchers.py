@@ -0,0 +1,155 @@
+"""Compiled matcher engine.
+
+`MatcherSet` wraps a list of `(compiled_regex, error_type, suggestion)` matchers
+(the shape of `report_analyzer.DEFAULT_MATCHERS`) and classifies a message without
+running every regex against it. When the set is built, each pattern is reduced
+to the literal strings one of which any match must contain; those literals are
+indexed by their first three characters. Classifying a message is then a single
+scan over the lower-cased text to collect the patterns whose literals occur,
+followed by a regex check of only those candidates in list order, so the result
+is the same first-match-wins answer as the plain `for pattern in matchers` loop.
+
+A `MatcherSet` is itself a sequence of the original tuples, so it can be passed
+anywhere a matcher list is accepted (e.g. the `matchers=` parameter).
+"""
+import hashlib
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+try:  # Python 3.11+
+    from re import _parser as _sre_parse
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_parse as _sre_parse
+
+Matcher = Tuple[re.Pattern, str, str]
+
+# Non-ASCII characters that IGNORECASE regexes treat as equal to an ASCII letter
+# but that str.lower() does not map to it.
+_FOLD = str.maketrans({'İ': 'i', 'ı': 'i', 'ſ': 's'})
+_GRAM = 3
+
+
+def _fold(text: str) -> str:
+    if not text.isascii():
+        text = text.translate(_FOLD)
+    return text.lower()
+
+
+def _required_literals(items) -> Optional[FrozenSet[str]]:
+    """Return strings one of which must appear in any match of the parsed `items`, or None."""
+    options: List[FrozenSet[str]] = []
+    run: List[str] = []
+    for op, av in items:
+        if op is _sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        if run:
+            options.append(frozenset([''.join(run)]))
+            run = []
+        sub = None
+        if op is _sre_parse.SUBPATTERN:
+            sub = _required_literals(av[-1])
+        elif op is _sre_parse.BRANCH:
+            alternatives = [_required_literals(alt) for alt in av[1]]
+            if all(alternatives):
+                sub = frozenset().union(*alternatives)
+        elif op in (_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT) and av[0] >= 1:
+            sub = _required_literals(av[2])
+        if sub:
+            options.append(sub)
+    if run:
+        options.append(frozenset([''.join(run)]))
+    # the most selective option is the one whose shortest literal is longest
+    options = [opt for opt in options if all(opt)]
+    if not options:
+        return None
+    return max(options, key=lambda opt: min(len(s) for s in opt))
+
+
+def _pattern_anchors(pattern: re.Pattern) -> Optional[FrozenSet[str]]:
+    """Lower-cased literals usable to prefilter `pattern`, or None if it must always run."""
+    if not isinstance(pattern.pattern, str):
+        return None
+    try:
+        literals = _required_literals(_sre_parse.parse(pattern.pattern, pattern.flags))
+    except Exception:
+        return None
+    if not literals:
+        return None
+    anchors = frozenset(_fold(s) for s in literals)
+    if any(len(a) < _GRAM or not a.isascii() for a in anchors):
+        return None
+    return anchors
+
+
+class MatcherSet(Sequence):
+    """A matcher list compiled once for fast first-match-wins classification."""
+
+    def __init__(self, matchers: Iterable[Matcher]):
+        self.matchers: List[Matcher] = list(matchers)
+        # content fingerprint of what drives classification (patterns, flags, types)
+        self.signature = hashlib.sha1(repr([(p.pattern, p.flags, t) for p, t, _ in self.matchers]).encode('utf-8')).hexdigest()
+        self._always: List[int] = []
+        self._grams: Dict[str, List[Tuple[int, str]]] = {}
+        for idx, (pattern, _, _) in enumerate(self.matchers):
+            anchors = _pattern_anchors(pattern)
+            if anchors is None:
+                self._always.append(idx)
+                continue
+            for anchor in anchors:
+                self._grams.setdefault(anchor[:_GRAM], []).append((idx, anchor))
+
+    def __getitem__(self, idx):
+        return self.matchers[idx]
+
+    def __len__(self) -> int:
+        return len(self.matchers)
+
+    def candidates(self, text: str) -> List[int]:
+        """Indices (in list order) of the matchers whose literals occur in `text`."""
+        found = set(self._always)
+        if self._grams:
+            lowered = _fold(text)
+            if len(lowered) <= len(self._grams):
+                hits = (self._grams.get(lowered[i:i + _GRAM]) for i in range(len(lowered) - _GRAM + 1))
+            else:
+                hits = (entries for gram, entries in self._grams.items() if gram in lowered)
+            for entries in hits:
+                if entries:
+                    for idx, anchor in entries:
+                        if idx not in found and anchor in lowered:
+                            found.add(idx)
+        return sorted(found)
+
+    def first(self, text: str) -> Optional[int]:
+        """Index of the first matcher whose pattern matches `text`, or None."""
+        for idx in self.candidates(text):
+            if self.matchers[idx][0].search(text):
+                return idx
+        return None
+
+    def all(self, text: str) -> List[int]:
+        """Indices of every matcher whose pattern matches `text`, in list order."""
+        return [idx for idx in self.candidates(text) if self.matchers[idx][0].search(text)]
+
+    def classify(self, text: str) -> Optional[str]:
+        """Error type of the first matching matcher, or None."""
+        idx = self.first(text)
+        return None if idx is None else self.matchers[idx][1]
+
+
+@lru_cache(maxsize=32)
+def _compile_cached(matchers: Tuple[Matcher, ...]) -> MatcherSet:
+    return MatcherSet(matchers)
+
+
+def compile_matchers(matchers: Iterable[Matcher]) -> MatcherSet:
+    """Return a `MatcherSet` for `matchers`, reusing compiled sets for equal lists."""
+    if isinstance(matchers, MatcherSet):
+        return matchers
+    matchers = tuple(matchers)
+    try:
+        return _compile_cached(matchers)
+    except TypeError:  # unhashable entries
+        return MatcherSet(matchers)
@@ -0,0 +1,76 @@
+"""Memoization of per-message analysis work.
+
+Playwright failure messages repeat heavily across retries, projects and
+parameterized specs. `ClassificationCache` is a bounded LRU mapping a hash of the
+normalized message text to an entry holding the results computed for that text
+(matched matcher indices, message/stack split, parsed location), so repeated
+messages skip the regex work. Hit/miss counters are kept for reporting.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class ClassificationCache:
+    """Bounded LRU of per-message results keyed by a hash of the normalized text."""
+
+    def __init__(self, maxsize: int = 8192):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[bytes, Dict[Hashable, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+    def get(self, field: Hashable, text: str, compute: Callable[[str], Any],
+            normalize: Optional[Callable[[str], str]] = None) -> Any:
+        """Return `compute(normalized_text)`, memoized under (`field`, normalized text).
+
+        `normalize` must not change what `compute` returns (e.g. stripping ANSI codes
+        before a function that strips them itself).
+        """
+        norm = normalize(text) if normalize else (text or '')
+        key = self.key(norm)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value = entry.get(field, _MISSING)
+                if value is not _MISSING:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+        value = compute(norm)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {}
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+            entry[field] = value
+        return value
+
+    def info(self) -> Dict[str, Any]:
+        """Return hit/miss counters, hit rate and current size."""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / total) if total else 0.0,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
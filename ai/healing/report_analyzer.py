@@ -1,8 +1,15 @@
+import hashlib
 import json
 import xml.etree.ElementTree as ET
 import re
 from collections import Counter
-from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .json_stream import JsonStream
+from .matchers import MatcherSet, compile_matchers
+from .message_cache import ClassificationCache
+from .source_cache import SourceCache
 
 
 def load_report(path: Optional[str] = None, report_data: Optional[Any] = None, loader: Optional[Callable[[str], Any]] = None):
@@ -29,6 +36,50 @@ def load_report(path: Optional[str] = None, report_data: Optional[Any] = None, l
         return json.load(f)
 
 
+def report_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Return a content hash (hex) of the report file at `path`, read in chunks."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def message_text(msg: Any) -> str:
+    """Return the stripped short message of an extracted error (normalized dict or raw string)."""
+    if isinstance(msg, dict):
+        return (msg.get('message') or '').strip()
+    return (msg or '').strip()
+
+
+def _normalize_error(error: Any) -> Dict[str, Any]:
+    """Turn a Playwright error entry into the dict shape yielded by the extractors."""
+    # raw message
+    full_msg = error.get('message', '') if isinstance(error, dict) else str(error or '')
+    # strip ANSI sequences and split message vs stack
+    short_msg, stack = message_cache.get('split', full_msg, _split_message_and_stack, normalize=_strip_ansi)
+    err_obj = {
+        'raw': full_msg,
+        'message': short_msg,
+    }
+    if stack:
+        err_obj['stack'] = stack
+    # include any explicit location fields if present
+    if isinstance(error, dict) and error.get('location'):
+        err_obj['location'] = error.get('location')
+    return err_obj
+
+
+def _spec_errors(spec: Dict) -> List[Dict[str, Any]]:
+    """Collect the normalized errors of every result of every test in a Playwright spec."""
+    errors = []
+    for test in spec.get('tests') or []:
+        for result in test.get('results') or []:
+            for error in result.get('errors') or []:
+                errors.append(_normalize_error(error))
+    return errors
+
+
 def default_playwright_extractor(report: Dict) -> Iterable[Tuple[str, str, List[str]]]:
     """Yield tuples of (suite_name, test_title, [error_messages]) from a Playwright JSON report.
 
@@ -37,26 +88,110 @@ def default_playwright_extractor(report: Dict) -> Iterable[Tuple[str, str, List[
     for suite in report.get('suites', []):
         suite_name = suite.get('title') or 'suite'
         for spec in suite.get('specs', []):
-            test_title = spec.get('title', 'unknown')
-            errors = []
-            for test in spec.get('tests', []):
-                for result in test.get('results', []):
-                    for error in result.get('errors', []):
-                        # raw message
-                        full_msg = error.get('message', '')
-                        # strip ANSI sequences and split message vs stack
-                        short_msg, stack = _split_message_and_stack(full_msg)
-                        err_obj = {
-                            'raw': full_msg,
-                            'message': short_msg,
-                        }
-                        if stack:
-                            err_obj['stack'] = stack
-                        # include any explicit location fields if present
-                        if isinstance(error, dict) and error.get('location'):
-                            err_obj['location'] = error.get('location')
-                        errors.append(err_obj)
-            yield (suite_name, test_title, errors)
+            yield (suite_name, spec.get('title', 'unknown'), _spec_errors(spec))
+
+
+# Result payloads that can be huge (inlined attachments, captured output) and are not
+# needed for analysis; the streaming reader skips them without decoding.
+_SKIPPED_RESULT_KEYS = frozenset({'attachments', 'stdout', 'stderr'})
+
+
+def _read_stream_result(stream: JsonStream) -> Any:
+    return stream.read_object(skip=_SKIPPED_RESULT_KEYS)
+
+
+def _read_stream_test(stream: JsonStream) -> Any:
+    return stream.read_object(fields={'results': lambda s: s.read_array(_read_stream_result)})
+
+
+def _read_stream_spec(stream: JsonStream) -> Any:
+    return stream.read_object(fields={'tests': lambda s: s.read_array(_read_stream_test)})
+
+
+def _stream_playwright_suite(stream: JsonStream, nested: bool = False,
+                             parent: Optional[str] = None) -> Iterator[Tuple[str, Dict]]:
+    # Playwright writes the suite title before its specs; nested suites are skipped
+    # to match default_playwright_extractor unless `nested` is set, in which case
+    # their specs are reported under the top-level suite (the spec file).
+    suite_name = parent or 'suite'
+    for key in stream.iter_object():
+        if key == 'title' and parent is None:
+            suite_name = stream.read_value() or 'suite'
+        elif key == 'specs':
+            for _ in stream.iter_array():
+                spec = _read_stream_spec(stream)
+                if isinstance(spec, dict):
+                    yield suite_name, spec
+        elif key == 'suites' and nested:
+            for _ in stream.iter_array():
+                yield from _stream_playwright_suite(stream, nested, suite_name)
+        else:
+            stream.skip_value()
+
+
+def _walk_playwright_suite(suite: Dict, nested: bool = False,
+                           parent: Optional[str] = None) -> Iterator[Tuple[str, Dict]]:
+    suite_name = parent or suite.get('title') or 'suite'
+    for spec in suite.get('specs', []):
+        yield suite_name, spec
+    if nested:
+        for child in suite.get('suites') or []:
+            yield from _walk_playwright_suite(child, nested, suite_name)
+
+
+def iter_playwright_specs(path: str, meta: Optional[Dict[str, Any]] = None,
+                          nested: bool = False) -> Iterator[Tuple[str, Dict]]:
+    """Incrementally yield (suite_name, spec) pairs from a Playwright JSON report file.
+
+    Only one spec is held in memory at a time and result attachments/stdout/stderr
+    are skipped. If `meta` is given, the top-level `stats` object is stored in it.
+    With `nested`, specs of nested suites (`test.describe` blocks) are included
+    under the name of their top-level suite.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = JsonStream(f)
+        for key in stream.iter_object():
+            if key == 'suites':
+                for _ in stream.iter_array():
+                    yield from _stream_playwright_suite(stream, nested)
+            elif key == 'stats' and meta is not None:
+                meta['stats'] = stream.read_value()
+            else:
+                stream.skip_value()
+
+
+def stream_playwright_report(path: str) -> Iterator[Tuple[str, str, List[Dict[str, Any]]]]:
+    """Streaming counterpart of `default_playwright_extractor` that reads `path` incrementally."""
+    for suite_name, spec in iter_playwright_specs(path):
+        yield (suite_name, spec.get('title', 'unknown'), _spec_errors(spec))
+
+
+def stream_report(path: str) -> Iterable[Tuple[str, str, List[Any]]]:
+    """Yield (suite, test_title, messages) from a report file in bounded memory where supported."""
+    if path.lower().endswith(('.xml', '.junit')):
+        return stream_junit_report(path)
+    return stream_playwright_report(path)
+
+
+def iter_tests(path: Optional[str] = None,
+               report: Optional[Any] = None,
+               loader: Optional[Callable[[str], Any]] = None,
+               extractor: Optional[Callable[[Any], Iterable[Tuple[str, str, List[str]]]]] = None,
+               stream: bool = False) -> Iterable[Tuple[str, str, List[Any]]]:
+    """Return the (suite, test_title, messages) tuples of a report.
+
+    With stream=True (and a path, no report/loader) the file is read incrementally
+    via `stream_report` instead of being loaded whole.
+    """
+    if stream and report is None and loader is None and path is not None:
+        if extractor is not None:
+            raise ValueError("A custom extractor cannot be combined with stream=True")
+        return stream_report(path)
+    parsed = load_report(path=path, report_data=report, loader=loader)
+    if extractor is None:
+        # choose extractor by type
+        extractor = default_playwright_extractor if isinstance(parsed, dict) else junit_xml_extractor
+    return extractor(parsed)
 
 
 def junit_xml_extractor(root: ET.Element) -> Iterable[Tuple[str, str, List[str]]]:
@@ -65,13 +200,127 @@ def junit_xml_extractor(root: ET.Element) -> Iterable[Tuple[str, str, List[str]]
     for testsuite in root.findall('.//testsuite'):
         suite_name = testsuite.get('name', 'testsuite')
         for testcase in testsuite.findall('testcase'):
-            tc_name = testcase.get('name', 'testcase')
-            messages = []
-            for child in testcase:
-                if child.tag in ('failure', 'error'):
-                    text = child.text or ''
-                    messages.append(text.strip())
-            yield (suite_name, tc_name, messages)
+            yield (suite_name, testcase.get('name', 'testcase'), _junit_testcase_messages(testcase))
+
+
+_JUNIT_OUTPUT_TAGS = ('system-out', 'system-err')
+
+
+def iter_junit_testcases(path: str, include_output: bool = False) -> Iterator[Tuple[ET.Element, ET.Element]]:
+    """Incrementally yield (testsuite, testcase) elements from a JUnit XML file.
+
+    Each testcase is yielded when its closing tag is read and is detached from the
+    tree afterwards, so memory stays flat regardless of file size; only the attributes
+    of the enclosing testsuite should be relied upon. `<system-out>`/`<system-err>` payloads are
+    dropped as soon as they are read unless include_output is set (and they belong
+    to a testcase). Nested suites and a root `<testsuite>` are supported.
+    """
+    stack: List[ET.Element] = []
+    for event, elem in ET.iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            stack.append(elem)
+            continue
+        stack.pop()
+        parent = stack[-1] if stack else None
+        if elem.tag in _JUNIT_OUTPUT_TAGS:
+            if not (include_output and parent is not None and parent.tag == 'testcase'):
+                elem.clear()
+        elif elem.tag == 'testcase':
+            if parent is not None and parent.tag == 'testsuite':
+                yield parent, elem
+            if parent is not None:
+                parent.remove(elem)
+        elif elem.tag == 'testsuite' and parent is not None:
+            parent.remove(elem)
+
+
+def stream_junit_report(path: str, include_output: bool = False) -> Iterator[Tuple[str, str, List[str]]]:
+    """Streaming counterpart of `junit_xml_extractor`; yields (suite, testcase, [messages]).
+
+    With include_output, testcase `<system-out>`/`<system-err>` text is appended to the messages.
+    """
+    for testsuite, testcase in iter_junit_testcases(path, include_output=include_output):
+        yield (testsuite.get('name', 'testsuite'), testcase.get('name', 'testcase'),
+               _junit_testcase_messages(testcase, include_output=include_output))
+
+
+def _playwright_result_records(suite_name: str, spec: Dict) -> Iterator[Dict[str, Any]]:
+    title = spec.get('title', 'unknown')
+    for test in spec.get('tests') or []:
+        project = test.get('projectName') or test.get('projectId') or ''
+        for result in test.get('results') or []:
+            yield {
+                'suite': suite_name,
+                'test_title': title,
+                'project': project,
+                'status': result.get('status'),
+                'duration': result.get('duration'),
+                'retry': result.get('retry') or 0,
+                'start_time': result.get('startTime'),
+                'errors': [_normalize_error(e) for e in result.get('errors') or []],
+            }
+
+
+def _junit_testcase_messages(testcase: ET.Element, include_output: bool = False) -> List[str]:
+    tags = ('failure', 'error', 'system-out', 'system-err') if include_output else ('failure', 'error')
+    return [(child.text or '').strip() for child in testcase if child.tag in tags]
+
+
+def _junit_testcase_record(suite: ET.Element, testcase: ET.Element) -> Dict[str, Any]:
+    messages = _junit_testcase_messages(testcase)
+    skipped = testcase.find('skipped') is not None
+    try:
+        duration = float(testcase.get('time')) * 1000
+    except (TypeError, ValueError):
+        duration = None
+    return {
+        'suite': suite.get('name', 'testsuite'),
+        'test_title': testcase.get('name', 'testcase'),
+        'project': testcase.get('classname') or '',
+        'status': 'failed' if messages else ('skipped' if skipped else 'passed'),
+        'duration': duration,
+        'retry': 0,
+        'start_time': suite.get('timestamp'),
+        'errors': messages,
+    }
+
+
+def _junit_result_records(root: ET.Element) -> Iterator[Dict[str, Any]]:
+    for testsuite in root.findall('.//testsuite'):
+        for testcase in testsuite.findall('testcase'):
+            yield _junit_testcase_record(testsuite, testcase)
+
+
+def iter_result_records(path: Optional[str] = None,
+                        report: Optional[Any] = None,
+                        stream: bool = False,
+                        meta: Optional[Dict[str, Any]] = None,
+                        nested: bool = False) -> Iterator[Dict[str, Any]]:
+    """Yield one record per test result (each Playwright retry/project, each JUnit testcase).
+
+    Records carry suite, test_title, project, status, duration (ms), retry, start_time
+    and errors (same message shapes as the extractors). With stream=True a Playwright
+    report at `path` is read incrementally; `meta` receives its top-level `stats`.
+    With `nested`, Playwright tests inside nested suites are included, with the
+    top-level suite (the spec file) as their suite.
+    """
+    if stream and report is None and path is not None:
+        if path.lower().endswith(('.xml', '.junit')):
+            for testsuite, testcase in iter_junit_testcases(path):
+                yield _junit_testcase_record(testsuite, testcase)
+        else:
+            for suite_name, spec in iter_playwright_specs(path, meta=meta, nested=nested):
+                yield from _playwright_result_records(suite_name, spec)
+        return
+    parsed = load_report(path=path, report_data=report)
+    if isinstance(parsed, dict):
+        if meta is not None and isinstance(parsed.get('stats'), dict):
+            meta['stats'] = parsed['stats']
+        for suite in parsed.get('suites', []):
+            for suite_name, spec in _walk_playwright_suite(suite, nested):
+                yield from _playwright_result_records(suite_name, spec)
+    else:
+        yield from _junit_result_records(parsed)
 
 
 DEFAULT_MATCHERS: List[Tuple[re.Pattern, str, str]] = [
@@ -165,49 +414,29 @@ def _parse_location_from_text(text: str) -> Optional[Dict[str, int]]:
     return None
 
 
-def _read_source_snippet(file: str, line: int, context: int = 3) -> Optional[Dict[str, Any]]:
+def _read_source_snippet(file: str, line: int, context: int = 3, sources: Optional[SourceCache] = None) -> Optional[Dict[str, Any]]:
     """Return a small source snippet around `line` from `file` if available.
 
     Returns dict with keys: file (resolved), line, snippet (string), start_line
-    or None if file not found or cannot be read.
+    or None if file not found or cannot be read. Pass a `SourceCache` to reuse
+    resolved paths and indexed file contents across calls.
     """
     if not file or not line:
         return None
-    from pathlib import Path
-    p = Path(file)
-    # Try as absolute
-    if not p.exists():
-        # Try relative to current working dir (project root)
-        p = Path.cwd() / file
-        if not p.exists():
-            # Normalize backslashes and try again
-            p = Path.cwd() / file.replace('\\', '/')
-            if not p.exists():
-                return None
-    try:
-        lines = p.read_text(encoding='utf-8', errors='ignore').splitlines()
-    except Exception:
-        return None
+    if sources is not None:
+        return sources.snippet(file, line, context)
+    with SourceCache() as tmp:
+        return tmp.snippet(file, line, context)
 
-    idx = max(0, int(line) - 1)
-    start = max(0, idx - context)
-    end = min(len(lines), idx + context + 1)
-    snippet_lines = lines[start:end]
-    return {
-        'file': str(p),
-        'start_line': start + 1,
-        'line': int(line),
-        'snippet': '\n'.join(snippet_lines)
-    }
+
+_ANSI_RE = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
 
 
 def _strip_ansi(text: str) -> str:
     """Remove ANSI escape sequences from text."""
     if not text:
         return ''
-    # ANSI escape sequence regex
-    ansi_re = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
-    return ansi_re.sub('', text)
+    return _ANSI_RE.sub('', text)
 
 
 def _split_message_and_stack(full_text: str) -> Tuple[str, Optional[str]]:
@@ -275,13 +504,227 @@ def _suggest_from_trace(detail: Dict[str, Any]) -> Optional[str]:
     return None
 
 
+# Shared memo of per-message work (split, location, classification); see cache_info()
+message_cache = ClassificationCache()
+
+
+def _cached_location(text: str) -> Optional[Dict[str, int]]:
+    loc = message_cache.get('location', text, _parse_location_from_text, normalize=_strip_ansi)
+    return dict(loc) if loc else loc
+
+
+def classify_message(text: str, matchers: Optional[Union[List[Tuple[re.Pattern, str, str]], MatcherSet]] = None) -> List[int]:
+    """Return the indices of all matchers recognising `text` (memoized per matcher set)."""
+    engine = compile_matchers(DEFAULT_MATCHERS if matchers is None else matchers)
+    return message_cache.get(('matches', engine.signature), text, lambda t: tuple(engine.all(t)))
+
+
+def message_location(msg: Any, text: Optional[str] = None) -> Optional[Dict[str, int]]:
+    """Parse a file/line location from the short message, falling back to its stack or raw text."""
+    if text is None:
+        text = message_text(msg)
+    # Try to parse a location from the short message first
+    loc = _cached_location(text)
+    if not loc and isinstance(msg, dict):
+        # If we didn't find a location yet, try parsing the stack or raw text
+        loc = _cached_location(msg.get('stack') or msg.get('raw') or '')
+    return loc
+
+
+def cache_info() -> Dict[str, Any]:
+    """Hit/miss counters of the message classification cache."""
+    return message_cache.info()
+
+
+def _build_detail(msg: Any, text: str, sources: Optional[SourceCache] = None) -> Dict[str, Any]:
+    """Build the detail dict (message, stack, locations, snippet) for a matched error."""
+    detail = {
+        'message': text,
+    }
+    if isinstance(msg, dict):
+        if 'location' in msg:
+            detail['location'] = msg.get('location')
+        if 'stack' in msg:
+            detail['stack'] = msg.get('stack')
+        if 'raw' in msg:
+            detail['raw'] = msg.get('raw')
+
+    loc = message_location(msg, text)
+    if loc:
+        detail['parsed_location'] = loc
+
+    # Add a trace-based suggestion derived from stack/parsed location
+    trace_sugg = _suggest_from_trace(detail)
+    if trace_sugg:
+        detail['trace_suggestion'] = trace_sugg
+
+    # If we have a parsed location with file and line, attempt to read a small snippet
+    ploc = detail.get('parsed_location') or {}
+    if ploc.get('file') and ploc.get('line'):
+        try:
+            snippet = _read_source_snippet(ploc.get('file'), ploc.get('line'), sources=sources)
+            if snippet:
+                detail['source_snippet'] = snippet
+        except Exception:
+            # non-fatal: don't block analysis if reading file fails
+            pass
+    return detail
+
+
+@dataclass
+class ReportAnalysis:
+    """Result of a single pass over a report.
+
+    - suggestions: what `analyze_report` returns, (test_title, error_type, suggestion[, details])
+    - stats: Counter of error types, what `get_error_stats` returns
+    - by_suite / by_test: the same counts broken down per suite name and per test title
+    - others: (suite, test_title, message) for messages no matcher recognised
+    """
+    suggestions: List[Tuple] = field(default_factory=list)
+    stats: Counter = field(default_factory=Counter)
+    by_suite: Dict[str, Counter] = field(default_factory=dict)
+    by_test: Dict[str, Counter] = field(default_factory=dict)
+    others: List[Tuple[str, str, str]] = field(default_factory=list)
+    tests: int = 0
+    messages: int = 0
+
+    def to_dict(self, include_suggestions: bool = False) -> Dict[str, Any]:
+        """JSON-serializable form of the aggregates (and optionally the suggestions)."""
+        data = {
+            'stats': dict(self.stats),
+            'by_suite': {k: dict(v) for k, v in self.by_suite.items()},
+            'by_test': {k: dict(v) for k, v in self.by_test.items()},
+            'others': [list(o) for o in self.others],
+            'tests': self.tests,
+            'messages': self.messages,
+        }
+        if include_suggestions:
+            data['suggestions'] = [list(s) for s in self.suggestions]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ReportAnalysis':
+        return cls(
+            suggestions=[tuple(s) for s in data.get('suggestions', [])],
+            stats=Counter(data.get('stats', {})),
+            by_suite={k: Counter(v) for k, v in data.get('by_suite', {}).items()},
+            by_test={k: Counter(v) for k, v in data.get('by_test', {}).items()},
+            others=[tuple(o) for o in data.get('others', [])],
+            tests=data.get('tests', 0),
+            messages=data.get('messages', 0),
+        )
+
+    def merge(self, other: 'ReportAnalysis', dedupe: bool = True) -> 'ReportAnalysis':
+        """Fold another analysis (e.g. of another report) into this one and return self.
+
+        Counters are summed, so a (test, error type) deduped within each report counts
+        once per report. With dedupe, suggestions stay unique per (test_title, error_type),
+        preferring detailed entries that carry a stack trace.
+        """
+        self.stats.update(other.stats)
+        for target, source in ((self.by_suite, other.by_suite), (self.by_test, other.by_test)):
+            for name, counts in source.items():
+                target.setdefault(name, Counter()).update(counts)
+        self.others.extend(other.others)
+        self.tests += other.tests
+        self.messages += other.messages
+        if not dedupe:
+            self.suggestions.extend(other.suggestions)
+            return self
+        index = {(item[0], item[1]): i for i, item in enumerate(self.suggestions)}
+        for item in other.suggestions:
+            key = (item[0], item[1])
+            if key not in index:
+                index[key] = len(self.suggestions)
+                self.suggestions.append(item)
+            elif len(item) == 4 and item[3].get('stack') and not self.suggestions[index[key]][3].get('stack'):
+                self.suggestions[index[key]] = item
+        return self
+
+
+def analyze(path: Optional[str] = None,
+            report: Optional[Any] = None,
+            loader: Optional[Callable[[str], Any]] = None,
+            extractor: Optional[Callable[[Any], Iterable[Tuple[str, str, List[str]]]]] = None,
+            matchers: Optional[Union[List[Tuple[re.Pattern, str, str]], MatcherSet]] = None,
+            dedupe: bool = True,
+            return_details: bool = False,
+            stream: bool = False) -> ReportAnalysis:
+    """Walk the report once and compute suggestions, stats and breakdowns together.
+
+    Takes the same parameters as `analyze_report`. Suggestions are produced for every
+    matcher that recognises a message, while counts use the first matching matcher
+    (or 'Others'); with dedupe each (test_title, error_type) is reported once.
+    """
+    engine = compile_matchers(DEFAULT_MATCHERS if matchers is None else matchers)
+    tests = iter_tests(path=path, report=report, loader=loader, extractor=extractor, stream=stream)
+
+    result = ReportAnalysis()
+    # each referenced source file is read and line-indexed at most once per run
+    sources = SourceCache()
+    try:
+        _analyze_tests(tests, engine, result, dedupe, return_details, sources)
+    finally:
+        sources.close()
+    return result
+
+
+def _analyze_tests(tests: Iterable[Tuple[str, str, List[Any]]], engine: MatcherSet, result: ReportAnalysis,
+                   dedupe: bool, return_details: bool, sources: SourceCache) -> None:
+    suggested = set()
+    counted = set()
+    # When return_details=True and dedupe=True we prefer entries that include stack traces
+    best: Dict[Tuple[str, str], Tuple[str, str, str, Dict]] = {}
+    for suite_name, test_title, messages in tests:
+        result.tests += 1
+        for msg in messages:
+            result.messages += 1
+            # msg may be a dict (normalized) or a raw string
+            text = message_text(msg)
+
+            matched = classify_message(text, engine)
+            first_type = engine[matched[0]][1] if matched else None
+            for idx in matched:
+                _, err_type, suggestion = engine[idx]
+                key = (test_title, err_type)
+                if return_details:
+                    if dedupe:
+                        # prefer entries that include a stack trace: only build the detail
+                        # when it could replace what we already have
+                        existing = best.get(key)
+                        has_stack = isinstance(msg, dict) and bool(msg.get('stack'))
+                        if existing is None or (has_stack and not existing[3].get('stack')):
+                            best[key] = (test_title, err_type, suggestion, _build_detail(msg, text, sources))
+                    else:
+                        result.suggestions.append((test_title, err_type, suggestion, _build_detail(msg, text, sources)))
+                elif not (dedupe and key in suggested):
+                    result.suggestions.append((test_title, err_type, suggestion))
+                suggested.add(key)
+
+            err_type = first_type or 'Others'
+            key = (test_title, err_type)
+            if dedupe and key in counted:
+                continue
+            counted.add(key)
+            result.stats[err_type] += 1
+            result.by_suite.setdefault(suite_name, Counter())[err_type] += 1
+            result.by_test.setdefault(test_title, Counter())[err_type] += 1
+            if first_type is None:
+                result.others.append((suite_name, test_title, text))
+
+    # if we collected best detailed suggestions, return them
+    if return_details and dedupe:
+        result.suggestions = list(best.values())
+
+
 def analyze_report(path: Optional[str] = None,
                    report: Optional[Any] = None,
                    loader: Optional[Callable[[str], Any]] = None,
                    extractor: Optional[Callable[[Any], Iterable[Tuple[str, str, List[str]]]]] = None,
-                   matchers: Optional[List[Tuple[re.Pattern, str, str]]] = None,
+                   matchers: Optional[Union[List[Tuple[re.Pattern, str, str]], MatcherSet]] = None,
                    dedupe: bool = True,
-                   return_details: bool = False) -> List[Tuple[str, str, str]]:
+                   return_details: bool = False,
+                   stream: bool = False) -> List[Tuple[str, str, str]]:
     """Analyze a test report and return suggestions.
 
     Parameters:
@@ -289,138 +732,23 @@ def analyze_report(path: Optional[str] = None,
     - report: already-parsed report object (JSON dict or XML Element)
     - loader: optional function(path) -> parsed report
     - extractor: function(parsed_report) -> iterable of (suite, test_title, [messages])
-    - matchers: list of tuples (compiled_regex, error_type, suggestion)
+    - matchers: list of tuples (compiled_regex, error_type, suggestion) or a compiled MatcherSet
     - dedupe: if True, only one suggestion per (test_title, error_type) is returned
-    """
-    parsed = load_report(path=path, report_data=report, loader=loader)
-    if matchers is None:
-        matchers = DEFAULT_MATCHERS
-    if extractor is None:
-        # choose extractor by type
-        if isinstance(parsed, dict):
-            extractor = default_playwright_extractor
-        else:
-            extractor = junit_xml_extractor
+    - stream: if True, read the report at `path` incrementally (bounded memory)
 
-    suggestions: List[Tuple[str, str, str]] = []
-    seen = set()
-    # When return_details=True and dedupe=True we prefer entries that include stack traces
-    best: Dict[Tuple[str, str], Tuple[str, str, str, Dict]] = {}
-    for suite_name, test_title, messages in extractor(parsed):
-        for msg in messages:
-            # msg may be a dict (normalized) or a raw string
-            if isinstance(msg, dict):
-                text = (msg.get('message') or '').strip()
-            else:
-                text = (msg or '').strip()
-
-            for pattern, err_type, suggestion in matchers:
-                if pattern.search(text):
-                    key = (test_title, err_type)
-                    # Build detail dict if requested
-                    if return_details:
-                        detail = {
-                            'message': text,
-                        }
-                        if isinstance(msg, dict):
-                            if 'location' in msg:
-                                detail['location'] = msg.get('location')
-                            if 'stack' in msg:
-                                detail['stack'] = msg.get('stack')
-                            if 'raw' in msg:
-                                detail['raw'] = msg.get('raw')
-
-                        # Try to parse a location from the short message first
-                        loc = _parse_location_from_text(text)
-                        if loc:
-                            detail.setdefault('parsed_location', loc)
-
-                        # If we didn't find a location yet, try parsing the stack or raw text
-                        if not detail.get('parsed_location'):
-                            loc2 = _parse_location_from_text(detail.get('stack') or detail.get('raw') or '')
-                            if loc2:
-                                detail.setdefault('parsed_location', loc2)
-
-                        # Add a trace-based suggestion derived from stack/parsed location
-                        trace_sugg = _suggest_from_trace(detail)
-                        if trace_sugg:
-                            detail['trace_suggestion'] = trace_sugg
-
-                        # If we have a parsed location with file and line, attempt to read a small snippet
-                        ploc = detail.get('parsed_location') or {}
-                        if ploc.get('file') and ploc.get('line'):
-                            try:
-                                snippet = _read_source_snippet(ploc.get('file'), ploc.get('line'))
-                                if snippet:
-                                    detail['source_snippet'] = snippet
-                            except Exception:
-                                # non-fatal: don't block analysis if reading file fails
-                                pass
-
-                        if dedupe:
-                            # prefer entries that include a stack trace
-                            existing = best.get(key)
-                            has_stack = bool(detail.get('stack'))
-                            if existing is None:
-                                best[key] = (test_title, err_type, suggestion, detail)
-                            else:
-                                _, _, _, ex_detail = existing
-                                ex_has_stack = bool(ex_detail.get('stack'))
-                                # replace only if new one has stack and existing doesn't
-                                if has_stack and not ex_has_stack:
-                                    best[key] = (test_title, err_type, suggestion, detail)
-                        else:
-                            suggestions.append((test_title, err_type, suggestion, detail))
-                    else:
-                        if dedupe and key in seen:
-                            # already seen; skip
-                            pass
-                        else:
-                            suggestions.append((test_title, err_type, suggestion))
-                    seen.add(key)
-    # if we collected best detailed suggestions, return them
-    if return_details and dedupe:
-        return list(best.values())
-    return suggestions
+    This is a view over `analyze`; use it directly when stats are needed too.
+    """
+    return analyze(path=path, report=report, loader=loader, extractor=extractor, matchers=matchers,
+                   dedupe=dedupe, return_details=return_details, stream=stream).suggestions
 
 
 def get_error_stats(path: Optional[str] = None,
                     report: Optional[Any] = None,
                     loader: Optional[Callable[[str], Any]] = None,
                     extractor: Optional[Callable[[Any], Iterable[Tuple[str, str, List[str]]]]] = None,
-                    matchers: Optional[List[Tuple[re.Pattern, str, str]]] = None,
-                    dedupe: bool = True) -> Counter:
+                    matchers: Optional[Union[List[Tuple[re.Pattern, str, str]], MatcherSet]] = None,
+                    dedupe: bool = True,
+                    stream: bool = False) -> Counter:
     """Return a Counter of error types found in the report. Uses same parameters as analyze_report."""
-    parsed = load_report(path=path, report_data=report, loader=loader)
-    if matchers is None:
-        matchers = DEFAULT_MATCHERS
-    if extractor is None:
-        extractor = default_playwright_extractor if isinstance(parsed, dict) else junit_xml_extractor
-
-    counts: List[str] = []
-    seen = set()
-    for suite_name, test_title, messages in extractor(parsed):
-        for msg in messages:
-            # msg may be a dict (normalized) or a raw string
-            if isinstance(msg, dict):
-                norm = (msg.get('message') or '').strip()
-            else:
-                norm = (msg or '').strip()
-
-            matched = False
-            for pattern, err_type, _ in matchers:
-                if pattern.search(norm):
-                    key = (test_title, err_type)
-                    if dedupe and key in seen:
-                        matched = True
-                        break
-                    counts.append(err_type)
-                    seen.add(key)
-                    matched = True
-                    break
-            if not matched:
-                key = (test_title, 'Others')
-                if not (dedupe and key in seen):
-                    counts.append('Others')
-                    seen.add(key)
-    return Counter(counts)
\ No newline at end of file
+    return analyze(path=path, report=report, loader=loader, extractor=extractor, matchers=matchers,
+                   dedupe=dedupe, stream=stream).stats
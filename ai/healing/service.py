@@ -0,0 +1,402 @@
+"""Long-running healing service.
+
+Playwright fixtures that want a healed locator mid-run should not pay for a new
+interpreter plus the BeautifulSoup/NumPy imports on every failure. This daemon
+keeps them loaded: an asyncio server answers JSON requests over localhost HTTP
+or a Unix socket and runs `healing_engine.heal` / `locator_recovery` in a pool
+of pre-warmed worker processes, whose parsed-DOM caches, trace index sidecars
+and the shared on-disk healing cache stay hot between requests. Requests from
+parallel Playwright workers are served concurrently, up to one per pool worker
+at a time.
+
+Endpoints (all responses are JSON):
+  GET  /health   liveness, pid, uptime and pool size
+  GET  /stats    request counts, errors and latency per endpoint, pool restarts, healing cache totals
+  POST /heal     {"trace_path": ...} | {"trace": {...}} | {"html": ..., "selector": ...}
+  POST /suggest  {"html": ..., "selector": ..., "max_suggestions": 5}
+
+Usage examples:
+  # Serve on localhost:8765 with 4 worker processes
+  python -m ai.healing.service --port 8765 --workers 4
+
+  # Serve on a Unix socket instead
+  python -m ai.healing.service --unix /tmp/healing.sock
+
+  # Ask for alternatives to a broken selector
+  curl -s -X POST localhost:8765/suggest -d '{"html": "<button id=\\"buy\\">Buy</button>", "selector": "#buy-now"}'
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .healing_cache import DEFAULT_PATH, open_cache
+from .healing_engine import MAX_SUGGESTIONS, heal, rank_suggestions
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY = 64 << 20
+# longest request or header line, and most header lines, accepted per request
+MAX_LINE = 64 << 10
+MAX_HEADERS = 100
+LATENCY_WINDOW = 1024
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 431: 'Request Header Fields Too Large', 500: 'Internal Server Error',
+            504: 'Gateway Timeout'}
+
+
+class RequestError(Exception):
+    """A request the service rejects, with the HTTP status to answer with."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _warm_worker() -> int:
+    """Run one small heal so the worker's imports and parser are loaded before real requests."""
+    heal(trace_data={'error': {'selector': '#warm-up'}, 'snapshot': {'dom': '<button id="warm">Warm</button>'}})
+    return os.getpid()
+
+
+def heal_job(payload: Dict[str, Any], cache_path: Optional[str]) -> Dict[str, Any]:
+    """Run `heal` for one /heal request body (executed in a worker)."""
+    cache = open_cache(cache_path) if cache_path else None
+    if payload.get('trace_path'):
+        return heal(trace_path=payload['trace_path'], use_index=payload.get('use_index', True), cache=cache)
+    trace = payload.get('trace')
+    if trace is None and payload.get('html') is not None:
+        trace = {'error': {'selector': payload.get('selector')}, 'snapshot': {'dom': payload['html']}}
+    return heal(trace_data=trace, cache=cache)
+
+
+def suggest_job(html: str, selector: Optional[str], max_suggestions: int) -> Dict[str, Any]:
+    """Return heuristic suggestions and, with NumPy, ranked candidates (executed in a worker)."""
+    from .dom_document import parse_dom
+    from .locator_recovery import suggest_alternative_locator
+
+    document = parse_dom(html)
+    suggestions = suggest_alternative_locator(document, selector, max_suggestions)
+    suggestions, ranked = rank_suggestions(document, selector, suggestions, max_suggestions)
+    result: Dict[str, Any] = {'selector': selector, 'suggestions': suggestions}
+    if ranked is not None:
+        result['ranked'] = ranked
+    return result
+
+
+class HealingService:
+    """Asyncio JSON/HTTP front end over a pool of healing workers.
+
+    `workers` is the process pool size; workers=0 runs jobs on threads of this
+    process instead (no isolation, but no start-up cost; handy for tests).
+    `timeout` bounds each request in seconds. A process pool that breaks (a worker
+    killed, e.g. by the OOM killer) is replaced and the request retried once; a
+    timed-out job is stopped by replacing the pool, whose other in-flight jobs
+    are then retried. Threads cannot be stopped, so with workers=0 a timed-out
+    job keeps running.
+    """
+
+    def __init__(self, workers: int = 2, cache_path: Optional[str] = DEFAULT_PATH, timeout: Optional[float] = 60.0):
+        self.workers = workers
+        self.cache_path = cache_path
+        self.timeout = timeout
+        self.started = time.time()
+        self.requests: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.in_flight = 0
+        self.restarts = 0
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self._pool = self._new_pool()
+        self._pool_lock: Optional[asyncio.Lock] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        # open connections: their handler tasks and writers, closed on shutdown
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self._routes = {
+            ('GET', '/health'): self._health,
+            ('GET', '/stats'): self._stats,
+            ('POST', '/heal'): self._heal,
+            ('POST', '/suggest'): self._suggest,
+        }
+
+    # -- lifecycle -----------------------------------------------------
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers) if self.workers > 0 else ThreadPoolExecutor(max_workers=4)
+
+    async def _warm(self) -> None:
+        if self.workers > 0:
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(self._pool, _warm_worker) for _ in range(self.workers)))
+
+    async def _restart_pool(self, pool: Any) -> None:
+        """Replace `pool` (broken, or running a timed-out job) with a new, warmed one."""
+        if self._pool_lock is None:
+            self._pool_lock = asyncio.Lock()
+        async with self._pool_lock:
+            if self._pool is not pool:
+                return  # another request already replaced it
+            self._pool = self._new_pool()
+            self.restarts += 1
+            # ProcessPoolExecutor cannot stop running jobs; end its processes directly
+            for process in list((getattr(pool, '_processes', None) or {}).values()):
+                process.terminate()
+            pool.shutdown(wait=False, cancel_futures=True)
+            await self._warm()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765, unix_path: Optional[str] = None) -> None:
+        """Warm the pool, then start listening on `unix_path` if given, else on host:port."""
+        await self._warm()
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.unlink(unix_path)
+            self._server = await asyncio.start_unix_server(self._handle, path=unix_path, limit=MAX_LINE)
+        else:
+            self._server = await asyncio.start_server(self._handle, host=host, port=port, limit=MAX_LINE)
+
+    @property
+    def address(self) -> Any:
+        """The bound address: (host, port) for TCP, the socket path for a Unix socket."""
+        return self._server.sockets[0].getsockname() if self._server else None
+
+    async def serve_forever(self) -> None:
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop listening, end open (keep-alive) connections and their handlers, then shut the pool down."""
+        if self._server is not None:
+            self._server.close()
+        tasks = list(self._connections)
+        for task, writer in list(self._connections.items()):
+            writer.close()
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # -- HTTP ----------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until the client closes it (HTTP/1.1 keep-alive)."""
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    head = await self._read_head(reader)
+                except RequestError as e:
+                    await self._respond(writer, e.status, {'error': str(e)}, keep_alive=False)
+                    break
+                if head is None:
+                    break
+                request_line, lines = head
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'malformed request line'}, keep_alive=False)
+                    break
+                headers: Dict[str, str] = {}
+                for line in lines:
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # the body cannot be framed, so the connection cannot be reused
+                    await self._respond(writer, 400, {'error': 'invalid Content-Length'}, keep_alive=False)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {'error': f'body larger than {MAX_BODY} bytes'}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                status, payload = await self._dispatch(method, target.split('?', 1)[0], body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    async def _read_head(self, reader: asyncio.StreamReader) -> Optional[Tuple[bytes, List[bytes]]]:
+        """Read a request line and its header lines; None once the client has closed the connection."""
+        try:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                return None
+            lines = []
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    return request_line, lines
+                if len(lines) == MAX_HEADERS:
+                    raise RequestError(431, f'more than {MAX_HEADERS} header lines')
+                lines.append(line)
+        except ValueError:
+            # readline's answer to a line longer than the stream limit
+            raise RequestError(431, f'request or header line longer than {MAX_LINE} bytes') from None
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool) -> None:
+        body = json.dumps(payload, default=str).encode('utf-8')
+        head = (f'HTTP/1.1 {status} {_REASONS.get(status, "")}\r\n'
+                f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n'
+                f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n')
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        handler = self._routes.get((method, path))
+        if handler is None:
+            known = any(route_path == path for _, route_path in self._routes)
+            return (405, {'error': f'{method} not allowed on {path}'}) if known else (404, {'error': f'no route {path}'})
+        route = path.strip('/')
+        self.requests[route] += 1
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            request = json.loads(body) if body else {}
+            if not isinstance(request, dict):
+                raise RequestError(400, 'request body must be a JSON object')
+            return 200, await handler(request)
+        except json.JSONDecodeError as e:
+            self.errors[route] += 1
+            return 400, {'error': f'invalid JSON: {e}'}
+        except RequestError as e:
+            self.errors[route] += 1
+            return e.status, {'error': str(e)}
+        except asyncio.TimeoutError:
+            self.errors[route] += 1
+            return 504, {'error': f'timed out after {self.timeout}s'}
+        except Exception as e:
+            self.errors[route] += 1
+            logger.exception(f'{method} {path} failed')
+            return 500, {'error': f'{type(e).__name__}: {e}'}
+        finally:
+            self.in_flight -= 1
+            self._latencies[route].append(time.perf_counter() - start)
+
+    async def _run(self, fn, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            pool = self._pool
+            try:
+                future = loop.run_in_executor(pool, fn, *args)
+                return await asyncio.wait_for(future, self.timeout) if self.timeout else await future
+            except BrokenProcessPool:
+                if attempt:
+                    raise
+                logger.warning('Worker pool broke; restarting it and retrying the request')
+                await self._restart_pool(pool)
+            except asyncio.TimeoutError:
+                if self.workers > 0:
+                    await self._restart_pool(pool)
+                raise
+
+    # -- endpoints -----------------------------------------------------
+
+    async def _health(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return {'status': 'ok', 'pid': os.getpid(), 'uptime': time.time() - self.started, 'workers': self.workers}
+
+    async def _stats(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # the cache totals are SQLite queries; keep them off the event loop
+        cache = await asyncio.get_running_loop().run_in_executor(None, self._cache_stats)
+        return dict(self.stats(cache=False), cache=cache)
+
+    async def _heal(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if not any(request.get(k) is not None for k in ('trace_path', 'trace', 'html')):
+            raise RequestError(400, 'expected trace_path, trace or html')
+        return await self._run(heal_job, request, self.cache_path)
+
+    async def _suggest(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if request.get('html') is None:
+            raise RequestError(400, 'expected html')
+        max_suggestions = request.get('max_suggestions') or MAX_SUGGESTIONS
+        if isinstance(max_suggestions, bool) or not isinstance(max_suggestions, int) or max_suggestions < 1:
+            raise RequestError(400, 'max_suggestions must be a positive integer')
+        return await self._run(suggest_job, request['html'], request.get('selector'), max_suggestions)
+
+    def _cache_stats(self) -> Optional[Dict[str, Any]]:
+        return open_cache(self.cache_path).stats() if self.cache_path else None
+
+    def stats(self, cache: bool = True) -> Dict[str, Any]:
+        """Request and error counts, in-flight requests, latency per endpoint (ms) and healing cache totals.
+
+        With cache=False the cache totals (which query its database) are left out as None.
+        """
+        latency = {}
+        for route, samples in self._latencies.items():
+            ordered = sorted(samples)
+            latency[route] = {
+                'mean': 1000 * sum(ordered) / len(ordered),
+                'p50': 1000 * ordered[len(ordered) // 2],
+                'p95': 1000 * ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                'max': 1000 * ordered[-1],
+            }
+        return {
+            'uptime': time.time() - self.started,
+            'requests': dict(self.requests),
+            'errors': dict(self.errors),
+            'in_flight': self.in_flight,
+            'pool_restarts': self.restarts,
+            'latency_ms': latency,
+            'cache': self._cache_stats() if cache else None,
+        }
+
+
+async def serve(host: str = '127.0.0.1', port: int = 8765, unix_path: Optional[str] = None, workers: int = 2,
+                cache_path: Optional[str] = DEFAULT_PATH, timeout: Optional[float] = 60.0) -> None:
+    """Run a `HealingService` until SIGINT/SIGTERM."""
+    service = HealingService(workers=workers, cache_path=cache_path, timeout=timeout)
+    await service.start(host=host, port=port, unix_path=unix_path)
+    logger.info(f'Healing service listening on {service.address} with {workers} workers')
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # not supported on Windows event loops; Ctrl+C still interrupts
+    server_task = asyncio.create_task(service.serve_forever())
+    try:
+        await stop.wait()
+    finally:
+        server_task.cancel()
+        await service.close()
+        if unix_path and os.path.exists(unix_path):
+            os.unlink(unix_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve locator healing over a local HTTP or Unix-socket JSON API')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: localhost only)')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='Listen on this Unix socket path instead of TCP')
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                        help='Worker processes (0 runs jobs on threads of the server process)')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Seconds allowed per request (0 disables)')
+    parser.add_argument('--cache', default=DEFAULT_PATH, help=f'Healing cache database (default: {DEFAULT_PATH})')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the healing cache')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    try:
+        asyncio.run(serve(host=args.host, port=args.port, unix_path=args.unix, workers=args.workers,
+                          cache_path=None if args.no_cache else args.cache, timeout=args.timeout or None))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Source file cache for snippet extraction.
+
+`SourceCache` is meant to live for one analysis run: each referenced source file
+is resolved and read at most once, and its lines are indexed so snippets around
+any line can be sliced without re-reading. Files above `mmap_threshold` bytes are
+memory-mapped and indexed by newline offsets instead of being decoded whole.
+Entries are invalidated when the file's mtime or size changes.
+"""
+import mmap
+import os
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class _MappedLines:
+    """Line access over a memory-mapped file using precomputed newline offsets."""
+
+    def __init__(self, path: Path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._starts = array('q', [0])
+        pos = self._map.find(b'\n')
+        while pos != -1:
+            self._starts.append(pos + 1)
+            pos = self._map.find(b'\n', pos + 1)
+        size = len(self._map)
+        self._end = size
+        # a trailing newline does not start another line (same as str.splitlines)
+        if len(self._starts) > 1 and self._starts[-1] == size:
+            self._starts.pop()
+            self._end = size - 1
+        self._empty = size == 0
+
+    def __len__(self) -> int:
+        return 0 if self._empty else len(self._starts)
+
+    def __getitem__(self, window: slice) -> List[str]:
+        lines = []
+        for i in range(*window.indices(len(self))):
+            end = self._starts[i + 1] - 1 if i + 1 < len(self._starts) else self._end
+            raw = self._map[self._starts[i]:end]
+            lines.append(raw.decode('utf-8', errors='ignore').rstrip('\r'))
+        return lines
+
+    def close(self) -> None:
+        self._map.close()
+
+
+class SourceCache:
+    """Resolve, read and line-index source files at most once per analysis."""
+
+    def __init__(self, mmap_threshold: int = 1 << 20):
+        self.mmap_threshold = mmap_threshold
+        self._resolved: Dict[str, Optional[Path]] = {}
+        self._files: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+
+    def resolve(self, file: str) -> Optional[Path]:
+        """Return the existing path for `file` (as given, cwd-relative, or with '/' separators)."""
+        if file not in self._resolved:
+            found = None
+            for candidate in (Path(file), Path.cwd() / file, Path.cwd() / file.replace('\\', '/')):
+                if candidate.exists():
+                    found = candidate
+                    break
+            self._resolved[file] = found
+        return self._resolved[file]
+
+    def lines(self, path: Path) -> Optional[Any]:
+        """Return the indexed lines of `path`, re-reading only if it changed on disk."""
+        key = str(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._files.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        if cached is not None and isinstance(cached[1], _MappedLines):
+            cached[1].close()
+        try:
+            if st.st_size and st.st_size >= self.mmap_threshold:
+                lines = _MappedLines(path)
+            else:
+                lines = path.read_text(encoding='utf-8', errors='ignore').splitlines()
+        except Exception:
+            return None
+        self._files[key] = (stamp, lines)
+        return lines
+
+    def snippet(self, file: str, line: int, context: int = 3) -> Optional[Dict[str, Any]]:
+        """Return the snippet dict described in `report_analyzer._read_source_snippet`."""
+        if not file or not line:
+            return None
+        p = self.resolve(file)
+        if p is None:
+            return None
+        lines = self.lines(p)
+        if lines is None:
+            return None
+        idx = max(0, int(line) - 1)
+        start = max(0, idx - context)
+        end = min(len(lines), idx + context + 1)
+        return {
+            'file': str(p),
+            'start_line': start + 1,
+            'line': int(line),
+            'snippet': '\n'.join(lines[start:end])
+        }
+
+    def close(self) -> None:
+        for _, lines in self._files.values():
+            if isinstance(lines, _MappedLines):
+                lines.close()
+        self._files.clear()
+
+    def __enter__(self) -> 'SourceCache':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
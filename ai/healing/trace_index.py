@@ -0,0 +1,229 @@
+"""Random-access index over Playwright trace archives.
+
+The first time a trace is read, `TraceIndex` scans it once (see
+`trace_parser.scan_trace`) and writes a small sidecar next to it
+(`<trace>.idx.json`) mapping action call ids, snapshot names and timestamps to
+the zip member and byte offset of their lines, and resource SHA1s to their zip
+members. Later lookups seek straight to what they need. The failure context
+used by `healing_engine.heal` is stored in the sidecar too, with the location of
+its snapshot rather than the DOM, so healing the same trace again reads the
+sidecar and just that snapshot's lines. The sidecar is rebuilt when the
+archive's size or mtime changes.
+
+Usage examples:
+  # Build (or refresh) the index and show what it contains
+  python -m ai.healing.trace_index test-results/my-test/trace.zip
+
+  # Look up an action and print its snapshot HTML
+  python -m ai.healing.trace_index test-results/my-test/trace.zip --call call@42 --dom
+"""
+import argparse
+import bisect
+import json
+import logging
+import os
+import tempfile
+import zipfile
+from typing import Any, Dict, List, Optional
+
+from .trace_parser import event_members, failure_context, read_snapshot, scan_trace, snapshot_to_html
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 2
+INDEX_SUFFIX = '.idx.json'
+RESOURCE_PREFIX = 'resources/'
+
+
+def index_path(trace_path: str) -> str:
+    """Return the sidecar path of a trace archive."""
+    return trace_path + INDEX_SUFFIX
+
+
+def _stamp(trace_path: str) -> Dict[str, int]:
+    st = os.stat(trace_path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+class TraceIndex:
+    """Offsets of a trace archive's actions, snapshots and resources, persisted in a sidecar file."""
+
+    def __init__(self, trace_path: str, data: Dict[str, Any]):
+        self.trace_path = trace_path
+        self.data = data
+        self._by_name: Dict[str, List[Dict[str, Any]]] = {}
+        for meta in data['snapshots']:
+            self._by_name.setdefault(meta['snapshotName'], []).append(meta)
+        self._timeline = sorted((meta['timestamp'], i) for i, meta in enumerate(data['snapshots'])
+                                if meta.get('timestamp') is not None)
+
+    @classmethod
+    def build(cls, trace_path: str) -> Optional['TraceIndex']:
+        """Scan the archive and return its index, or None if it is not a Playwright trace."""
+        stamp = _stamp(trace_path)
+        with zipfile.ZipFile(trace_path, 'r') as zip_ref:
+            names = zip_ref.namelist()
+            if not event_members(zip_ref):
+                return None
+        resources = {}
+        for name in names:
+            if name.startswith(RESOURCE_PREFIX):
+                sha1 = name[len(RESOURCE_PREFIX):]
+                resources[sha1] = name
+                # some recorders name resources `<sha1>.<ext>`; allow lookups by the bare hash too
+                resources.setdefault(sha1.split('.', 1)[0], name)
+        scan = scan_trace(trace_path)
+        data = dict(scan, version=INDEX_VERSION, resources=resources, **stamp)
+        return cls(trace_path, data)
+
+    @classmethod
+    def load(cls, trace_path: str, save: bool = True) -> Optional['TraceIndex']:
+        """Return the index of `trace_path`, reading its sidecar when it is still valid.
+
+        Otherwise the archive is scanned and (with save=True) the sidecar rewritten.
+        Returns None for archives that are not Playwright traces.
+        """
+        stamp = _stamp(trace_path)
+        sidecar = index_path(trace_path)
+        try:
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if (data.get('version') == INDEX_VERSION and data.get('size') == stamp['size']
+                    and data.get('mtime_ns') == stamp['mtime_ns']):
+                return cls(trace_path, data)
+        except (OSError, ValueError):
+            pass
+        index = cls.build(trace_path)
+        if index is not None and save:
+            index.save()
+        return index
+
+    def save(self) -> None:
+        """Atomically write the sidecar; a read-only location only costs the rescan next time."""
+        sidecar = index_path(self.trace_path)
+        try:
+            # a private temp file: concurrent writers of the same sidecar must not share one
+            fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(sidecar) + '.', suffix='.tmp',
+                                            dir=os.path.dirname(sidecar) or '.')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(self.data, f)
+                os.replace(tmp_path, sidecar)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+        except OSError as e:
+            logger.debug(f'Could not write trace index {sidecar}: {e}')
+
+    @property
+    def actions(self) -> Dict[str, Dict[str, Any]]:
+        return self.data['actions']
+
+    @property
+    def snapshots(self) -> List[Dict[str, Any]]:
+        return self.data['snapshots']
+
+    def action(self, call_id: str) -> Optional[Dict[str, Any]]:
+        return self.actions.get(call_id)
+
+    def failed_action(self) -> Optional[Dict[str, Any]]:
+        """Return the last failing action, if any."""
+        return self.actions.get(self.data['failed']) if self.data.get('failed') else None
+
+    def snapshot(self, name: str, frame_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return the metadata of snapshot `name` (of `frame_id`, else preferring the main frame)."""
+        candidates = self._by_name.get(name, [])
+        if frame_id is not None:
+            candidates = [meta for meta in candidates if meta['frameId'] == frame_id]
+        for meta in candidates:
+            if meta['isMainFrame']:
+                return meta
+        return candidates[0] if candidates else None
+
+    def snapshot_at(self, timestamp: float, page_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return the last main-frame snapshot taken at or before `timestamp` (optionally of one page)."""
+        pos = bisect.bisect_right(self._timeline, (timestamp, len(self.snapshots)))
+        for _, i in reversed(self._timeline[:pos]):
+            meta = self.snapshots[i]
+            if meta['isMainFrame'] and (page_id is None or meta.get('pageId') == page_id):
+                return meta
+        return None
+
+    def read_snapshot(self, meta: Dict[str, Any]) -> Dict[str, Any]:
+        """Decode a snapshot with its references resolved, reading only the lines it needs."""
+        return read_snapshot(self.trace_path, self.snapshots, meta)
+
+    def snapshot_html(self, name: str, frame_id: Optional[str] = None) -> Optional[str]:
+        meta = self.snapshot(name, frame_id)
+        if meta is None:
+            return None
+        snapshot = self.read_snapshot(meta)
+        return snapshot_to_html(snapshot.get('html'), snapshot.get('doctype'))
+
+    def resource(self, sha1: str) -> Optional[bytes]:
+        """Return the content of a resource (screenshot, stylesheet, response body) by SHA1."""
+        member = self.data['resources'].get(sha1)
+        if member is None:
+            return None
+        with zipfile.ZipFile(self.trace_path, 'r') as zip_ref:
+            return zip_ref.read(member)
+
+    def failure(self, call_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return the `trace_parser.find_failure` result, located once and kept in the sidecar.
+
+        The sidecar keeps the snapshot's location; its HTML is read on each call.
+        With `call_id`, the same shape is built for that action instead (not cached).
+        """
+        if call_id is not None:
+            return failure_context(self.trace_path, self.data, call_id)
+        if 'failure' not in self.data:
+            self.data['failure'] = failure_context(self.trace_path, self.data, dom=False)
+            self.save()
+        failure = self.data['failure']
+        if failure is None or 'snapshot' not in failure:
+            return failure
+        location = failure['snapshot']['location']
+        snapshot = self.read_snapshot(next(meta for meta in self.snapshots if meta['location'] == location))
+        return dict(failure, snapshot={
+            'dom': snapshot_to_html(snapshot.get('html'), snapshot.get('doctype')),
+            'name': snapshot.get('snapshotName'),
+            'frameUrl': snapshot.get('frameUrl'),
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and query the random-access index of a Playwright trace')
+    parser.add_argument('trace', help='Path to a Playwright trace.zip')
+    parser.add_argument('--rebuild', action='store_true', help='Ignore an existing sidecar')
+    parser.add_argument('--call', help='Show this action (call id) instead of the failing one')
+    parser.add_argument('--dom', action='store_true', help='Also print the snapshot HTML')
+    args = parser.parse_args()
+
+    index = TraceIndex.build(args.trace) if args.rebuild else TraceIndex.load(args.trace)
+    if index is None:
+        print(f'{args.trace} is not a Playwright trace')
+        return
+    if args.rebuild:
+        index.save()
+    print(f'{len(index.actions)} actions, {len(index.snapshots)} snapshots, '
+          f"{len(set(index.data['resources'].values()))} resources ({index_path(args.trace)})")
+    context = index.failure(args.call)
+    if context is None:
+        print('No failing action found' if args.call is None else f'No action {args.call}')
+        return
+    error = context['error']
+    print(f"{error['apiName']} ({error['callId']}): selector {error['selector']}")
+    if error['message']:
+        print(f"  {error['message'].splitlines()[0]}")
+    snapshot = context.get('snapshot')
+    if snapshot:
+        print(f"  snapshot {snapshot['name']} of {snapshot['frameUrl']} ({len(snapshot['dom'])} chars)")
+        if args.dom:
+            print(snapshot['dom'])
+
+
+if __name__ == '__main__':
+    main()
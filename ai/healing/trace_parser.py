@@ -2,26 +2,435 @@
 
 Provide utilities to extract trace data from Playwright trace zip files or
 from other archive formats. Return a structured dict (or None).
+
+Playwright traces store their events as newline-delimited JSON in `*.trace`
+(actions, frame snapshots, console, logs) and `*.network` (resource snapshots)
+members. `iter_trace_events` reads those lazily from the zip without extracting
+it, and `find_failure` locates the failing action's selector and the DOM
+snapshot closest to it. `scan_trace` records where every action and snapshot
+line lives (member and byte offset), so only the chosen snapshot and the
+snapshots it references are read back and decoded; everything else is
+discarded as it streams past.
+
+Usage example:
+  python -m ai.healing.trace_parser test-results/my-test/trace.zip
 """
+import argparse
+import io
 import zipfile
 import json
 import logging
-from typing import Optional, Any
+import re
+from html import escape
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EVENT_MEMBER_SUFFIXES = ('.trace', '.network')
+# event types grouped the way callers usually want them
+ACTION_EVENTS = frozenset({'before', 'input', 'after', 'action', 'log'})
+SNAPSHOT_EVENTS = frozenset({'frame-snapshot'})
+CONSOLE_EVENTS = frozenset({'console'})
+NETWORK_EVENTS = frozenset({'resource-snapshot'})
+
+_TYPE_RE = re.compile(r'\{\s*"type"\s*:\s*"([^"\\]*)"')
+_META_RES = {key: re.compile(f'"{key}"\\s*:\\s*"((?:[^"\\\\]|\\\\.)*)"') for key in ('snapshotName', 'frameId', 'pageId', 'callId')}
+_REF_RE = re.compile(r'\[\[\s*(\d+)\s*,\s*\d+\s*\]\]')
+_READ_BUFFER = 1 << 16
+_TIMESTAMP_RE = re.compile(r'"timestamp":(-?[0-9.]+(?:[eE][-+]?[0-9]+)?)')
+_VOID_ELEMENTS = frozenset({'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+                            'meta', 'param', 'source', 'track', 'wbr'})
+
+
+def event_members(zip_ref: zipfile.ZipFile) -> List[str]:
+    """Return the NDJSON event members of a trace archive (chunked traces have several)."""
+    return [name for name in zip_ref.namelist() if name.lower().endswith(EVENT_MEMBER_SUFFIXES)]
+
+
+def _event_type(line: str) -> Optional[str]:
+    """Read the event type from the head of a line without decoding the JSON."""
+    match = _TYPE_RE.match(line)
+    return match.group(1) if match else None
+
+
+def _iter_lines(trace_path: str, members: Optional[Iterable[str]] = None) -> Iterator[Tuple[Optional[str], str, str, int, int]]:
+    """Yield (event type or None, line, member, byte offset, byte length) for every line of the event members."""
+    with zipfile.ZipFile(trace_path, 'r') as zip_ref:
+        names = list(members) if members is not None else event_members(zip_ref)
+        for name in names:
+            offset = 0
+            with zip_ref.open(name) as raw:
+                for data in io.BufferedReader(raw, _READ_BUFFER):
+                    line = data.decode('utf-8', errors='replace')
+                    yield _event_type(line), line, name, offset, len(data)
+                    offset += len(data)
+
+
+def _read_lines(trace_path: str, locations: Iterable[Tuple[str, int, int]]) -> Dict[Tuple[str, int], str]:
+    """Read the lines at (member, byte offset, byte length), seeking forward through each member once."""
+    by_member: Dict[str, List[Tuple[int, int]]] = {}
+    for member, offset, length in locations:
+        by_member.setdefault(member, []).append((offset, length))
+    lines = {}
+    with zipfile.ZipFile(trace_path, 'r') as zip_ref:
+        for member, spans in by_member.items():
+            with zip_ref.open(member) as raw:
+                position = 0
+                for offset, length in sorted(set(spans)):
+                    # compressed members can only be skipped by decompressing; keep the chunks small
+                    while position < offset:
+                        skipped = len(raw.read(min(_READ_BUFFER, offset - position)))
+                        if not skipped:
+                            break
+                        position += skipped
+                    data = raw.read(length)
+                    position += len(data)
+                    lines[(member, offset)] = data.decode('utf-8', errors='replace')
+    return lines
+
+
+def _decode(line: str) -> Optional[Dict[str, Any]]:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        event = json.loads(line)
+    except ValueError:
+        logger.debug('Skipping malformed trace line')
+        return None
+    return event if isinstance(event, dict) else None
+
+
+def iter_trace_events(trace_path: str,
+                      types: Optional[Iterable[str]] = None,
+                      members: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+    """Yield the events of a Playwright trace archive one at a time.
+
+    `types` restricts the events to those types (e.g. ACTION_EVENTS | SNAPSHOT_EVENTS);
+    lines of other types are skipped without being JSON-decoded. `members` selects the
+    archive members to read (default: every `*.trace` and `*.network` member).
+    Malformed lines are skipped.
+    """
+    wanted = frozenset(types) if types is not None else None
+    for event_type, line, _, _, _ in _iter_lines(trace_path, members):
+        if wanted is not None and event_type is not None and event_type not in wanted:
+            continue
+        event = _decode(line)
+        if event is None or (wanted is not None and event.get('type') not in wanted):
+            continue
+        yield event
+
+
+def _error_message(error: Any) -> Optional[str]:
+    if isinstance(error, dict):
+        inner = error.get('error')
+        if isinstance(inner, dict):
+            return inner.get('message') or inner.get('value')
+        return error.get('message') or error.get('value')
+    return str(error) if error else None
+
+
+def _json_string(raw: str) -> str:
+    try:
+        return json.loads(f'"{raw}"')
+    except ValueError:
+        return raw
+
+
+def _snapshot_meta(line: str) -> Optional[Dict[str, Any]]:
+    """Read a frame-snapshot's name, frame, page and timestamp without decoding its node tree.
+
+    Playwright writes the identifying fields before `html`; `timestamp` and
+    `isMainFrame` are unambiguous anywhere in the line because node text and
+    attribute values are JSON strings. Lines laid out differently are decoded in full.
+    """
+    html_at = line.find('"html":')
+    head = line[:html_at] if html_at != -1 else ''
+    meta: Dict[str, Any] = {}
+    for key, pattern in _META_RES.items():
+        match = pattern.search(head)
+        if match:
+            meta[key] = _json_string(match.group(1))
+    stamp = _TIMESTAMP_RE.match(line, max(0, line.rfind('"timestamp":')))
+    if 'snapshotName' not in meta or 'frameId' not in meta or not stamp:
+        event = _decode(line)
+        snapshot = (event or {}).get('snapshot') or {}
+        if not snapshot.get('snapshotName'):
+            return None
+        return {'snapshotName': snapshot.get('snapshotName'), 'frameId': snapshot.get('frameId') or snapshot.get('pageId'),
+                'pageId': snapshot.get('pageId'), 'callId': snapshot.get('callId'),
+                'timestamp': snapshot.get('timestamp'), 'isMainFrame': snapshot.get('isMainFrame', True)}
+    meta['timestamp'] = float(stamp.group(1))
+    meta['isMainFrame'] = not line.startswith('"isMainFrame":false', max(0, line.rfind('"isMainFrame":')))
+    return meta
+
+
+def _action_record(call_id: Any, meta: Dict[str, Any], location: List[Any]) -> Dict[str, Any]:
+    return {
+        'callId': call_id,
+        'apiName': meta.get('apiName') or f"{meta.get('class', meta.get('type', ''))}.{meta.get('method', '')}",
+        'selector': (meta.get('params') or {}).get('selector'),
+        'pageId': meta.get('pageId'),
+        'startTime': meta.get('startTime'),
+        'endTime': meta.get('endTime'),
+        'message': None,
+        'snapshots': [],
+        'location': location,
+    }
+
+
+def scan_trace(trace_path: str) -> Dict[str, Any]:
+    """Read a Playwright trace once and return its actions and frame-snapshot metadata.
+
+    Returns a dict with `actions` (callId -> apiName, selector, pageId, start/end time,
+    error `message`, snapshot names with the after snapshot first, and `location`,
+    the [member, offset, length] of the action's first event line), `failed` (the
+    callId of the last failing action or None) and `snapshots`. Each snapshot entry
+    has its name, frame, page, timestamp, `index` within its frame (what Playwright's
+    subtree references count in), `refs` (indexes of the snapshots it references)
+    and the location of its line. Snapshot node trees are never decoded here.
+    """
+    actions: Dict[str, Dict[str, Any]] = {}
+    failed = None
+    snapshots: List[Dict[str, Any]] = []
+    frame_counts: Dict[str, int] = {}
+    for event_type, line, member, offset, length in _iter_lines(trace_path):
+        if event_type == 'frame-snapshot':
+            meta = _snapshot_meta(line)
+            if meta is not None:
+                index = frame_counts.get(meta['frameId'], 0)
+                frame_counts[meta['frameId']] = index + 1
+                meta['index'] = index
+                meta['refs'] = sorted({index - int(ago) for ago in _REF_RE.findall(line) if 0 < int(ago) <= index})
+                meta['location'] = [member, offset, length]
+                snapshots.append(meta)
+            continue
+        if event_type not in ('before', 'after', 'action', None):
+            continue
+        event = _decode(line)
+        if event is None:
+            continue
+        event_type = event.get('type')
+        if event_type == 'before':
+            call = _action_record(event.get('callId'), event, [member, offset, length])
+            if event.get('beforeSnapshot'):
+                call['snapshots'].append(event['beforeSnapshot'])
+            actions[call['callId']] = call
+        elif event_type == 'after':
+            call = actions.get(event.get('callId'))
+            if call is None:
+                continue
+            call['endTime'] = event.get('endTime')
+            if event.get('afterSnapshot'):
+                call['snapshots'].insert(0, event['afterSnapshot'])
+            if event.get('error'):
+                call['message'] = _error_message(event['error'])
+                failed = call['callId']
+        elif event_type == 'action':
+            # traces written before the before/after split keep everything in `metadata`
+            meta = event.get('metadata') or {}
+            call = _action_record(meta.get('id'), meta, [member, offset, length])
+            names = [s.get('snapshotName') for s in event.get('snapshots', meta.get('snapshots', []))]
+            call['snapshots'] = [name for name in reversed(names) if name]
+            actions[call['callId']] = call
+            if meta.get('error'):
+                call['message'] = _error_message(meta['error'])
+                failed = call['callId']
+    return {'actions': actions, 'failed': failed, 'snapshots': snapshots}
+
+
+def pick_snapshot(action: Dict[str, Any], snapshots: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return the action's after (else before) main-frame snapshot, else the page's last one taken before it ended."""
+    by_name = {meta['snapshotName']: meta for meta in snapshots if meta['isMainFrame']}
+    for name in action['snapshots']:
+        if name in by_name:
+            return by_name[name]
+    end_time = action.get('endTime')
+    chosen = None
+    for meta in snapshots:
+        if (meta['isMainFrame'] and meta.get('pageId') == action.get('pageId')
+                and (end_time is None or meta.get('timestamp') is None or meta['timestamp'] <= end_time)):
+            chosen = meta
+    return chosen
+
+
+def _post_order(html: Any) -> List[Any]:
+    """Index the element and text nodes of a snapshot the way Playwright numbers them for references."""
+    nodes: List[Any] = []
+    stack: List[Tuple[Any, bool]] = [(html, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if isinstance(node, str):
+            nodes.append(node)
+        elif isinstance(node, list) and node and isinstance(node[0], str):
+            if expanded:
+                nodes.append(node)
+                continue
+            stack.append((node, True))
+            for child in reversed(node[2:]):
+                stack.append((child, False))
+    return nodes
+
+
+def _is_reference(node: Any) -> bool:
+    return isinstance(node, list) and len(node) == 1 and isinstance(node[0], list)
+
+
+def _resolve(target: int, frame_lines: Dict[int, str]) -> Dict[str, Any]:
+    """Decode snapshot `target` of a frame and replace its subtree references in place.
+
+    A reference `[[snapshots_ago, node_index]]` points at a node of an earlier snapshot
+    of the same frame; `frame_lines` maps frame indexes to the raw lines of (at least)
+    every snapshot reachable through references.
+    """
+    decoded: Dict[int, Tuple[Dict[str, Any], Optional[List[Any]]]] = {}
+
+    def load(index: int) -> Tuple[Dict[str, Any], Optional[List[Any]]]:
+        if index not in decoded:
+            line = frame_lines.get(index)
+            snapshot = (((_decode(line) if line else None) or {}).get('snapshot')) or {}
+            decoded[index] = (snapshot, None)
+        return decoded[index]
+
+    def nodes_of(index: int) -> List[Any]:
+        snapshot, nodes = load(index)
+        if nodes is None:
+            nodes = _post_order(snapshot.get('html'))
+            decoded[index] = (snapshot, nodes)
+        return nodes
+
+    root = load(target)[0]
+    done = set()
+    stack = [(root.get('html'), target)]
+    while stack:
+        node, index = stack.pop()
+        if not (isinstance(node, list) and node and isinstance(node[0], str)) or id(node) in done:
+            continue
+        done.add(id(node))
+        for i in range(2, len(node)):
+            child = node[i]
+            if _is_reference(child):
+                ago, node_index = child[0][0], child[0][1]
+                source = index - ago
+                referenced = nodes_of(source) if 0 <= source < index else []
+                if 0 <= node_index < len(referenced):
+                    node[i] = referenced[node_index]
+                    stack.append((node[i], source))
+                else:
+                    node[i] = ''
+            else:
+                stack.append((child, index))
+    return root
+
+
+def read_snapshot(trace_path: str, snapshots: List[Dict[str, Any]], meta: Dict[str, Any]) -> Dict[str, Any]:
+    """Decode the frame snapshot described by `meta` (an entry of `scan_trace`'s snapshots) with references resolved.
+
+    Only that snapshot and the ones it transitively references are read, by seeking
+    to their recorded offsets.
+    """
+    frame = {m['index']: m for m in snapshots if m['frameId'] == meta['frameId']}
+    needed = set()
+    stack = [meta['index']]
+    while stack:
+        index = stack.pop()
+        if index in needed or index not in frame:
+            continue
+        needed.add(index)
+        stack.extend(frame[index].get('refs', ()))
+    locations = {index: tuple(frame[index]['location']) for index in needed}
+    lines = _read_lines(trace_path, locations.values())
+    return _resolve(meta['index'], {index: lines[(loc[0], loc[1])] for index, loc in locations.items()})
+
+
+def snapshot_to_html(html: Any, doctype: Optional[str] = None) -> str:
+    """Render a resolved frame-snapshot node tree (`[tag, attrs, *children]` arrays) to HTML."""
+    parts: List[str] = [f'<!DOCTYPE {doctype}>'] if doctype else []
+    stack: List[Any] = [html]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            parts.append(escape(node, quote=False))
+            continue
+        if isinstance(node, tuple):
+            parts.append(node[0])
+            continue
+        if not (isinstance(node, list) and node and isinstance(node[0], str)):
+            continue
+        tag = node[0].lower()
+        attrs = node[1] if len(node) > 1 and isinstance(node[1], dict) else {}
+        attr_text = ''.join(f' {name}="{escape(str(value))}"' for name, value in attrs.items()
+                            if not name.startswith('__playwright'))
+        parts.append(f'<{tag}{attr_text}>')
+        if tag in _VOID_ELEMENTS:
+            continue
+        stack.append((f'</{tag}>',))
+        stack.extend(reversed(node[2:]))
+    return ''.join(parts)
 
-logging.basicConfig(level=logging.INFO)
+
+def failure_context(trace_path: str, scan: Dict[str, Any], call_id: Optional[str] = None,
+                    dom: bool = True) -> Optional[Dict[str, Any]]:
+    """Build the `find_failure` result for action `call_id` (default: the last failing one) of a scanned trace.
+
+    With dom=False the snapshot is not read: `snapshot` only has its `location` and `name`.
+    """
+    action = scan['actions'].get(call_id if call_id is not None else scan['failed'])
+    if action is None:
+        return None
+    result: Dict[str, Any] = {
+        'error': {
+            'selector': action.get('selector'),
+            'message': action.get('message'),
+            'apiName': action.get('apiName'),
+            'callId': action.get('callId'),
+        },
+    }
+    chosen = pick_snapshot(action, scan['snapshots'])
+    if chosen is None:
+        return result
+    if not dom:
+        result['snapshot'] = {'location': chosen['location'], 'name': chosen.get('snapshotName')}
+        return result
+    snapshot = read_snapshot(trace_path, scan['snapshots'], chosen)
+    result['snapshot'] = {
+        'dom': snapshot_to_html(snapshot.get('html'), snapshot.get('doctype')),
+        'name': snapshot.get('snapshotName'),
+        'frameUrl': snapshot.get('frameUrl'),
+    }
+    return result
+
+
+def find_failure(trace_path: str) -> Optional[Dict[str, Any]]:
+    """Locate the failing action of a Playwright trace and the DOM snapshot nearest to it.
+
+    Returns a dict with `error` (selector, message, apiName, callId) and `snapshot`
+    (dom, name, frameUrl) or None if the trace has no failing action. The snapshot
+    is the failing call's after (or before) snapshot of the main frame; without one,
+    the last snapshot of the page taken before the failure is used.
+
+    The trace is read once for the actions and snapshot metadata; the chosen snapshot
+    and those it references are then read by seeking to their offsets.
+    """
+    return failure_context(trace_path, scan_trace(trace_path))
 
 
 def extract_trace_data(trace_path: str) -> Optional[Any]:
     """Try to extract and parse JSON-like trace content from a trace zip file.
 
+    Playwright traces (archives with `*.trace` event members) are streamed with
+    `find_failure`; other archives return the first member that parses as JSON.
     Returns parsed JSON-like object or None if nothing found.
     """
     try:
         with zipfile.ZipFile(trace_path, 'r') as zip_ref:
+            names = zip_ref.namelist()
+            if any(name.lower().endswith('.trace') for name in names):
+                return find_failure(trace_path)
             # Search for likely JSON files inside the trace archive
-            for name in zip_ref.namelist():
+            for name in names:
                 lower = name.lower()
-                if lower.endswith('.json') or lower.endswith('trace.trace') or 'metadata' in lower:
+                if lower.endswith('.json') or 'metadata' in lower:
                     try:
                         with zip_ref.open(name) as f:
                             data = f.read()
@@ -33,9 +442,43 @@ def extract_trace_data(trace_path: str) -> Optional[Any]:
                             # not JSON text, skip
                             continue
                     except Exception as e:
-                        logging.debug(f"Failed to open or read {name}: {e}")
+                        logger.debug(f"Failed to open or read {name}: {e}")
                         continue
-            logging.info('No JSON-like trace found in archive')
+            logger.info('No JSON-like trace found in archive')
     except Exception as e:
-        logging.exception(f'Error reading trace archive: {e}')
-    return None
\ No newline at end of file
+        logger.exception(f'Error reading trace archive: {e}')
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the failing action and its DOM snapshot from a Playwright trace')
+    parser.add_argument('trace', help='Path to a Playwright trace.zip')
+    parser.add_argument('--types', nargs='+', help='Instead, print the events of these types as NDJSON')
+    parser.add_argument('--dom', action='store_true', help='Also print the snapshot HTML')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.types:
+        for event in iter_trace_events(args.trace, types=args.types):
+            print(json.dumps(event))
+        return
+    failure = find_failure(args.trace)
+    if failure is None:
+        print('No failing action found in trace')
+        return
+    error = failure['error']
+    print(f"{error['apiName']} ({error['callId']}) failed")
+    print(f"  selector: {error['selector']}")
+    print(f"  message:  {(error['message'] or '').splitlines()[0] if error['message'] else ''}")
+    snapshot = failure.get('snapshot')
+    if snapshot:
+        print(f"  snapshot: {snapshot['name']} of {snapshot['frameUrl']} ({len(snapshot['dom'])} chars)")
+        if args.dom:
+            print(snapshot['dom'])
+    else:
+        print('  snapshot: none')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+"""Plan Playwright shards from past durations and predicted failure probabilities.
+
+Playwright's `--shard` splits tests by count in file order, so one slow shard
+sets the wall-clock time of the pipeline. The planner reads each test's cost
+(its mean time per run over every project and retry) from past reports or the
+failure store, and its failure probability from `ai.predict` (a predictions
+file or the model itself), falling back to its smoothed failure rate in the
+history. It then
+
+- packs tests into shards longest-processing-time first (each test goes to the
+  shard with the least work so far), which keeps the slowest shard within 4/3
+  of the optimum, and
+- orders every shard fail-fast: by duration / probability ascending, which
+  minimizes the expected time until the first failure (or the end of the shard).
+
+The plan is a JSON file that `playwright.config.ts` reads when `TEST_PLAN` is
+set: `TEST_SHARD` (1-based) selects the shard and `TEST_PHASE` one of its
+`grep` patterns: `all`, `head` (the front of the fail-fast order, up to
+`--head-share` of the shard's time) or `tail` (the rest). Playwright has no
+per-test ordering hook, so running `head` with `--max-failures=1` before `tail`
+is how the order reaches the run. A phase with no tests is left out of the
+plan, so run each phase with `--pass-with-no-tests`. Shard 1 selects its `all`
+and `tail` phases by excluding every other planned test (`grep_invert`), so
+tests the history has not seen yet (a new spec file) still run once.
+
+Tests are identified by spec file and title; tests in `test.describe` blocks
+are included under their spec file.
+
+Usage examples:
+  # Two shards from every report under reports/history, probabilities from the model
+  python -m ai.planner --reports reports/history --model ai/models/model.pkl --shards 2 --output reports/plan.json
+
+  # Durations and failure rates from the failure store, probabilities from ai.predict --output
+  python -m ai.planner --db reports/failures.db --predictions reports/predictions.json --output reports/plan.json
+
+  # Run shard 1: the likely failures first, stopping at the first one, then the rest
+  TEST_PLAN=reports/plan.json TEST_SHARD=1 TEST_PHASE=head npx playwright test --max-failures=1 --pass-with-no-tests
+  TEST_PLAN=reports/plan.json TEST_SHARD=1 TEST_PHASE=tail npx playwright test --pass-with-no-tests
+"""
+import argparse
+import heapq
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from ai.healing import report_analyzer as ra
+from ai.predict import ID_FIELD, read_records, test_id
+
+PLAN_VERSION = 1
+FAILED_STATUSES = ('failed', 'timedOut', 'interrupted')
+HEAD_SHARE = 0.25
+# floor for tests that never failed, so their duration still orders them
+MIN_PROBABILITY = 1e-3
+_NOTHING = '(?!)'
+
+
+def _stats(suite: Any, test_title: Any) -> Dict[str, Any]:
+    return {ID_FIELD: test_id(suite, test_title), 'suite': suite, 'test_title': test_title,
+            'runs': 0, 'results': 0, 'failed': 0, 'total_ms': 0.0}
+
+
+def history_from_reports(paths: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Per-test runs, results, failed results and total duration over the reports (one run each)."""
+    history: Dict[str, Dict[str, Any]] = {}
+    for path in paths:
+        seen = set()
+        # tests inside test.describe blocks are nested suites
+        for record in ra.iter_result_records(path, stream=True, nested=True):
+            key = test_id(record['suite'], record['test_title'])
+            stats = history.get(key)
+            if stats is None:
+                stats = history[key] = _stats(record['suite'], record['test_title'])
+            if key not in seen:
+                seen.add(key)
+                stats['runs'] += 1
+            stats['results'] += 1
+            stats['failed'] += record['status'] in FAILED_STATUSES
+            stats['total_ms'] += record['duration'] or 0.0
+    return history
+
+
+def history_from_store(store: Any) -> Dict[str, Dict[str, Any]]:
+    """The same aggregates from a `FailureStore`."""
+    history: Dict[str, Dict[str, Any]] = {}
+    for row in store.test_history():
+        stats = _stats(row['suite'], row['test_title'])
+        stats.update(runs=row['runs'], results=row['results'], failed=row['failed'] or 0,
+                     total_ms=(row['mean_duration_ms'] or 0.0) * row['results'])
+        history[stats[ID_FIELD]] = stats
+    return history
+
+
+def history_probability(failed: int, results: int) -> float:
+    """Failure rate with add-one smoothing, so one lucky run does not mean 'never fails'."""
+    return (failed + 1) / (results + 2)
+
+
+def read_predictions(path: str) -> Dict[str, float]:
+    """Map test id to probability from an `ai.predict --output` file (JSON list or JSONL)."""
+    return {(r.get(ID_FIELD) or test_id(r.get('suite'), r.get('test_title'))): float(r['probability'])
+            for r in read_records(path)}
+
+
+def predict_latest(model_path: str, report_path: str) -> Dict[str, float]:
+    """Score the tests of `report_path` with the model (loads pandas and scikit-learn)."""
+    from ai.predict import Predictor
+    from ai.train_model import extract_feature_frame
+
+    frame = extract_feature_frame(ra.stream_report(report_path))
+    return {p[ID_FIELD]: p['probability'] for p in Predictor(model_path).score_frame(frame)}
+
+
+def pack_shards(durations: Sequence[float], shards: int) -> List[List[int]]:
+    """Longest-processing-time-first bin packing; returns the indices assigned to each shard."""
+    assignment: List[List[int]] = [[] for _ in range(shards)]
+    heap = [(0.0, shard) for shard in range(shards)]
+    for i in sorted(range(len(durations)), key=lambda i: -durations[i]):
+        load, shard = heapq.heappop(heap)
+        assignment[shard].append(i)
+        heapq.heappush(heap, (load + durations[i], shard))
+    return assignment
+
+
+def fail_fast_order(tests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Order tests by duration / probability, the order that finds the first failure soonest."""
+    return sorted(tests, key=lambda t: (t['duration_ms'] / t['probability'], t[ID_FIELD]))
+
+
+def expected_first_failure(tests: Iterable[Dict[str, Any]]) -> float:
+    """Expected ms until the first failure or the end of the tests, run in the given order."""
+    expected = 0.0
+    survive = 1.0
+    for t in tests:
+        expected += survive * t['duration_ms']
+        survive *= 1.0 - t['probability']
+    return expected
+
+
+def _escape(text: str) -> str:
+    return ''.join('\\' + c if c in '\\^$.|?*+()[]{}/' else c for c in text)
+
+
+def grep_pattern(tests: Iterable[Dict[str, Any]]) -> str:
+    """A Playwright `--grep` regular expression matching exactly these tests (file and title).
+
+    Playwright matches it against "project file [describe ...] title [@tags]",
+    so each alternative is the spec file, any describe titles, then the title.
+    """
+    by_file: Dict[str, set] = {}
+    for t in tests:
+        by_file.setdefault(str(t['suite']), set()).add(str(t['test_title']))
+    if not by_file:
+        return _NOTHING
+    alternatives = [f"{_escape(file)} (?:.+ )?(?:{'|'.join(_escape(title) for title in sorted(titles))})"
+                    for file, titles in sorted(by_file.items())]
+    # the title ends the full title, before any tags
+    return f"(?:^| )(?:{'|'.join(alternatives)})(?:$| @)"
+
+
+def _baseline_shards(tests: List[Dict[str, Any]], shards: int) -> List[List[Dict[str, Any]]]:
+    # what `--shard i/n` does: equal counts of tests in file order
+    ordered = sorted(tests, key=lambda t: (str(t['suite']), str(t['test_title'])))
+    size, extra = divmod(len(ordered), shards)
+    groups, start = [], 0
+    for shard in range(shards):
+        end = start + size + (shard < extra)
+        groups.append(ordered[start:end])
+        start = end
+    return groups
+
+
+def plan_tests(history: Dict[str, Dict[str, Any]],
+               predictions: Optional[Dict[str, float]] = None,
+               shards: int = 2,
+               head_share: float = HEAD_SHARE) -> Dict[str, Any]:
+    """Build the shard plan for every test in the history or the predictions."""
+    if shards < 1:
+        raise ValueError('shards must be at least 1')
+    predictions = predictions or {}
+    known = sorted(s['total_ms'] / s['runs'] for s in history.values() if s['runs'])
+    # tests without history cost what a typical test costs
+    default_ms = known[len(known) // 2] if known else 1.0
+    tests = []
+    for key in sorted(set(history) | set(predictions)):
+        stats = history.get(key)
+        if stats is None:
+            suite, _, title = key.partition('::')
+            stats = _stats(suite, title)
+        if key in predictions:
+            probability, source = predictions[key], 'model'
+        else:
+            probability, source = history_probability(stats['failed'], stats['results']), 'history'
+        tests.append({
+            ID_FIELD: key,
+            'suite': stats['suite'],
+            'test_title': stats['test_title'],
+            'duration_ms': stats['total_ms'] / stats['runs'] if stats['runs'] else default_ms,
+            'probability': min(1.0, max(MIN_PROBABILITY, probability)),
+            'source': source,
+        })
+
+    plan_shards = []
+    for index, members in enumerate(pack_shards([t['duration_ms'] for t in tests], shards), 1):
+        ordered = fail_fast_order([tests[i] for i in members])
+        duration = sum(t['duration_ms'] for t in ordered)
+        head: List[Dict[str, Any]] = []
+        elapsed = 0.0
+        for t in ordered:
+            if head and elapsed + t['duration_ms'] > head_share * duration:
+                break
+            head.append(t)
+            elapsed += t['duration_ms']
+        phases = {'all': ordered, 'head': head, 'tail': ordered[len(head):]}
+        plan_shards.append({
+            'index': index,
+            'duration_ms': duration,
+            'expected_first_failure_ms': expected_first_failure(ordered),
+            'head_tests': len(head),
+            'files': sorted({str(t['suite']) for t in ordered}),
+            # empty phases are left out: there is nothing to run
+            'grep': {phase: grep_pattern(selected) for phase, selected in phases.items() if selected},
+            'tests': ordered,
+        })
+    # shard 1 selects by exclusion, so tests missing from the plan (new ones, or
+    # ones the history did not see) still run once instead of never
+    first = plan_shards[0]
+    others = [t for shard in plan_shards[1:] for t in shard['tests']]
+    first['grep_invert'] = {'all': grep_pattern(others),
+                            'tail': grep_pattern(others + first['tests'][:first['head_tests']])}
+
+    baseline = _baseline_shards(tests, shards)
+    return {
+        'version': PLAN_VERSION,
+        'created_at': time.time(),
+        'tests': len(tests),
+        'makespan_ms': max((s['duration_ms'] for s in plan_shards), default=0.0),
+        'baseline_makespan_ms': max(sum(t['duration_ms'] for t in g) for g in baseline),
+        'expected_first_failure_ms': min((s['expected_first_failure_ms'] for s in plan_shards if s['tests']),
+                                         default=0.0),
+        'baseline_first_failure_ms': min((expected_first_failure(g) for g in baseline if g), default=0.0),
+        'shards': plan_shards,
+    }
+
+
+def write_plan(plan: Dict[str, Any], path: str) -> None:
+    out_dir = os.path.dirname(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def main():
+    from ai.healing.batch_analyzer import find_reports
+
+    parser = argparse.ArgumentParser(description='Plan cost-balanced, fail-fast Playwright shards')
+    history = parser.add_mutually_exclusive_group(required=True)
+    history.add_argument('--reports', help='Report file, directory or glob with past runs')
+    history.add_argument('--db', help='Failure store database with past runs')
+    probabilities = parser.add_mutually_exclusive_group()
+    probabilities.add_argument('--predictions', help='Output of ai.predict --output')
+    probabilities.add_argument('--model', help='Score the latest report with this ai.train_model model')
+    parser.add_argument('--latest', default='reports/report.json', help='Report scored with --model')
+    parser.add_argument('--shards', type=int, default=2, help='Number of shards')
+    parser.add_argument('--head-share', type=float, default=HEAD_SHARE,
+                        help="Share of each shard's time in its fail-fast 'head' phase")
+    parser.add_argument('--output', default='reports/plan.json', help='Where to write the plan')
+    args = parser.parse_args()
+
+    if args.reports:
+        paths = find_reports(args.reports)
+        if not paths:
+            parser.error(f'no reports found for {args.reports}')
+        past = history_from_reports(paths)
+    else:
+        from ai.healing.failure_store import FailureStore
+
+        with FailureStore(args.db) as store:
+            past = history_from_store(store)
+
+    predictions = None
+    if args.predictions:
+        predictions = read_predictions(args.predictions)
+    elif args.model:
+        predictions = predict_latest(args.model, args.latest)
+
+    plan = plan_tests(past, predictions, shards=args.shards, head_share=args.head_share)
+    write_plan(plan, args.output)
+
+    print(f"Planned {plan['tests']} tests into {args.shards} shards: makespan {plan['makespan_ms'] / 1000:.1f} s "
+          f"(count-balanced: {plan['baseline_makespan_ms'] / 1000:.1f} s)")
+    print(f"Expected time to first failure {plan['expected_first_failure_ms'] / 1000:.1f} s "
+          f"(count-balanced, file order: {plan['baseline_first_failure_ms'] / 1000:.1f} s)")
+    for shard in plan['shards']:
+        print(f"  shard {shard['index']}: {len(shard['tests'])} tests, {shard['duration_ms'] / 1000:.1f} s, "
+              f"first failure expected after {shard['expected_first_failure_ms'] / 1000:.1f} s")
+    print(f'Wrote plan to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
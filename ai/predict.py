@@ -0,0 +1,205 @@
+"""Score upcoming tests with the failure-prediction model written by `train_model`.
+
+The model is loaded once per process with `joblib.load(mmap_mode='r')`, so the
+numpy arrays in the pickle are mapped from the file instead of being read into
+memory first, and kept in a cache keyed by path and file stamp, so a long-lived
+process pays the import and load once. A batch of tests is scored with a single
+vectorized `predict_proba` call over a feature matrix aligned to the model's
+training columns (missing features count as 0).
+
+Input is either a report (features are computed the way `train_model` computes
+them) or JSON/JSONL records with an `id` (or `suite` and `test_title`) and the
+feature values, flat or under `features`.
+
+Usage examples:
+  # Probability of failure for every test in the last report, most likely first
+  python -m ai.predict --model ai/models/model.pkl --report reports/report.json --top 20
+
+  # Score records from a file and write them as JSON for the planner
+  python -m ai.predict --model ai/models/model.pkl --input plan.jsonl --output reports/predictions.json
+
+  # Measure load time, per-batch latency and throughput
+  python -m ai.predict --model ai/models/model.pkl --report reports/report.json --benchmark 50
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Tuple, Union
+
+from ai.healing import report_analyzer as ra
+from ai.train_model import ID_COLUMNS, LABEL_COLUMN, extract_feature_frame
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+ID_FIELD = 'id'
+
+_models: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+_models_lock = threading.Lock()
+
+
+def test_id(suite: Any, test_title: Any) -> str:
+    """Identifier of a test across reports, predictions and plans."""
+    return f'{suite or ""}::{test_title or ""}'
+
+
+def load_model(path: str, mmap: bool = True) -> Any:
+    """Return the model at `path`, loading it only the first time or after the file changed."""
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    stamp = (st.st_size, st.st_mtime_ns)
+    with _models_lock:
+        cached = _models.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+    import joblib
+
+    model = joblib.load(key, mmap_mode='r' if mmap else None)
+    with _models_lock:
+        _models[key] = (stamp, model)
+    return model
+
+
+def clear_models() -> None:
+    with _models_lock:
+        _models.clear()
+
+
+def model_columns(model: Any) -> List[str]:
+    """Feature columns the model was trained on (the default feature set if it did not record them)."""
+    names = getattr(model, 'feature_names_in_', None)
+    if names is not None:
+        return [str(name) for name in names]
+    frame = extract_feature_frame([])
+    return [c for c in frame.columns if c not in ID_COLUMNS and c != LABEL_COLUMN]
+
+
+def read_records(path: str) -> List[Dict[str, Any]]:
+    """Read prediction input records from a JSON list or JSONL file ('-' for stdin)."""
+    f = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        text = f.read()
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    text = text.strip()
+    if text.startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class Predictor:
+    """A loaded model scoring batches of tests with one `predict_proba` call each."""
+
+    def __init__(self, model_path: str, mmap: bool = True):
+        self.model_path = model_path
+        self.model = load_model(model_path, mmap=mmap)
+        self.columns = model_columns(self.model)
+        classes = list(getattr(self.model, 'classes_', [0, 1]))
+        self._positive = classes.index(1) if 1 in classes else len(classes) - 1
+
+    def matrix(self, features: Union['pd.DataFrame', Iterable[Dict[str, Any]]]) -> 'pd.DataFrame':
+        """Align features (a frame, or records flat or with a `features` dict) to the model's columns."""
+        import pandas as pd
+
+        if not isinstance(features, pd.DataFrame):
+            features = pd.DataFrame.from_records(
+                [dict(r['features']) if isinstance(r.get('features'), dict) else r for r in features])
+        return features.reindex(columns=self.columns, fill_value=0).fillna(0).astype('float32')
+
+    def predict_proba(self, features: Union['pd.DataFrame', Iterable[Dict[str, Any]]]) -> 'np.ndarray':
+        """Return the failure probability of each row."""
+        X = self.matrix(features)
+        if not len(X):
+            import numpy as np
+
+            return np.zeros(0, dtype=np.float64)
+        return self.model.predict_proba(X)[:, self._positive]
+
+    def score_frame(self, frame: 'pd.DataFrame') -> List[Dict[str, Any]]:
+        """Score a `train_model.extract_feature_frame` table; returns [{id, suite, test_title, probability}]."""
+        probabilities = self.predict_proba(frame)
+        suites = frame['suite'].astype(object).where(frame['suite'].notna(), None).tolist()
+        titles = frame['test_title'].astype(object).where(frame['test_title'].notna(), None).tolist()
+        return [{ID_FIELD: test_id(suite, title), 'suite': suite, 'test_title': title, 'probability': float(p)}
+                for suite, title, p in zip(suites, titles, probabilities)]
+
+    def score_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score input records; each result keeps the record's id (or suite::title)."""
+        probabilities = self.predict_proba(records)
+        return [{ID_FIELD: r.get(ID_FIELD) or test_id(r.get('suite'), r.get('test_title')), 'probability': float(p)}
+                for r, p in zip(records, probabilities)]
+
+
+def benchmark(predictor: Predictor, features: Any, repeat: int = 20) -> Dict[str, Any]:
+    """Time `repeat` predictions of the same batch; returns latency percentiles (ms) and rows/s."""
+    X = predictor.matrix(features)
+    predictor.model.predict_proba(X)  # warm-up
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predictor.model.predict_proba(X)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        'rows': len(X),
+        'repeat': repeat,
+        'p50_ms': 1000 * latencies[len(latencies) // 2],
+        'p95_ms': 1000 * latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        'max_ms': 1000 * latencies[-1],
+        'rows_per_s': len(X) * repeat / total if total else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Predict which upcoming tests are likely to fail')
+    parser.add_argument('--model', default='ai/models/model.pkl', help='Model written by ai.train_model')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--report', help='Compute features from this report (JSON or XML)')
+    source.add_argument('--input', help="JSON or JSONL records with id/suite/test_title and features ('-' for stdin)")
+    parser.add_argument('--top', type=int, default=20, help='Print this many of the most likely failures')
+    parser.add_argument('--output', help='Write all predictions, most likely failure first, as JSON')
+    parser.add_argument('--no-mmap', action='store_true', help='Load the model into memory instead of mapping it')
+    parser.add_argument('--benchmark', type=int, metavar='REPEAT', help='Also time REPEAT predictions of the batch')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    predictor = Predictor(args.model, mmap=not args.no_mmap)
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if args.report:
+        features: Any = extract_feature_frame(ra.stream_report(args.report))
+        predictions = predictor.score_frame(features)
+    else:
+        features = read_records(args.input)
+        predictions = predictor.score_records(features)
+    elapsed = time.perf_counter() - start
+    predictions.sort(key=lambda p: -p['probability'])
+
+    print(f'Loaded {args.model} in {load_time * 1000:.1f} ms; scored {len(predictions)} tests in '
+          f'{elapsed * 1000:.1f} ms ({len(predictions) / elapsed if elapsed else 0:.0f} tests/s incl. features)')
+    for p in predictions[:args.top]:
+        print(f"{p['probability']:7.3f}  {p[ID_FIELD]}")
+
+    if args.benchmark:
+        stats = benchmark(predictor, features, repeat=args.benchmark)
+        print(f"\npredict_proba on {stats['rows']} rows: p50 {stats['p50_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms, "
+              f"max {stats['max_ms']:.2f} ms, {stats['rows_per_s']:.0f} rows/s")
+
+    if args.output:
+        out_dir = os.path.dirname(args.output)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(predictions, f, indent=2)
+        print(f'\nWrote predictions to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
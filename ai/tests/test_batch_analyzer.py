@@ -0,0 +1,105 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from collections import Counter
+from unittest import mock
+
+from ai.healing import batch_analyzer as ba
+from ai.healing import incremental
+from ai.healing import report_analyzer as ra
+from ai.healing.incremental import IncrementalAnalyzer
+
+
+class TestBatchAnalyzer(unittest.TestCase):
+    def setUp(self):
+        here = os.path.dirname(__file__)
+        self.sample_path = os.path.abspath(os.path.join(here, '..', 'data', 'sample_report.json'))
+        self.tmp = tempfile.mkdtemp()
+        for i in range(3):
+            run_dir = os.path.join(self.tmp, f'run-{i}')
+            os.makedirs(run_dir)
+            shutil.copy(self.sample_path, os.path.join(run_dir, 'report.json'))
+        with open(os.path.join(self.tmp, 'broken.json'), 'w', encoding='utf-8') as f:
+            f.write('{"suites": [')
+        with open(os.path.join(self.tmp, 'notes.txt'), 'w', encoding='utf-8') as f:
+            f.write('not a report')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_find_reports(self):
+        self.assertEqual(len(ba.find_reports(self.tmp)), 4)
+        self.assertEqual(len(ba.find_reports(os.path.join(self.tmp, 'run-*', '*.json'))), 3)
+
+    def test_analyze_many_merges_in_parallel(self):
+        results = list(ba.iter_analyze_many(ba.find_reports(self.tmp), workers=2))
+        errors = [path for path, result, error in results if error]
+        self.assertEqual([os.path.basename(p) for p in errors], ['broken.json'])
+
+        merged = ba.analyze_many(ba.find_reports(self.tmp), workers=2)
+        single = ra.analyze(path=self.sample_path)
+        self.assertEqual(merged.stats, {k: 3 * v for k, v in single.stats.items()})
+        self.assertEqual(merged.tests, 3 * single.tests)
+        # suggestions stay deduped per (test, error type) across reports
+        self.assertEqual(sorted(merged.suggestions), sorted(single.suggestions))
+
+    def test_merge_without_dedupe_keeps_all_suggestions(self):
+        paths = ba.find_reports(os.path.join(self.tmp, 'run-*', '*.json'))
+        merged = ba.analyze_many(paths, workers=1, dedupe=False)
+        self.assertEqual(len(merged.suggestions), 3 * len(ra.analyze_report(path=self.sample_path, dedupe=False)))
+
+    def test_incremental_updates_only_new_or_changed(self):
+        manifest = os.path.join(self.tmp, 'state', 'manifest.json')
+        paths = ba.find_reports(os.path.join(self.tmp, 'run-*', '*.json'))
+        first = IncrementalAnalyzer(manifest).update(paths)
+        self.assertEqual(len(first['added']), 3)
+
+        # a fresh instance picks up the manifest and has nothing to do
+        inc = IncrementalAnalyzer(manifest)
+        os.utime(paths[0], (1, 1))
+        summary = inc.update(paths)
+        self.assertEqual((summary['added'], summary['changed'], summary['unchanged']), ([], [], 3))
+        self.assertEqual(inc.totals.stats, ba.analyze_many(paths, workers=1).stats)
+
+        report = ra.load_report(path=paths[1])
+        report['suites'][0]['specs'][0]['tests'][0]['results'][0]['errors'] = [
+            {'message': 'net::ERR_CONNECTION_RESET'}, {'message': 'something odd'}, {'message': 'something odd'}]
+        with open(paths[1], 'w', encoding='utf-8') as f:
+            json.dump(report, f)
+        os.remove(paths[2])
+        remaining = paths[:2]
+        summary = inc.update(remaining)
+        self.assertEqual(len(summary['changed']), 1)
+        self.assertEqual(len(summary['removed']), 1)
+        full = ba.analyze_many(remaining, workers=1)
+        self.assertEqual(inc.totals.stats, full.stats)
+        self.assertEqual(inc.totals.by_test, full.by_test)
+        self.assertTrue(full.others)
+        self.assertEqual(inc.others, Counter(full.others))
+        self.assertEqual(IncrementalAnalyzer(manifest).totals.stats, full.stats)
+
+    def test_incremental_keeps_a_capped_sample_of_unmatched_messages(self):
+        manifest = os.path.join(self.tmp, 'manifest.json')
+        report = ra.load_report(path=self.sample_path)
+        report['suites'][0]['specs'][0]['tests'][0]['results'][0]['errors'] = [
+            {'message': f'odd {i}'} for i in (1, 2, 2, 3, 3, 3)]
+        path = os.path.join(self.tmp, 'odd.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f)
+        with mock.patch.object(incremental, 'MAX_OTHERS', 2):
+            # without dedupe every message of the test is counted
+            inc = IncrementalAnalyzer(manifest, dedupe=False)
+            inc.update([path, self.sample_path])
+        self.assertEqual(sorted((key[2], count) for key, count in inc.others.items()), [('odd 2', 2), ('odd 3', 3)])
+        self.assertEqual(inc.totals.others, [])
+        self.assertEqual(IncrementalAnalyzer(manifest, dedupe=False).others, inc.others)
+
+        # pruning the report takes its sample back out of the totals
+        inc.update([self.sample_path])
+        self.assertEqual(inc.others, Counter())
+
+
+if __name__ == '__main__':
+    unittest.main()
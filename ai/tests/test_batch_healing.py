@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from ai.benchmarks import synthetic
+from ai.healing import batch_healing as bh
+
+
+class TestBatchHealing(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        for project in ('chromium', 'webkit'):
+            run_dir = os.path.join(self.tmp, f'place-order-{project}')
+            os.makedirs(run_dir)
+            synthetic.write_playwright_trace(os.path.join(run_dir, 'trace.zip'), actions=3, elements=5)
+        synthetic.write_trace(os.path.join(self.tmp, 'legacy.zip'), '<button id="place-order-btn">Go</button>')
+        with open(os.path.join(self.tmp, 'broken.zip'), 'wb') as f:
+            f.write(b'not a zip')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_heal_many_in_parallel(self):
+        paths = bh.find_traces(self.tmp)
+        self.assertEqual(len(paths), 4)
+        self.assertEqual(len(bh.find_traces(os.path.join(self.tmp, '*', 'trace.zip'))), 2)
+
+        report = bh.heal_many(paths, workers=2, timeout=30)
+        summary = report['summary']
+        self.assertEqual(summary['traces'], 4)
+        # the broken archive has no trace data, which heal reports rather than raises
+        self.assertEqual(summary['outcomes'], {'suggested': 2, 'healed': 1, 'unresolved': 1})
+        self.assertEqual(summary['failed'], 0)
+        self.assertGreater(summary['throughput'], 0)
+        self.assertTrue(all('elapsed' in r for r in report['results'].values()))
+
+    def test_shared_healing_cache(self):
+        paths = bh.find_traces(os.path.join(self.tmp, '*', 'trace.zip'))
+        cache_path = os.path.join(self.tmp, 'cache', 'healing.db')
+        first = bh.heal_many(paths, workers=1, cache_path=cache_path)
+        # both projects failed on the same snapshot and selector
+        self.assertEqual(first['summary']['cache_hits'], 1)
+        second = bh.heal_many(paths, workers=2, cache_path=cache_path)
+        self.assertEqual(second['summary']['cache_hit_rate'], 1.0)
+        self.assertEqual({r['suggestions'][0] for r in second['results'].values()},
+                         {r['suggestions'][0] for r in first['results'].values()})
+
+    def test_per_trace_timeout(self):
+        paths = bh.find_traces(os.path.join(self.tmp, '*', 'trace.zip'))
+        with mock.patch.object(bh, 'heal', side_effect=lambda **kwargs: time.sleep(5)):
+            start = time.perf_counter()
+            report = bh.heal_many(paths, workers=1, timeout=0.2)
+        self.assertLess(time.perf_counter() - start, 3)
+        self.assertEqual(report['summary']['outcomes'], {'timeout': 2})
+        self.assertTrue(all(e.startswith('HealingTimeout') for e in report['summary']['errors'].values()))
+
+    def test_parent_enforces_timeout_without_sigalrm(self):
+        paths = bh.find_traces(os.path.join(self.tmp, '*', 'trace.zip'))
+        real_heal = bh.heal
+
+        def heal(trace_path, **kwargs):
+            if 'chromium' in trace_path:
+                time.sleep(30)
+            return real_heal(trace_path=trace_path, **kwargs)
+
+        seen = []
+        # forked workers inherit the patches: no timer, and a stuck chromium trace
+        with mock.patch.object(bh, '_can_alarm', return_value=False), mock.patch.object(bh, 'heal', heal):
+            for workers in (1, 2):
+                start = time.perf_counter()
+                report = bh.heal_many(paths, workers=workers, timeout=0.2,
+                                      on_result=lambda done, total, path, result, error: seen.append((done, total)))
+                self.assertLess(time.perf_counter() - start, 10)
+                self.assertEqual(report['summary']['outcomes'], {'timeout': 1, 'suggested': 1})
+                self.assertEqual(list(report['summary']['errors']), [paths[0]])
+        self.assertEqual(seen, [(1, 2), (2, 2)] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
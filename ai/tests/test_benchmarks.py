@@ -0,0 +1,40 @@
+import json
+import os
+import tempfile
+import unittest
+
+from ai.benchmarks import run_benchmarks, synthetic
+from ai.healing import report_analyzer as ra
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_synthetic_reports_are_analyzable(self):
+        report = synthetic.playwright_report(tests=30, retries=2, errors_per_result=2, failure_rate=1.0, seed=1)
+        analysis = ra.analyze(report=report)
+        self.assertEqual(analysis.tests, 30)
+        # 30 tests x 2 projects x 3 attempts x 2 errors
+        self.assertEqual(analysis.messages, 360)
+        self.assertEqual(report, synthetic.playwright_report(tests=30, retries=2, errors_per_result=2, failure_rate=1.0, seed=1))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'report.xml')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(synthetic.junit_report(tests=30, failure_rate=1.0, seed=1))
+            self.assertEqual(ra.analyze(path=path).messages, 30)
+
+    def test_run_records_timings_and_memory(self):
+        doc = run_benchmarks.run('tiny', only=['analyze_report', 'heal'], repeat=2, warmup=0)
+        self.assertEqual(set(doc['results']), {'analyze_report', 'heal'})
+        for result in doc['results'].values():
+            self.assertEqual(len(result['times']), 2)
+            self.assertGreater(result['peak_memory_bytes'], 0)
+        json.dumps(doc)
+
+        ratios = run_benchmarks.compare(doc, doc)
+        self.assertEqual(ratios['heal'], {'time': 1.0, 'memory': 1.0})
+        with self.assertRaises(ValueError):
+            run_benchmarks.run('tiny', only=['nope'], repeat=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from ai.healing import report_analyzer as ra
+from ai.healing.failure_store import FailureStore
+
+
+def _report(start, statuses):
+    specs = []
+    for title, status in statuses.items():
+        errors = [{'message': 'TimeoutError: locator.click: Timeout\n    at pages/CartPage.ts:12:5'}] if status == 'failed' else []
+        specs.append({'title': title, 'tests': [{'projectName': 'chromium', 'results': [
+            {'status': status, 'duration': 1500, 'retry': 0, 'startTime': start, 'errors': errors}]}]})
+    return {'suites': [{'title': 'cart.spec.ts', 'specs': specs}], 'stats': {'startTime': start}}
+
+
+class TestFailureStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.paths = []
+        for i, statuses in enumerate([{'checkout': 'failed', 'login': 'passed'},
+                                      {'checkout': 'passed', 'login': 'passed'}]):
+            path = os.path.join(self.tmp, f'report-{i}.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(_report(f'2026-01-0{i + 1}T10:00:00.000Z', statuses), f)
+            self.paths.append(path)
+        self.store = FailureStore(os.path.join(self.tmp, 'db', 'failures.db'))
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp)
+
+    def test_ingest_is_idempotent(self):
+        self.assertIsNotNone(self.store.ingest(self.paths[0]))
+        self.assertIsNone(self.store.ingest(self.paths[0]))
+        # same content under another name is recognised by its hash
+        copy = os.path.join(self.tmp, 'copy.json')
+        shutil.copy(self.paths[0], copy)
+        self.assertIsNone(self.store.ingest(copy))
+        self.assertEqual(len(self.store.runs()), 1)
+
+    def test_queries(self):
+        self.store.ingest_many(self.paths)
+        self.assertEqual(self.store.error_stats(), ra.get_error_stats(path=self.paths[0]))
+        failures = self.store.failures(test_title='checkout')
+        self.assertEqual(len(failures), 1)
+        self.assertEqual((failures[0]['file'], failures[0]['line'], failures[0]['project']), ('pages/CartPage.ts', 12, 'chromium'))
+        self.assertEqual(failures[0]['error_type'], 'Timeout')
+        jan_2 = failures[0]['started_at'] + 3600
+        self.assertEqual(self.store.error_stats(since=jan_2), {})
+        self.assertEqual([r['test_title'] for r in self.store.flaky_tests()], ['checkout'])
+        history = {r['test_title']: r for r in self.store.test_history()}
+        self.assertEqual((history['checkout']['runs'], history['checkout']['failed']), (2, 1))
+        self.assertEqual(history['login']['mean_duration_ms'], 1500)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from ai import feature_store as fs
+from ai import train_model as tm
+from ai.benchmarks import synthetic
+from ai.healing import report_analyzer as ra
+
+
+class TestFeatureStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.report = os.path.join(self.tmp, 'report.json')
+        with open(self.report, 'w', encoding='utf-8') as f:
+            json.dump(synthetic.playwright_report(tests=300, retries=1, errors_per_result=2, stack_depth=1,
+                                                  failure_rate=0.3, suites=3, attachment_bytes=0, seed=3), f)
+        self.root = os.path.join(self.tmp, 'features')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_loads_stored_columns_without_copying(self):
+        store = fs.FeatureStore(self.root)
+        frame = store.load(self.report)
+        pd.testing.assert_frame_equal(frame, tm.extract_feature_frame(ra.stream_report(self.report)))
+        self.assertEqual(list(frame.columns), store.columns)
+
+        training = store.load(self.report, columns=['num_errors', 'Timeout', 'failed'])
+        self.assertEqual(list(training.columns), ['num_errors', 'Timeout', 'failed'])
+        base = training['Timeout'].to_numpy()
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        self.assertIsInstance(base, np.memmap)
+        with self.assertRaises(KeyError):
+            store.load(self.report, columns=['no such type'])
+
+        # a second store reuses the entry and the indexed hash without reading the report
+        with mock.patch.object(ra, 'report_digest') as digest, mock.patch.object(ra, 'stream_report') as stream:
+            again = fs.FeatureStore(self.root)
+            self.assertEqual(again.materialize(self.report)['status'], 'cached')
+            digest.assert_not_called()
+            stream.assert_not_called()
+        self.assertEqual(again.stats()['entries'], 1)
+
+    def test_matcher_change_recounts_only_affected_columns(self):
+        fs.FeatureStore(self.root).materialize(self.report)
+        matchers = list(ra.DEFAULT_MATCHERS)
+        last_type = matchers[-1][1]
+        matchers.append((re.compile(r'synthetic', re.I), 'Synthetic', 'Look at the generator.'))
+        store = fs.FeatureStore(self.root, matchers=matchers)
+        with mock.patch.object(ra, 'stream_report', side_effect=AssertionError('report re-read')):
+            result = store.materialize(self.report)
+        self.assertEqual((result['status'], result['columns']), ('updated', ['others', 'Synthetic']))
+        self.assertNotIn(last_type, result['columns'])
+        pd.testing.assert_frame_equal(store.load(self.report),
+                                      tm.extract_feature_frame(ra.stream_report(self.report), matchers))
+
+        # back to the defaults: the extra column is dropped and `others` recounted
+        store = fs.FeatureStore(self.root)
+        self.assertEqual(store.materialize(self.report)['columns'], ['others'])
+        pd.testing.assert_frame_equal(store.load(self.report), tm.extract_feature_frame(ra.stream_report(self.report)))
+
+    def test_incremental_training_reads_the_store(self):
+        output = os.path.join(self.tmp, 'model.pkl')
+        plain = tm.train_incremental([self.report], output, batch_size=100, checkpoint_path=output + '.a')
+        stored = tm.train_incremental([self.report], output, batch_size=100, checkpoint_path=output + '.b',
+                                      store=fs.FeatureStore(self.root))
+        for key in ('batches', 'rows', 'skipped_batches', 'progressive_accuracy'):
+            self.assertEqual(stored[key], plain[key], key)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from ai.healing import healing_engine as he
+from ai.healing.healing_cache import HealingCache, cache_key, normalize_dom
+
+TRACE = {'error': {'selector': '#place-order-btn'},
+         'snapshot': {'dom': '<html><body>\n  <button id="place-order">Place order</button>\n</body></html>'}}
+
+
+class TestHealingCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = HealingCache(os.path.join(self.tmp, 'healing.db'))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmp)
+
+    def test_key_ignores_formatting(self):
+        self.assertEqual(normalize_dom('<div>\n  <a> x  y </a>\n</div>'), '<div><a> x y </a></div>')
+        self.assertEqual(cache_key('<p>a</p>\n<p>b</p>', '#x', '1'), cache_key('<p>a</p><p>b</p>', '#x', '1'))
+        self.assertNotEqual(cache_key('<p>a</p>', '#x', '1'), cache_key('<p>a</p>', '#y', '1'))
+        self.assertNotEqual(cache_key('<p>a</p>', '#x', '1'), cache_key('<p>a</p>', '#x', '2'))
+
+    def test_heal_reuses_cached_result(self):
+        first = he.heal(trace_data=TRACE, cache=self.cache)
+        self.assertNotIn('cached', first)
+        with mock.patch.object(he, '_diagnose') as diagnose:
+            second = he.heal(trace_data=TRACE, cache=self.cache)
+        diagnose.assert_not_called()
+        self.assertTrue(second.pop('cached'))
+        self.assertEqual(second['suggestions'], first['suggestions'])
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries'], stats['hit_rate']), (1, 1, 1, 0.5))
+
+    def test_lru_eviction(self):
+        cache = HealingCache(os.path.join(self.tmp, 'small.db'), max_entries=2)
+        for key in ('a', 'b'):
+            cache.put(key, {'key': key})
+        cache.get('a')  # 'b' is now the least recently used
+        cache.put('c', {'key': 'c'})
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), {'key': 'a'})
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+        cache.max_entries, cache.max_bytes = 10, 40
+        cache.put('d', {'key': 'd', 'pad': 'x' * 10})
+        self.assertEqual(cache.stats()['entries'], 1)  # only 'd' fits in 40 bytes
+        cache.close()
+
+    def test_totals_follow_the_table(self):
+        path = os.path.join(self.tmp, 'old.db')
+        # a database written before the totals were kept: they are counted once on open
+        conn = sqlite3.connect(path)
+        conn.executescript("CREATE TABLE entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                           "created_at REAL, last_access REAL, hits INTEGER DEFAULT 0);"
+                           "INSERT INTO entries(key, value, size) VALUES ('old', '{}', 2);")
+        conn.close()
+        cache = HealingCache(path)
+        self.addCleanup(cache.close)
+        cache.put('a', {'v': 1})
+        cache.put('a', {'v': 'longer'})
+        cache.put('b', {})
+
+        def table():
+            return tuple(cache.conn.execute('SELECT COUNT(*), SUM(size) FROM entries').fetchone())
+
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['bytes']), table())
+        self.assertEqual(stats['entries'], 3)
+        with HealingCache(path) as again:
+            self.assertEqual(again.stats()['bytes'], stats['bytes'])
+        cache.clear()
+        self.assertEqual((cache.stats()['entries'], cache.stats()['bytes']), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
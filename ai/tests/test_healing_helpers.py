@@ -1,6 +1,10 @@
 import unittest
+
 from ai.healing import dom_analyzer as da
+from ai.healing import dom_document as dd
+from ai.healing import dom_index as di
 from ai.healing import locator_recovery as lr
+from ai.healing.healing_engine import heal
 
 
 class TestHealingHelpers(unittest.TestCase):
@@ -17,6 +21,61 @@ class TestHealingHelpers(unittest.TestCase):
         self.assertIsInstance(suggestions, list)
         self.assertGreaterEqual(len(suggestions), 1)
 
+    def test_parse_dom_is_cached_by_content(self):
+        dd.clear_cache()
+        html = '<html><body><button id="btn" class="primary">Click me</button></body></html>'
+        doc = dd.parse_dom(html)
+        self.assertIs(dd.parse_dom(''.join(['<html><body>', html[12:]])), doc)
+        self.assertIs(dd.parse_dom(doc), doc)
+        self.assertIs(da.to_soup(html), doc.soup)
+        self.assertIs(lr.to_soup(html), doc.soup)
+        self.assertEqual(dd.cache_info()['misses'], 1)
+        self.assertEqual(da.analyze_dom(doc, 'button#btn')['matches'], 1)
+        self.assertTrue(lr.suggest_alternative_locator(doc, broken_selector='.nonexistent'))
+
+        small = dd._DocumentCache(maxsize=2, max_bytes=100)
+        first = small.get('<p>' + 'a' * 60 + '</p>', 'html.parser')
+        small.get('<p>' + 'b' * 60 + '</p>', 'html.parser')
+        self.assertEqual(small.info()['size'], 1)
+        self.assertIsNot(small.get('<p>' + 'a' * 60 + '</p>', 'html.parser'), first)
+
+    def test_heal_parses_snapshot_once(self):
+        dd.clear_cache()
+        trace = {'error': {'selector': '#gone'},
+                 'snapshot': {'dom': '<html><body><button id="btn">Place order</button></body></html>'}}
+        first = heal(trace_data=trace)
+        second = heal(trace_data=trace)
+        # analyze_dom and suggest_alternative_locator share the document parsed by heal
+        self.assertEqual(dd.cache_info(), {'hits': 1, 'misses': 1, 'size': 1, 'bytes': len(trace['snapshot']['dom'])})
+        self.assertEqual(first, second)
+        self.assertEqual(first['suggestions'], ["button:has-text('Place order')"])
+
+    def test_dom_index_lookups(self):
+        html = ('<html><body><div id="cart-panel" class="panel panel-open" role="dialog">'
+                '<button id="place-order-btn" class="btn btn-success" data-testid="place-order">Place  Order</button>'
+                '<input name="credit-card" aria-label="Credit card"></div>'
+                '<a class="btn nav-link" href="#">Cart</a></body></html>')
+        index = di.DomIndex(dd.DomDocument(html, parser='html.parser').soup)
+        self.assertEqual(index.find('id', 'order')['id'], 'place-order-btn')
+        self.assertEqual(index.find('id', 'c')['id'], 'cart-panel')
+        self.assertIsNone(index.find('id', 'checkout'))
+        self.assertEqual([el.name for el in index.find_all('class', 'btn')], ['button', 'a'])
+        self.assertEqual([el.name for el in index.exact('class', 'panel-open')], ['div'])
+        self.assertEqual(index.find('role', 'dialog')['id'], 'cart-panel')
+        self.assertEqual(index.find('aria-label', 'card')['name'], 'credit-card')
+        self.assertEqual(index.find('text', 'PLACE order')['id'], 'place-order-btn')
+        self.assertEqual([el.name for el in index.tags(['a', 'input', 'button'])], ['button', 'input', 'a'])
+
+    def test_suggest_uses_attribute_index(self):
+        html = ('<html><body><div class="card-action" id="card-1">Open</div>'
+                '<button class="btn btn-primary" data-testid="place-order-button">Place Order</button></body></html>')
+        doc = dd.parse_dom(html)
+        suggestions = lr.suggest_alternative_locator(doc, broken_selector='#place-order .primary')
+        self.assertEqual(suggestions[:3], ['[data-testid="place-order-button"]', '.btn', "button:has-text('Place Order')"])
+        index = doc.index
+        lr.suggest_alternative_locator(doc, broken_selector='#card')
+        self.assertIs(doc.index, index)
+
 
 if __name__ == '__main__':
     unittest.main()
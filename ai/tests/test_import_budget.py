@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+HEAVY = ('bs4', 'numpy', 'pandas', 'sklearn', 'joblib', 'streamlit', 'plotly', 'matplotlib')
+# entry points that must start without the DOM, ML or dashboard stacks
+LIGHT_MODULES = (
+    'ai.healing.report_analyzer', 'ai.healing.batch_analyzer', 'ai.healing.failure_store',
+    'ai.healing.incremental', 'ai.healing.healing_cache', 'ai.healing.trace_index',
+    'ai.healing.healing_engine', 'ai.healing.batch_healing', 'ai.healing.service', 'ai.train_model', 'ai.predict',
+    'ai.planner', 'ai.feature_store',
+)
+# seconds, for the import alone (the interpreter start-up is not counted); ~30 ms locally
+IMPORT_BUDGET = 0.5
+
+_PROBE = '''
+import json, logging, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules],
+                   "handlers": len(logging.getLogger().handlers)}}))
+'''
+
+
+def probe(module):
+    """Import `module` in a fresh interpreter and report its import time, heavy modules and root log handlers."""
+    code = _PROBE.format(module=module, heavy=HEAVY)
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+class TestImportBudget(unittest.TestCase):
+    def test_entry_points_import_lazily(self):
+        for module in LIGHT_MODULES:
+            with self.subTest(module=module):
+                result = probe(module)
+                self.assertEqual(result['heavy'], [])
+                self.assertLess(result['elapsed'], IMPORT_BUDGET)
+
+    def test_importing_does_not_configure_logging(self):
+        for module in ('ai.healing.dom_analyzer', 'ai.healing.locator_recovery', 'ai.healing.trace_parser'):
+            with self.subTest(module=module):
+                self.assertEqual(probe(module)['handlers'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from unittest import mock
+
+from ai.benchmarks import synthetic
+from ai.healing import dom_document as dd
+from ai.healing import locator_scoring as ls
+from ai.healing.healing_engine import heal
+
+HTML = '''
+<html><body>
+  <nav><a href="/cart">Cart</a><a href="/orders">My orders</a></nav>
+  <form>
+    <input name="email" placeholder="Email">
+    <input type="hidden" name="order-token" value="x">
+    <button class="btn secondary" type="button">Cancel</button>
+    <button id="submit-order" class="btn primary">Place order</button>
+  </form>
+</body></html>
+'''
+
+
+class TestLocatorScoring(unittest.TestCase):
+    def test_parse_selector(self):
+        self.assertEqual(ls.parse_selector('div.wrapper > span.price[data-kind="a.b"]'),
+                         {'tag': 'span', 'role': None, 'text': None, 'values': ['wrapper', 'price', 'a.b']})
+        parsed = ls.parse_selector('internal:role=button[name="Place order"i]')
+        self.assertEqual((parsed['role'], parsed['text']), ('button', 'Place order'))
+        self.assertEqual(ls.parse_selector("button:has-text('Go')")['text'], 'Go')
+        self.assertEqual(ls.words('placeOrder-btn_2'), ['place', 'order', 'btn', '2'])
+
+    def test_rank_candidates(self):
+        ranked = ls.rank_candidates(HTML, '#place-order-btn')
+        self.assertEqual(ranked[0]['selector'], '#submit-order')
+        self.assertGreater(ranked[0]['confidence'], 0.9)
+        self.assertAlmostEqual(sum(r['confidence'] for r in ls.rank_candidates(HTML, 'button', top_k=10, min_score=0)),
+                               1.0, places=3)
+
+        self.assertEqual(ls.rank_candidates(HTML, 'internal:role=link[name="orders"i]')[0]['selector'],
+                         "a:has-text('My orders')")
+        self.assertEqual(ls.rank_candidates(HTML, 'input[name="e-mail"]')[0]['selector'], 'input[name="email"]')
+        # hidden inputs are penalized below anything visible
+        self.assertNotIn('input[name="order-token"]', [r['selector'] for r in ls.rank_candidates(HTML, '#order-token')])
+        # nothing resembling the selector: no suggestions
+        self.assertEqual(ls.rank_candidates(HTML, '#zzz'), [])
+
+    def test_heal_orders_suggestions_by_score(self):
+        result = heal(trace_data={'error': {'selector': 'button.btn-place-order'}, 'snapshot': {'dom': HTML}})
+        self.assertEqual(result['suggestions'][0], '#submit-order')
+        self.assertEqual(result['ranked'][0]['selector'], '#submit-order')
+        self.assertLessEqual(len(result['suggestions']), 5)
+
+    def test_matrix_is_built_once_per_document(self):
+        doc = dd.parse_dom(synthetic.dom_snapshot(elements=10000, depth=6, seed=1))
+        matrix = ls.candidate_matrix(doc)
+        self.assertIs(ls.candidate_matrix(doc), matrix)
+        self.assertGreater(matrix.size, 1000)
+        first = ls.rank_candidates(doc, '#place-order-btn')
+        # later queries reuse the matrix; their latency is the rank_candidates_warm benchmark
+        with mock.patch.object(ls, 'CandidateMatrix', side_effect=AssertionError('matrix rebuilt')):
+            for _ in range(3):
+                self.assertEqual(ls.rank_candidates(doc, '#place-order-btn'), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
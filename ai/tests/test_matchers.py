@@ -0,0 +1,59 @@
+import re
+import unittest
+
+from ai.healing import report_analyzer as ra
+from ai.healing.matchers import MatcherSet, compile_matchers
+
+
+def _first_by_loop(matchers, text):
+    for idx, (pattern, _, _) in enumerate(matchers):
+        if pattern.search(text):
+            return idx
+    return None
+
+
+class TestMatcherSet(unittest.TestCase):
+    TEXTS = [
+        'Test timeout of 30000ms exceeded.',
+        'TimeoutError: locator.click: Timeout 5000ms exceeded.',
+        'Error: strict mode violation: getByRole("button") resolved to 2 elements',
+        'selector matched 3 elements',
+        'Error: page.goto: net::ERR_NAME_NOT_RESOLVED',
+        'TypeError: Cannot read properties of undefined',
+        'JavaScript heap   overflow',
+        'FrameDetached while waiting',
+        'ſtrict mode violation',
+        'nothing to see here',
+        '',
+    ]
+
+    def test_first_matches_sequential_loop(self):
+        engine = MatcherSet(ra.DEFAULT_MATCHERS)
+        for text in self.TEXTS:
+            self.assertEqual(engine.first(text), _first_by_loop(ra.DEFAULT_MATCHERS, text), text)
+
+    def test_all_and_custom_patterns(self):
+        matchers = [
+            (re.compile(r'(\w+) \1'), 'Repeated word', ''),
+            (re.compile(r'(?<!soft )assert(?:ion)? failed', re.I), 'Assertion', ''),
+            (re.compile(r'^\s*$'), 'Empty', ''),
+            (re.compile(r'ab?c'), 'Short', ''),
+        ] + list(ra.DEFAULT_MATCHERS)
+        engine = compile_matchers(matchers)
+        for text in self.TEXTS + ['the the timeouterror', 'Soft assertion failed', 'ASSERT FAILED', 'ac', 'xabcx']:
+            expected = [i for i, (p, _, _) in enumerate(matchers) if p.search(text)]
+            self.assertEqual(engine.all(text), expected, text)
+            self.assertEqual(engine.first(text), expected[0] if expected else None, text)
+
+    def test_compile_matchers_is_reused_and_pluggable(self):
+        engine = compile_matchers(ra.DEFAULT_MATCHERS)
+        self.assertIs(compile_matchers(ra.DEFAULT_MATCHERS), engine)
+        self.assertIs(compile_matchers(engine), engine)
+        self.assertEqual(list(engine), list(ra.DEFAULT_MATCHERS))
+        report = {'suites': [{'title': 'S', 'specs': [
+            {'title': 'T', 'tests': [{'results': [{'errors': [{'message': 'Test timeout exceeded'}]}]}]}]}]}
+        self.assertEqual(ra.get_error_stats(report=report, matchers=engine), {'Test timeout': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
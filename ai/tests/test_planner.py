@@ -0,0 +1,124 @@
+import itertools
+import json
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+from ai import planner
+from ai.benchmarks import synthetic
+from ai.healing import report_analyzer as ra
+
+
+class TestPlanner(unittest.TestCase):
+    def test_packing_and_fail_fast_order(self):
+        durations = [7, 5, 4, 3, 2, 2, 1]
+        shards = planner.pack_shards(durations, 2)
+        self.assertEqual(sorted(i for shard in shards for i in shard), list(range(len(durations))))
+        self.assertEqual(sorted(sum(durations[i] for i in shard) for shard in shards), [12, 12])
+
+        tests = [{'id': str(i), 'duration_ms': d, 'probability': p}
+                 for i, (d, p) in enumerate([(10, 0.1), (1, 0.05), (5, 0.5), (20, 0.9), (3, 0.01)])]
+        ordered = planner.fail_fast_order(tests)
+        best = min(planner.expected_first_failure(order) for order in itertools.permutations(tests))
+        self.assertAlmostEqual(planner.expected_first_failure(ordered), best)
+        self.assertEqual(planner.expected_first_failure([]), 0.0)
+
+        pattern = re.compile(planner.grep_pattern([{'suite': '001.spec.ts', 'test_title': 'adds (2) items'},
+                                                   {'suite': '003.spec.ts', 'test_title': 'logs in'}]))
+        self.assertTrue(pattern.search(' chromium 001.spec.ts adds (2) items'))
+        self.assertTrue(pattern.search(' webkit 003.spec.ts Login logs in @smoke'))
+        self.assertFalse(pattern.search(' chromium 003.spec.ts logs in twice'))
+        self.assertFalse(pattern.search(' chromium 001.spec.ts logs in'))
+        self.assertFalse(re.search(planner.grep_pattern([]), 'anything'))
+
+    def test_same_title_in_two_files(self):
+        history = {}
+        for suite, ms in (('a.spec.ts', 9000.0), ('b.spec.ts', 8000.0), ('c.spec.ts', 1000.0)):
+            stats = planner._stats(suite, 'loads')
+            stats.update(runs=1, results=1, total_ms=ms)
+            history[stats['id']] = stats
+        plan = planner.plan_tests(history, shards=2)
+        titles = {suite: f' chromium {suite} loads' for suite in ('a.spec.ts', 'b.spec.ts', 'c.spec.ts')}
+        selected = []
+        for shard in plan['shards']:
+            pattern = re.compile(shard['grep']['all'])
+            selected.append({suite for suite, title in titles.items() if pattern.search(title)})
+            self.assertEqual(selected[-1], {t['suite'] for t in shard['tests']})
+        self.assertEqual(selected, [{'a.spec.ts'}, {'b.spec.ts', 'c.spec.ts'}])
+
+        # shard 1 also takes tests the plan does not know about; no test runs twice
+        invert = re.compile(plan['shards'][0]['grep_invert']['all'])
+        self.assertFalse(invert.search(titles['a.spec.ts']))
+        self.assertTrue(invert.search(titles['b.spec.ts']))
+        self.assertFalse(invert.search(' chromium d.spec.ts brand new'))
+
+    def test_empty_phases_are_left_out(self):
+        stats = planner._stats('a.spec.ts', 'only')
+        stats.update(runs=1, results=1, total_ms=100.0)
+        plan = planner.plan_tests({stats['id']: stats}, shards=2)
+        self.assertEqual(sorted(plan['shards'][0]['grep']), ['all', 'head'])
+        self.assertEqual(plan['shards'][1]['grep'], {})
+
+    def test_nested_describe_blocks(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            result = {'status': 'passed', 'duration': 1200, 'errors': []}
+            report = {'suites': [{'title': '003_Login.spec.ts', 'specs': [
+                {'title': 'top level', 'tests': [{'projectName': 'chromium', 'results': [result]}]}],
+                'suites': [{'title': 'Login', 'specs': [], 'suites': [{'title': 'with valid user', 'specs': [
+                    {'title': 'logs in', 'tests': [{'projectName': 'chromium', 'results': [result]}]}]}]}]}]}
+            path = os.path.join(tmp, 'report.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f)
+            history = planner.history_from_reports([path])
+            self.assertEqual(sorted(history), ['003_Login.spec.ts::logs in', '003_Login.spec.ts::top level'])
+            self.assertEqual(history['003_Login.spec.ts::logs in']['total_ms'], 1200)
+            self.assertEqual(list(ra.iter_result_records(path, nested=True)),
+                             list(ra.iter_result_records(path, stream=True, nested=True)))
+            # the default still skips nested suites
+            self.assertEqual(len(list(ra.iter_result_records(path, stream=True))), 1)
+            pattern = re.compile(planner.plan_tests(history, shards=1)['shards'][0]['grep']['all'])
+            self.assertTrue(pattern.search(' chromium 003_Login.spec.ts Login with valid user logs in'))
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_plan_from_reports(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            paths = []
+            for seed in range(3):
+                report = synthetic.playwright_report(tests=60, retries=1, errors_per_result=1, stack_depth=1,
+                                                     failure_rate=0.2, suites=3, attachment_bytes=0, seed=seed)
+                paths.append(os.path.join(tmp, f'report-{seed}.json'))
+                with open(paths[-1], 'w', encoding='utf-8') as f:
+                    json.dump(report, f)
+            history = planner.history_from_reports(paths)
+            self.assertEqual(len(history), 60)
+            self.assertTrue(all(s['runs'] == 3 and s['results'] >= 3 for s in history.values()))
+
+            new_test = 'suite-000.spec.ts::brand new test'
+            plan = planner.plan_tests(history, {new_test: 0.9}, shards=3)
+            planned = [t for shard in plan['shards'] for t in shard['tests']]
+            self.assertEqual(len(planned), 61)
+            self.assertLessEqual(plan['makespan_ms'], plan['baseline_makespan_ms'])
+            self.assertLessEqual(plan['expected_first_failure_ms'], plan['baseline_first_failure_ms'])
+            self.assertEqual({t['source'] for t in planned if t['id'] == new_test}, {'model'})
+            for shard in plan['shards']:
+                self.assertEqual(shard['tests'], planner.fail_fast_order(shard['tests']))
+                head = re.compile(shard['grep']['head'])
+                self.assertTrue(head.search(f"chromium {shard['tests'][0]['suite']} {shard['tests'][0]['test_title']}"))
+
+            out = os.path.join(tmp, 'plan', 'plan.json')
+            planner.write_plan(plan, out)
+            with open(out, encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['tests'], 61)
+            with self.assertRaises(ValueError):
+                planner.plan_tests(history, shards=0)
+        finally:
+            shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    unittest.main()
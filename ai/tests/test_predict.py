@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import joblib
+from sklearn.ensemble import RandomForestClassifier
+
+from ai import predict
+from ai import train_model as tm
+from ai.benchmarks import synthetic
+
+
+class TestPredictor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        report = synthetic.playwright_report(tests=200, retries=0, errors_per_result=1, stack_depth=2,
+                                             failure_rate=0.4, suites=2, attachment_bytes=0, seed=7)
+        self.frame = tm.extract_feature_frame(report)
+        X = self.frame.drop(columns=list(tm.ID_COLUMNS) + [tm.LABEL_COLUMN])
+        self.model_path = os.path.join(self.tmp, 'model.pkl')
+        joblib.dump(RandomForestClassifier(n_estimators=5, random_state=0).fit(X, self.frame['failed']), self.model_path)
+        predict.clear_models()
+
+    def tearDown(self):
+        predict.clear_models()
+        shutil.rmtree(self.tmp)
+
+    def test_model_is_loaded_once(self):
+        first = predict.load_model(self.model_path)
+        self.assertIs(predict.load_model(self.model_path), first)
+        # rewriting the file invalidates the cached model; the explicit mtime does not rely on clock resolution
+        st = os.stat(self.model_path)
+        joblib.dump(joblib.load(self.model_path), self.model_path)
+        os.utime(self.model_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        self.assertIsNot(predict.load_model(self.model_path), first)
+
+    def test_scores_frames_and_records(self):
+        predictor = predict.Predictor(self.model_path)
+        scored = predictor.score_frame(self.frame)
+        self.assertEqual(len(scored), len(self.frame))
+        failing = [row['probability'] for row, failed in zip(scored, self.frame['failed']) if failed]
+        passing = [row['probability'] for row, failed in zip(scored, self.frame['failed']) if not failed]
+        self.assertGreater(min(failing), max(passing))
+        self.assertEqual(scored[0]['id'], predict.test_id(self.frame['suite'][0], self.frame['test_title'][0]))
+
+        records = [{'id': 'flaky', 'features': {'num_errors': 3, 'Timeout': 3}},
+                   {'suite': 'a.spec.ts', 'test_title': 'passes', 'num_errors': 0}]
+        results = predictor.score_records(records)
+        self.assertEqual([r['id'] for r in results], ['flaky', 'a.spec.ts::passes'])
+        self.assertGreater(results[0]['probability'], results[1]['probability'])
+        self.assertEqual(len(predictor.predict_proba([])), 0)
+
+        stats = predict.benchmark(predictor, self.frame, repeat=3)
+        self.assertEqual((stats['rows'], stats['repeat']), (len(self.frame), 3))
+        self.assertGreater(stats['rows_per_s'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,13 @@
 import unittest
+import io
 import os
 import json
+import tempfile
 
 from ai.healing import report_analyzer as ra
+from ai.healing.json_stream import JsonStream
+from ai.healing.message_cache import ClassificationCache
+from ai.healing.source_cache import SourceCache
 
 
 class TestReportAnalyzer(unittest.TestCase):
@@ -33,6 +38,145 @@ class TestReportAnalyzer(unittest.TestCase):
         self.assertGreaterEqual(stats.get('Test timeout', 0), 1)
         self.assertGreaterEqual(stats.get('Broken selector', 0), 1)
 
+    def test_analyze_single_pass(self):
+        result = ra.analyze(report=self.sample)
+        self.assertEqual(result.suggestions, ra.analyze_report(report=self.sample))
+        self.assertEqual(result.stats, ra.get_error_stats(report=self.sample))
+        self.assertEqual(result.by_suite['Example Suite'], result.stats)
+        self.assertEqual(result.by_test['002 - Example test - Broken selector'], {'Broken selector': 1})
+        self.assertEqual(result.tests, 2)
+
+    def test_analyze_collects_others(self):
+        report = {'suites': [{'title': 'S', 'specs': [
+            {'title': 'T', 'tests': [{'results': [{'errors': [{'message': 'something odd'}, {'message': 'something odd'}]}]}]},
+        ]}]}
+        result = ra.analyze(report=report)
+        self.assertEqual(result.stats, {'Others': 1})
+        self.assertEqual(result.others, [('S', 'T', 'something odd')])
+        self.assertEqual(result.suggestions, [])
+        self.assertEqual(ra.analyze(report=report, dedupe=False).stats, {'Others': 2})
+
+    def test_repeated_messages_hit_cache(self):
+        error = {'message': '\x1b[31mTimeoutError: locator.click: Timeout\x1b[39m\n    at pages/CartPage.ts:12:5'}
+        report = {'suites': [{'title': 'S', 'specs': [
+            {'title': f'T{i}', 'tests': [{'projectName': p, 'results': [{'errors': [error]}]} for p in ('chromium', 'webkit')]}
+            for i in range(5)]}]}
+        ra.message_cache.clear()
+        first = ra.analyze(report=report, return_details=True)
+        self.assertEqual(first.stats, {'Timeout': 5})
+        info = ra.cache_info()
+        # split, classification and location are each computed once for the repeated message
+        self.assertEqual(info['misses'], 4)
+        self.assertGreater(info['hits'], 0)
+        self.assertEqual(ra.analyze(report=report, return_details=True).suggestions, first.suggestions)
+        self.assertEqual(ra.cache_info()['misses'], 4)
+
+    def test_classification_cache_is_bounded(self):
+        cache = ClassificationCache(maxsize=2)
+        for text in ('a', 'b', 'a', 'c'):
+            cache.get('upper', text, str.upper)
+        self.assertEqual(cache.info()['size'], 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        # 'b' was least recently used and got evicted
+        cache.get('upper', 'b', str.upper)
+        self.assertEqual(cache.misses, 4)
+
+    def test_source_cache_snippets(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'Page.ts')
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                f.write('\r\n'.join(f'line {i}' for i in range(1, 21)) + '\r\n')
+            expected = ra._read_source_snippet(path, 10)
+            self.assertEqual(expected['snippet'].splitlines()[3], 'line 10')
+            with SourceCache() as cache, SourceCache(mmap_threshold=0) as mapped:
+                self.assertEqual(cache.snippet(path, 10), expected)
+                self.assertEqual(mapped.snippet(path, 10), expected)
+                self.assertEqual(mapped.snippet(path, 20), ra._read_source_snippet(path, 20))
+                self.assertIs(cache.lines(cache.resolve(path)), cache.lines(cache.resolve(path)))
+                # rewriting the file invalidates the cached index
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write('changed\n')
+                os.utime(path, ns=(0, 0))
+                self.assertEqual(cache.snippet(path, 1)['snippet'], 'changed')
+                self.assertIsNone(cache.snippet(os.path.join(tmp, 'missing.ts'), 1))
+
+    def test_stream_report_matches_loaded_report(self):
+        streamed = list(ra.stream_report(self.sample_path))
+        loaded = list(ra.default_playwright_extractor(self.sample))
+        self.assertEqual(streamed, loaded)
+        self.assertEqual(ra.get_error_stats(path=self.sample_path, stream=True), ra.get_error_stats(report=self.sample))
+        self.assertEqual(ra.analyze_report(path=self.sample_path, stream=True), ra.analyze_report(report=self.sample))
+
+    def test_stream_skips_attachments(self):
+        report = {
+            'config': {'workers': 2, 'projects': [{'name': 'chromium'}]},
+            'suites': [{
+                'title': 'cart.spec.ts',
+                'specs': [{
+                    'title': 'Place order "quoted" \\ title',
+                    'tests': [{'projectName': 'webkit', 'results': [{
+                        'duration': 1234,
+                        'attachments': [{'name': 'video', 'body': 'QUJD' * 5000}],
+                        'stdout': [{'text': 'x' * 3000}],
+                        'errors': [{'message': '\x1b[31mTimeoutError: locator.click\x1b[39m\n    at pages/CartPage.ts:12:5'}],
+                    }]}],
+                }],
+                'suites': [{'title': 'nested', 'specs': [{'title': 'ignored', 'tests': []}]}],
+            }],
+            'stats': {'duration': 99.5},
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'report.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=1)
+            meta = {}
+            specs = list(ra.iter_playwright_specs(path, meta=meta))
+            self.assertEqual(list(ra.stream_report(path)), list(ra.default_playwright_extractor(report)))
+        self.assertEqual(meta['stats'], {'duration': 99.5})
+        self.assertEqual(len(specs), 1)
+        result = specs[0][1]['tests'][0]['results'][0]
+        self.assertNotIn('attachments', result)
+        self.assertNotIn('stdout', result)
+        self.assertEqual(result['duration'], 1234)
+
+    def test_stream_junit_report(self):
+        xml = (
+            '<?xml version="1.0"?><testsuites>'
+            '<testsuite name="checkout" timestamp="2026-01-01T10:00:00">'
+            '<system-out>' + 'suite log ' * 1000 + '</system-out>'
+            '<testcase name="pays" classname="CartPage" time="1.5">'
+            '<failure message="t">TimeoutError: locator.click: Timeout</failure>'
+            '<system-out>noisy output</system-out></testcase>'
+            '<testcase name="skips" time="0.1"><skipped/></testcase>'
+            '<testsuite name="nested"><testcase name="inner"><error>net::ERR_FAILED</error></testcase></testsuite>'
+            '</testsuite></testsuites>'
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'results.xml')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(xml)
+            streamed = list(ra.stream_report(path))
+            self.assertEqual(streamed, list(ra.junit_xml_extractor(ra.load_report(path=path))))
+            with_output = list(ra.stream_junit_report(path, include_output=True))
+            records = list(ra.iter_result_records(path=path, stream=True))
+            self.assertEqual(ra.get_error_stats(path=path, stream=True), ra.get_error_stats(path=path))
+        self.assertEqual(streamed[0], ('checkout', 'pays', ['TimeoutError: locator.click: Timeout']))
+        self.assertEqual(streamed[2], ('nested', 'inner', ['net::ERR_FAILED']))
+        self.assertEqual(with_output[0][2], ['TimeoutError: locator.click: Timeout', 'noisy output'])
+        self.assertEqual([(r['status'], r['duration']) for r in records], [('failed', 1500.0), ('skipped', 100.0), ('failed', None)])
+
+    def test_json_stream_small_chunks(self):
+        doc = {'a': [1, 23456, -7.5e3, True, None, 'es\\c"aped'], 'b': {'c': 'x' * 50}, 'd': 'tail'}
+        stream = JsonStream(io.StringIO(json.dumps(doc)), chunk_size=3)
+        keys = []
+        for key in stream.iter_object():
+            keys.append(key)
+            if key == 'b':
+                stream.skip_value()
+            else:
+                self.assertEqual(stream.read_value(), doc[key])
+        self.assertEqual(keys, ['a', 'b', 'd'])
+
 
 if __name__ == '__main__':
     unittest.main()
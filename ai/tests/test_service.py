@@ -0,0 +1,170 @@
+import asyncio
+import http.client
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from ai.benchmarks import synthetic
+from ai.healing.service import HealingService
+
+
+class TestHealingService(unittest.TestCase):
+    WORKERS = 1
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.trace = os.path.join(cls.tmp, 'trace.zip')
+        synthetic.write_playwright_trace(cls.trace, actions=3, elements=5)
+        cls.loop = asyncio.new_event_loop()
+        cls.service = HealingService(workers=cls.WORKERS, cache_path=os.path.join(cls.tmp, 'healing.db'))
+        cls.loop.run_until_complete(cls.service.start(port=0))
+        cls.port = cls.service.address[1]
+        cls.thread = threading.Thread(target=cls.loop.run_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        asyncio.run_coroutine_threadsafe(cls.service.close(), cls.loop).result(10)
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.thread.join(10)
+        cls.loop.close()
+        shutil.rmtree(cls.tmp)
+
+    def request(self, method, path, payload=None, conn=None):
+        own = conn is None
+        conn = conn or http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+        try:
+            body = payload if isinstance(payload, (bytes, type(None))) else json.dumps(payload)
+            conn.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            if own:
+                conn.close()
+
+    def raw_request(self, data):
+        with socket.create_connection(('127.0.0.1', self.port), timeout=30) as sock:
+            sock.sendall(data)
+            response = sock.makefile('rb').read()
+        head, _, body = response.partition(b'\r\n\r\n')
+        return int(head.split()[1]), json.loads(body)
+
+    def test_health_and_errors(self):
+        status, health = self.request('GET', '/health')
+        self.assertEqual((status, health['status'], health['workers']), (200, 'ok', self.WORKERS))
+        self.assertEqual(self.request('GET', '/nope')[0], 404)
+        self.assertEqual(self.request('GET', '/heal')[0], 405)
+        self.assertEqual(self.request('POST', '/heal', b'{not json')[0], 400)
+        self.assertEqual(self.request('POST', '/suggest', {'selector': '#x'})[0], 400)
+        for bad in ('five', 2.5, -1, [3]):
+            status, result = self.request('POST', '/suggest', {'html': '<a>x</a>', 'max_suggestions': bad})
+            self.assertEqual((status, result['error']), (400, 'max_suggestions must be a positive integer'))
+
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+        self.addCleanup(conn.close)
+        conn.putrequest('POST', '/heal')
+        conn.putheader('Content-Length', 'lots')
+        conn.endheaders()
+        response = conn.getresponse()
+        self.assertEqual((response.status, json.loads(response.read())), (400, {'error': 'invalid Content-Length'}))
+
+        # oversized or too many header lines are refused rather than dropping the connection
+        status, result = self.raw_request(b'GET /health HTTP/1.1\r\nX-Big: ' + b'a' * 70000 + b'\r\n\r\n')
+        self.assertEqual(status, 431)
+        many = b''.join(b'X-%d: 1\r\n' % i for i in range(200))
+        self.assertEqual(self.raw_request(b'GET /health HTTP/1.1\r\n' + many + b'\r\n')[0], 431)
+        # the server is still answering
+        self.assertEqual(self.request('GET', '/health')[0], 200)
+
+    def test_concurrent_heal_and_suggest(self):
+        html = '<form><button id="place-order">Place order</button><a href="/cart">Cart</a></form>'
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+        self.addCleanup(conn.close)
+        # keep-alive: several requests on one connection
+        for _ in range(2):
+            status, result = self.request('POST', '/suggest', {'html': html, 'selector': '#place-order-btn'}, conn)
+            self.assertEqual(status, 200)
+            self.assertEqual(result['suggestions'][0], '#place-order')
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            responses = list(pool.map(lambda _: self.request('POST', '/heal', {'trace_path': self.trace}), range(6)))
+        self.assertTrue(all(status == 200 for status, _ in responses))
+        self.assertEqual({result['selector'] for _, result in responses}, {'#place-order-btn'})
+        self.assertTrue(any(result.get('cached') for _, result in responses))
+
+        status, stats = self.request('GET', '/stats')
+        self.assertGreaterEqual(stats['requests']['heal'], 6)
+        self.assertGreaterEqual(stats['cache']['hits'], 1)
+        self.assertIn('p95', stats['latency_ms']['heal'])
+
+    def test_replaces_broken_and_timed_out_pools(self):
+        if not self.WORKERS:
+            self.skipTest('thread pools cannot break')
+        html = '<form><button id="place-order">Place order</button></form>'
+        restarts = self.service.restarts
+        # a worker killed from outside (e.g. the OOM killer): the request is retried on a new pool
+        for process in list(self.service._pool._processes.values()):
+            process.kill()
+        status, result = self.request('POST', '/suggest', {'html': html, 'selector': '#place-order-btn'})
+        self.assertEqual((status, result['suggestions'][0]), (200, '#place-order'))
+        self.assertEqual(self.service.restarts, restarts + 1)
+
+        # a timed-out job (a DOM that takes seconds to parse) is stopped by replacing the pool
+        slow = '<div>' + '<button class="b">x</button>' * 100000 + '</div>'
+        self.service.timeout = 0.05
+        try:
+            self.assertEqual(self.request('POST', '/suggest', {'html': slow, 'selector': '#x'})[0], 504)
+        finally:
+            self.service.timeout = 60.0
+        self.assertEqual(self.service.restarts, restarts + 2)
+        status, stats = self.request('GET', '/stats')
+        self.assertEqual((status, stats['pool_restarts']), (200, restarts + 2))
+        self.assertEqual(self.request('POST', '/suggest', {'html': html, 'selector': '#x'})[0], 200)
+
+
+class TestServiceShutdown(unittest.TestCase):
+    def test_close_ends_keep_alive_connections(self):
+        async def scenario():
+            service = HealingService(workers=0, cache_path=None)
+            await service.start(port=0)
+            reader, writer = await asyncio.open_connection(*service.address[:2])
+            writer.write(b'GET /health HTTP/1.1\r\n\r\n')
+            await writer.drain()
+            self.assertIn(b'200 OK', await reader.readline())
+            self.assertEqual(len(service._connections), 1)
+            await service.close()
+            self.assertEqual(service._connections, {})
+            # the server side of the idle connection has been closed
+            await reader.read()
+            self.assertTrue(reader.at_eof())
+            writer.close()
+
+        asyncio.run(scenario())
+
+
+class TestThreadedHealingService(TestHealingService):
+    # jobs run on the server's thread pool and share one healing cache connection
+    WORKERS = 0
+
+    def test_concurrent_heals_share_the_cache(self):
+        def heal(i):
+            html = f'<form><button id="order-{i % 4}">Place order {i}</button></form>'
+            return self.request('POST', '/heal', {'html': html, 'selector': f'#gone-{i % 4}'})
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            responses = list(pool.map(heal, range(16)))
+        self.assertEqual([status for status, _ in responses], [200] * 16)
+        status, stats = self.request('GET', '/stats')
+        self.assertEqual(status, 200)
+        self.assertNotIn('heal', stats['errors'])
+        self.assertGreaterEqual(stats['cache']['hits'] + stats['cache']['misses'], 16)
+
+
+if __name__ == '__main__':
+    unittest.main()
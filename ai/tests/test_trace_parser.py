@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+from ai.benchmarks import synthetic
+from ai.healing import trace_index as ti
+from ai.healing import trace_parser as tp
+from ai.healing.healing_engine import heal
+
+
+def _line(event):
+    return json.dumps(event, separators=(',', ':'))
+
+
+class TestTraceParser(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.trace = synthetic.write_playwright_trace(os.path.join(self.tmp, 'trace.zip'), actions=4, elements=3,
+                                                      screencast_bytes=100)
+
+    def tearDown(self):
+        for name in os.listdir(self.tmp):
+            os.remove(os.path.join(self.tmp, name))
+        os.rmdir(self.tmp)
+
+    def test_iter_trace_events_filters_by_type(self):
+        types = [e['type'] for e in tp.iter_trace_events(self.trace)]
+        self.assertIn('screencast-frame', types)
+        self.assertIn('resource-snapshot', types)
+        actions = list(tp.iter_trace_events(self.trace, types=tp.ACTION_EVENTS))
+        self.assertEqual({e['type'] for e in actions}, {'before', 'after'})
+        self.assertEqual(len(actions), 8)
+        network = list(tp.iter_trace_events(self.trace, types=tp.NETWORK_EVENTS, members=['trace.network']))
+        self.assertEqual(len(network), 1)
+
+    def test_find_failure_resolves_snapshot_references(self):
+        failure = tp.find_failure(self.trace)
+        self.assertEqual(failure['error']['selector'], '#place-order-btn')
+        self.assertEqual(failure['error']['callId'], 'call@4')
+        self.assertIn('Timeout 5000ms', failure['error']['message'])
+        self.assertEqual(failure['snapshot']['name'], 'after@call@4')
+        # the <head> is a reference back to the first snapshot
+        self.assertTrue(failure['snapshot']['dom'].startswith('<!DOCTYPE html><html><head><title>Store</title></head><body>'))
+        self.assertIn('data-testid="place-order"', failure['snapshot']['dom'])
+
+    def test_nested_references_and_fallback_snapshot(self):
+        path = os.path.join(self.tmp, 'nested.zip')
+        frame = {'pageId': 'page@1', 'frameId': 'frame@1', 'frameUrl': 'https://example.test/'}
+        snapshots = [
+            ['HTML', {}, ['BODY', {}, ['P', {'class': 'a&b'}, 'one < two'], ['BR', {}]]],
+            # post-order of snapshot 0: 'one < two', P, BR, BODY, HTML
+            ['HTML', {}, ['BODY', {}, [[1, 1]], ['SPAN', {}, 'new']]],
+            # snapshot 1 only expanded 'new', SPAN, BODY, HTML; its <p> lives in snapshot 0
+            ['HTML', {}, [[1, 2]]],
+        ]
+        lines = [_line({'type': 'before', 'callId': 'call@1', 'apiName': 'locator.fill', 'pageId': 'page@1',
+                        'params': {'selector': 'input[name=q]'}})]
+        for i, html in enumerate(snapshots):
+            lines.append(_line({'type': 'frame-snapshot', 'snapshot': dict(frame, snapshotName=f'before@call@{i}',
+                                                                           html=html, timestamp=float(i), isMainFrame=True)}))
+        lines.append(_line({'type': 'frame-snapshot', 'snapshot': {'pageId': 'page@1', 'frameId': 'frame@2',
+                                                                   'snapshotName': 'other', 'html': ['HTML', {}],
+                                                                   'timestamp': 2.5, 'isMainFrame': False}}))
+        lines.append(_line({'type': 'after', 'callId': 'call@1', 'endTime': 3.0,
+                            'error': {'error': {'message': 'Timeout', 'name': 'TimeoutError'}}}))
+        with zipfile.ZipFile(path, 'w') as zf:
+            zf.writestr('trace.trace', '\n'.join(lines) + '\nnot json\n')
+
+        failure = tp.find_failure(path)
+        self.assertEqual(failure['error']['selector'], 'input[name=q]')
+        self.assertEqual(failure['error']['message'], 'Timeout')
+        self.assertEqual(failure['snapshot']['name'], 'before@call@2')
+        self.assertEqual(failure['snapshot']['dom'],
+                         '<html><body><p class="a&amp;b">one &lt; two</p><span>new</span></body></html>')
+
+    def test_extract_trace_data_and_heal(self):
+        data = tp.extract_trace_data(self.trace)
+        self.assertEqual(data['error']['selector'], '#place-order-btn')
+        self.assertIn('<body>', data['snapshot']['dom'])
+        result = heal(trace_path=self.trace)
+        self.assertFalse(result['ok'])
+        self.assertEqual(result['reason'], 'Selector not found')
+        self.assertTrue(result['suggestions'])
+
+        # archives without event members still return their first JSON document
+        legacy = synthetic.write_trace(os.path.join(self.tmp, 'legacy.zip'), '<button id="place-order-btn">Go</button>')
+        self.assertTrue(heal(trace_path=legacy)['ok'])
+
+    def test_trace_index_sidecar(self):
+        with zipfile.ZipFile(self.trace, 'a') as zf:
+            zf.writestr('resources/' + 'ab' * 20 + '.jpeg', b'jpeg-bytes')
+        index = ti.TraceIndex.load(self.trace)
+        self.assertTrue(os.path.exists(ti.index_path(self.trace)))
+        self.assertEqual(len(index.actions), 4)
+        self.assertEqual(index.failed_action()['callId'], 'call@4')
+        self.assertEqual(index.action('call@2')['snapshots'], ['after@call@2', 'before@call@2'])
+        self.assertEqual(index.snapshot_at(25.0)['snapshotName'], 'after@call@2')
+        self.assertEqual(index.resource('ab' * 20), b'jpeg-bytes')
+        self.assertIn('data-testid="place-order"', index.snapshot_html('before@call@3'))
+        self.assertEqual(index.failure(), tp.find_failure(self.trace))
+        # the sidecar points at the failure snapshot instead of holding its DOM
+        with open(ti.index_path(self.trace), encoding='utf-8') as f:
+            cached = json.load(f)['failure']['snapshot']
+        self.assertNotIn('dom', cached)
+        self.assertEqual(cached['location'], index.snapshot(cached['name'])['location'])
+        self.assertEqual([n for n in os.listdir(self.tmp) if n.endswith('.tmp')], [])
+
+        # a valid sidecar answers without touching the trace events again
+        with mock.patch.object(ti, 'scan_trace', side_effect=AssertionError('rescanned')), \
+                mock.patch.object(ti, 'failure_context', side_effect=AssertionError('re-read')):
+            self.assertEqual(heal(trace_path=self.trace)['selector'], '#place-order-btn')
+
+        synthetic.write_playwright_trace(self.trace, actions=2, elements=3, selector='#other')
+        self.assertEqual(ti.TraceIndex.load(self.trace).failure()['error']['selector'], '#other')
+        self.assertIsNone(ti.TraceIndex.load(synthetic.write_trace(os.path.join(self.tmp, 'legacy.zip'), '<p></p>')))
+
+
+if __name__ == '__main__':
+    unittest.main()
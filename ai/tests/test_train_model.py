@@ -0,0 +1,161 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import joblib
+
+from ai import train_model as tm
+from ai.benchmarks import synthetic
+from ai.healing import report_analyzer as ra
+
+TESTS = [
+    ('cart.spec.ts', 'adds item', ['TimeoutError: locator.click: Timeout 30000ms exceeded',
+                                   'TimeoutError: locator.click: Timeout 30000ms exceeded',
+                                   'something odd happened']),
+    ('cart.spec.ts', 'removes item', []),
+    ('home.spec.ts', 'loads', ['Error: strict mode violation: locator resolved to 2 elements']),
+    (None, None, ['net::ERR_CONNECTION_REFUSED at http://localhost']),
+]
+
+
+class TestFeatureFrame(unittest.TestCase):
+    def test_counts_and_dtypes(self):
+        frame = tm.extract_feature_frame(TESTS)
+        self.assertEqual(list(frame.columns[:5]), ['suite', 'test_title', 'num_errors', 'total_msg_len', 'others'])
+        self.assertEqual(frame.columns[-1], 'failed')
+        self.assertEqual(str(frame['suite'].dtype), 'category')
+        self.assertEqual(frame['suite'].cat.categories.tolist(), ['cart.spec.ts', 'home.spec.ts'])
+        self.assertEqual(str(frame['num_errors'].dtype), 'int32')
+        self.assertEqual(str(frame['Timeout'].dtype), 'int32')
+        self.assertEqual(str(frame['failed'].dtype), 'int8')
+
+        self.assertEqual(frame['num_errors'].tolist(), [3, 0, 1, 1])
+        self.assertEqual(frame['Timeout'].tolist(), [2, 0, 0, 0])
+        self.assertEqual(frame['others'].tolist(), [1, 0, 0, 0])
+        self.assertEqual(frame['Broken selector'].tolist(), [0, 0, 1, 0])
+        self.assertEqual(frame['Network error'].tolist(), [0, 0, 0, 1])
+        self.assertEqual(frame['failed'].tolist(), [1, 0, 1, 1])
+        self.assertEqual(frame['total_msg_len'].iloc[0], sum(len(m) for m in TESTS[0][2]))
+
+    def test_rows_match_per_message_classification(self):
+        rows = tm.extract_features(TESTS)
+        self.assertIsNone(rows[3]['suite'])
+        for row, (suite, title, messages) in zip(rows, TESTS):
+            self.assertEqual((row['suite'], row['test_title']), (suite, title))
+            expected = {}
+            for text in messages:
+                matched = ra.classify_message(text)
+                key = ra.DEFAULT_MATCHERS[matched[0]][1] if matched else 'others'
+                expected[key] = expected.get(key, 0) + 1
+            for key, count in expected.items():
+                self.assertEqual(row[key], count)
+            self.assertIsInstance(row['num_errors'], int)
+        self.assertEqual(tm.extract_features([]), [])
+
+
+class TestIncrementalTraining(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.paths = []
+        for seed in range(2):
+            path = os.path.join(self.tmp, f'report-{seed}.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(synthetic.playwright_report(tests=300, retries=1, errors_per_result=1, stack_depth=2,
+                                                      failure_rate=0.3, suites=3, attachment_bytes=0, seed=seed), f)
+            self.paths.append(path)
+        self.output = os.path.join(self.tmp, 'model.pkl')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_batches_are_bounded(self):
+        batches = list(tm.iter_feature_batches(self.paths, batch_size=128))
+        self.assertEqual([len(frame) for _, _, frame in batches], [128, 128, 44, 128, 128, 44])
+        self.assertEqual([number for _, number, _ in batches], [0, 1, 2, 0, 1, 2])
+        skipped = list(tm.iter_feature_batches(self.paths, batch_size=128, skip={self.paths[0]: 2}))
+        self.assertEqual(len(skipped), 4)
+
+    def test_learners(self):
+        for learner in tm.LEARNERS:
+            with self.subTest(learner=learner):
+                summary = tm.train_incremental(self.paths, self.output, learner=learner, batch_size=128,
+                                               trees_per_batch=2)
+                self.assertEqual((summary['batches'], summary['rows']), (6, 600))
+                self.assertGreater(summary['progressive_accuracy'], 0.9)
+                model = joblib.load(self.output)
+                frame = tm.extract_feature_frame(tm.ra.stream_report(self.paths[0]))
+                X = frame.drop(columns=list(tm.ID_COLUMNS) + [tm.LABEL_COLUMN])
+                self.assertEqual(model.predict_proba(X).shape, (300, 2))
+        self.assertEqual(joblib.load(self.output).n_estimators, 12)
+
+    def test_resume_after_interruption(self):
+        real_fit = tm._fit_batch
+        calls = []
+
+        def failing_fit(*args):
+            calls.append(1)
+            if len(calls) == 4:
+                raise KeyboardInterrupt
+            return real_fit(*args)
+
+        with mock.patch.object(tm, '_fit_batch', side_effect=failing_fit):
+            with self.assertRaises(KeyboardInterrupt):
+                tm.train_incremental(self.paths, self.output, batch_size=128)
+        state = joblib.load(self.output + '.ckpt')
+        self.assertEqual(state['progress']['batches'], 3)
+        self.assertEqual(len(state['progress']['done']), 1)
+
+        with mock.patch.object(tm, '_fit_batch', side_effect=real_fit) as fit:
+            summary = tm.train_incremental(self.paths, self.output, batch_size=128, resume=True)
+        # only the three batches of the second report are trained again
+        self.assertEqual(fit.call_count, 3)
+        self.assertEqual((summary['batches'], summary['rows'], summary['trained_reports']), (6, 600, 1))
+        with self.assertRaises(ValueError):
+            tm.train_incremental(self.paths, self.output, batch_size=64, resume=True)
+
+
+class TestHyperparameterSearch(unittest.TestCase):
+    def test_search_persists_best_model_and_timings(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        report = synthetic.playwright_report(tests=200, retries=0, errors_per_result=1, stack_depth=2,
+                                             failure_rate=0.4, suites=2, attachment_bytes=0, seed=5)
+        features = tm.extract_feature_frame(report)
+        output = os.path.join(tmp, 'model.pkl')
+        grid = {'n_estimators': [5, 10], 'max_depth': [None, 2]}
+        results = tm.search(features, output, grid=grid, cv=3, n_jobs=2, scoring='accuracy')
+
+        self.assertEqual(len(results['candidates']), 4)
+        self.assertEqual(len(results['folds']), 12)
+        self.assertTrue(all(run['fit_time'] > 0 and run['predict_time'] > 0 for run in results['folds']))
+        scores = [c['mean_score'] for c in results['candidates']]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(results['best'], results['candidates'][0])
+
+        model = joblib.load(output)
+        self.assertEqual(model.get_params()['n_estimators'], results['best']['params']['n_estimators'])
+        with open(os.path.join(tmp, 'model.search.json'), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['best'], json.loads(json.dumps(results['best'])))
+        with self.assertRaises(ValueError):
+            tm.search(features, output, scoring='auc')
+
+    def test_search_needs_enough_rows_of_each_class(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        output = os.path.join(tmp, 'model.pkl')
+        features = tm.extract_feature_frame(synthetic.playwright_report(
+            tests=30, retries=0, errors_per_result=1, stack_depth=1, failure_rate=0.0, suites=1,
+            attachment_bytes=0, seed=1))
+        with self.assertRaisesRegex(ValueError, 'all 30 tests passed'):
+            tm.search(features, output, cv=3)
+        features.loc[:1, tm.LABEL_COLUMN] = 1
+        with self.assertRaisesRegex(ValueError, 'only 2 failed'):
+            tm.search(features, output, cv=3)
+        self.assertFalse(os.path.exists(output))
+
+
+if __name__ == '__main__':
+    unittest.main()
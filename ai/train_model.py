@@ -13,70 +13,200 @@ Usage examples:
   # Train using sample report provided with the repo
   python ai/train_model.py --report ai/data/sample_report.json --output ai/models/sample_model.pkl
 
+  # Train incrementally on every archived report, 20k tests per batch, resumable
+  python ai/train_model.py --reports reports/archive --learner sgd --batch-size 20000 --resume
+
+  # Same, reading features materialized once per report instead of re-parsing every report
+  python ai/train_model.py --reports reports/archive --feature-store ai/models/features
+
+  # Cross-validated hyperparameter search on all cores; writes the best model and model.search.json
+  python ai/train_model.py --report reports/report.json --search --cv 5 --grid '{"n_estimators": [100, 300]}'
+
 This script requires scikit-learn and pandas (listed in requirements.txt).
+They are imported only where they are used (feature extraction imports pandas
+and numpy, training scikit-learn), so importing this module and the CLI's
+argument parsing do not pay for them.
 """
 import argparse
-import os
+import itertools
 import json
-from typing import Any, Dict, List
-
-import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report
-import joblib
+import logging
+import os
+import time
+import xml.etree.ElementTree as ET
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from ai.healing import report_analyzer as ra
+from ai.healing.matchers import compile_matchers
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+LEARNERS = ('sgd', 'forest')
+# hyperparameters searched by `search` unless a grid is given
+DEFAULT_GRID = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [None, 8, 16],
+    'max_features': ['sqrt', 0.5, None],
+}
+SCORINGS = ('f1', 'accuracy', 'balanced_accuracy')
+ID_COLUMNS = ('suite', 'test_title')
+LABEL_COLUMN = 'failed'
+CLASSES = (0, 1)
+
+
+def _iter_report_tests(parsed_report: Any) -> Iterable[Tuple[Any, Any, List[Any]]]:
+    if isinstance(parsed_report, dict) or ET.iselement(parsed_report):
+        return ra.iter_tests(report=parsed_report)
+    return parsed_report
+
+
+def _int_column(values: 'np.ndarray') -> 'np.ndarray':
+    """Downcast non-negative integer counts to int32 unless they do not fit."""
+    import numpy as np
+
+    return values.astype(np.int32 if values.max(initial=0) <= np.iinfo(np.int32).max else np.int64)
+
+
+def message_table(parsed_report: Any) -> Dict[str, Any]:
+    """Flatten tests and their messages into arrays; the part of feature extraction that reads the report.
+
+    Returns `suites`, `titles` and `texts` (distinct values, in first-seen
+    order) and int32 arrays `test_suite` and `test_title` (per test, -1 for a
+    missing value), `msg_test` and `msg_text` (per message: its test and text).
+    """
+    import numpy as np
+
+    suites: Dict[Any, int] = {}
+    titles: Dict[Any, int] = {}
+    texts: Dict[str, int] = {}
+    test_suite = array('i')
+    test_title = array('i')
+    msg_test = array('i')
+    msg_text = array('i')
+    for test, (suite, title, messages) in enumerate(_iter_report_tests(parsed_report)):
+        # -1 is the categorical code for a missing value
+        test_suite.append(-1 if suite is None else suites.setdefault(suite, len(suites)))
+        test_title.append(-1 if title is None else titles.setdefault(title, len(titles)))
+        for message in messages:
+            msg_test.append(test)
+            msg_text.append(texts.setdefault(ra.message_text(message), len(texts)))
+    return {
+        'suites': list(suites),
+        'titles': list(titles),
+        'texts': list(texts),
+        'test_suite': np.array(test_suite, dtype=np.int32),
+        'test_title': np.array(test_title, dtype=np.int32),
+        'msg_test': np.array(msg_test, dtype=np.int32),
+        'msg_text': np.array(msg_text, dtype=np.int32),
+    }
+
+
+def error_type_counts(texts: List[str], msg_test: 'np.ndarray', msg_text: 'np.ndarray', n_tests: int,
+                      matchers=None) -> Dict[str, 'np.ndarray']:
+    """Per-test int32 counts of messages by error type: `others` first, then one column per type.
 
+    Every distinct text is classified once (first matching matcher wins) and the
+    counts are built with a single `np.bincount`.
+    """
+    import numpy as np
 
-def extract_features(parsed_report: Any) -> List[Dict]:
-    """Return a list of feature dicts, one per test case found in the report."""
-    rows = []
-    # select extractor
-    extractor = ra.default_playwright_extractor if isinstance(parsed_report, dict) else ra.junit_xml_extractor
-    for suite, test_title, messages in extractor(parsed_report):
-        num_errors = len(messages)
-        total_len = sum(len(m or '') for m in messages)
-        # count by matcher types
-        counts = {}
-        for _, err_type, _ in ra.DEFAULT_MATCHERS:
-            counts[err_type] = 0
-        others = 0
-        for m in messages:
-            matched = False
-            for pattern, err_type, _ in ra.DEFAULT_MATCHERS:
-                if pattern.search((m or '')):
-                    counts[err_type] += 1
-                    matched = True
-                    break
-            if not matched:
-                others += 1
-
-        row = {
-            'suite': suite,
-            'test_title': test_title,
-            'num_errors': num_errors,
-            'total_msg_len': total_len,
-            'others': others,
-        }
-        row.update(counts)
+    engine = compile_matchers(ra.DEFAULT_MATCHERS if matchers is None else matchers)
+    error_types = list(dict.fromkeys(err_type for _, err_type, _ in engine))
+    column_of = [error_types.index(err_type) for _, err_type, _ in engine]
+    others = len(error_types)
+    text_type = np.fromiter(((others if (idx := engine.first(text)) is None else column_of[idx]) for text in texts),
+                            dtype=np.int64, count=len(texts))
+    counts = np.bincount(msg_test.astype(np.int64) * (others + 1) + text_type[msg_text],
+                         minlength=n_tests * (others + 1)).reshape(n_tests, others + 1).astype(np.int32)
+    columns = {'others': counts[:, others]}
+    for column, err_type in enumerate(error_types):
+        columns[err_type] = counts[:, column]
+    return columns
+
+
+def base_columns(table: Dict[str, Any]) -> Dict[str, 'np.ndarray']:
+    """num_errors and total_msg_len (int32 unless too large) and the `failed` label (int8) of a `message_table`."""
+    import numpy as np
+
+    n_tests = len(table['test_suite'])
+    msg_test, msg_text = table['msg_test'], table['msg_text']
+    text_len = np.fromiter((len(text) for text in table['texts']), dtype=np.int64, count=len(table['texts']))
+    num_errors = np.bincount(msg_test, minlength=n_tests)
+    total_len = np.bincount(msg_test, weights=text_len[msg_text], minlength=n_tests).astype(np.int64)
+    return {
+        'num_errors': _int_column(num_errors),
+        'total_msg_len': _int_column(total_len),
         # label: failed if any error present
-        row['failed'] = 1 if num_errors > 0 else 0
-        rows.append(row)
-    return rows
+        LABEL_COLUMN: (num_errors > 0).astype(np.int8),
+    }
+
+
+def extract_feature_frame(parsed_report: Any, matchers=None) -> 'pd.DataFrame':
+    """Return the per-test features as a DataFrame, one row per test case.
+
+    Columns: suite and test_title (categorical), num_errors, total_msg_len and
+    others, one count per error type of `matchers` (default
+    `ra.DEFAULT_MATCHERS`, first matching matcher wins), all int32, and the
+    `failed` label (int8). Messages are collected into flat arrays of test and
+    distinct-text ids (`message_table`), each distinct text is classified once,
+    and the counts are built with `np.bincount`, so no per-test dicts are created.
+
+    `parsed_report` is either a parsed report (JSON dict or XML Element) or an
+    iterable of (suite, test_title, messages) tuples such as `ra.stream_report(path)`.
+    """
+    import pandas as pd
+
+    table = message_table(parsed_report)
+    base = base_columns(table)
+    label = base.pop(LABEL_COLUMN)
+    columns: Dict[str, Any] = {
+        'suite': pd.Categorical.from_codes(table['test_suite'], categories=table['suites']),
+        'test_title': pd.Categorical.from_codes(table['test_title'], categories=table['titles']),
+        **base,
+    }
+    columns.update(error_type_counts(table['texts'], table['msg_test'], table['msg_text'],
+                                     len(table['test_suite']), matchers))
+    columns[LABEL_COLUMN] = label
+    return pd.DataFrame(columns)
+
+
+def extract_features(parsed_report: Any, matchers=None) -> List[Dict]:
+    """Return a list of feature dicts, one per test case found in the report.
+
+    A row-wise view of `extract_feature_frame` for callers that want plain dicts;
+    training uses the frame directly.
+    """
+    frame = extract_feature_frame(parsed_report, matchers)
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+
+def feature_matrix(features: 'pd.DataFrame') -> 'pd.DataFrame':
+    """The model inputs of a feature frame: every column except the ids and the label."""
+    return features.drop(columns=[c for c in features.columns if c in ID_COLUMNS or c == LABEL_COLUMN])
 
 
 def load_parsed(path: str):
     return ra.load_report(path=path)
 
 
-def train(features: pd.DataFrame, output_path: str, test_size: float = 0.2, random_state: int = 42):
-    X = features.drop(columns=['suite', 'test_title', 'failed'])
-    y = features['failed']
+def train(features: 'pd.DataFrame', output_path: str, test_size: float = 0.2, random_state: int = 42,
+          n_jobs: int = -1):
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import classification_report
+    from sklearn.model_selection import train_test_split
+
+    X = feature_matrix(features)
+    y = features[LABEL_COLUMN]
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
 
-    clf = RandomForestClassifier(n_estimators=100, random_state=random_state)
+    # n_jobs=-1 builds the trees on every core
+    clf = RandomForestClassifier(n_estimators=100, random_state=random_state, n_jobs=n_jobs)
     clf.fit(X_train, y_train)
 
     preds = clf.predict(X_test)
@@ -91,33 +221,378 @@ def train(features: pd.DataFrame, output_path: str, test_size: float = 0.2, rand
     print(f'Wrote model to {output_path}')
 
 
+def _score(scoring: str, y_true: Any, y_pred: Any) -> float:
+    from sklearn import metrics
+
+    if scoring == 'f1':
+        return float(metrics.f1_score(y_true, y_pred, zero_division=0))
+    if scoring == 'balanced_accuracy':
+        return float(metrics.balanced_accuracy_score(y_true, y_pred))
+    return float(metrics.accuracy_score(y_true, y_pred))
+
+
+def _evaluate_fold(params: Dict[str, Any], fold: int, X: 'np.ndarray', y: 'np.ndarray', train_idx: 'np.ndarray',
+                   test_idx: 'np.ndarray', scoring: str, random_state: int) -> Dict[str, Any]:
+    """Fit one candidate on one fold (single-threaded; folds run in parallel) and time fit and predict."""
+    from sklearn.ensemble import RandomForestClassifier
+
+    clf = RandomForestClassifier(random_state=random_state, n_jobs=1, **params)
+    start = time.perf_counter()
+    clf.fit(X[train_idx], y[train_idx])
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    preds = clf.predict(X[test_idx])
+    predict_time = time.perf_counter() - start
+    return {'params': params, 'fold': fold, 'score': _score(scoring, y[test_idx], preds),
+            'fit_time': fit_time, 'predict_time': predict_time,
+            'train_size': len(train_idx), 'test_size': len(test_idx)}
+
+
+def search(features: 'pd.DataFrame', output_path: str, grid: Optional[Dict[str, List[Any]]] = None, cv: int = 5,
+           scoring: str = 'f1', n_jobs: int = -1, random_state: int = 42,
+           results_path: Optional[str] = None) -> Dict[str, Any]:
+    """Cross-validated grid search over RandomForest hyperparameters, evaluated in parallel.
+
+    Every (candidate, fold) pair of `grid` (default `DEFAULT_GRID`) and a
+    stratified `cv`-fold split is fitted in its own joblib worker (`n_jobs`,
+    -1 for every core); the feature matrix is shared with the workers by memory
+    mapping rather than copied. Candidates are ranked by mean `scoring`, ties
+    going to the faster fit. The best one is refitted on all rows with every
+    core building trees and written to `output_path`; the per-fold fit/predict
+    timings and scores and the per-candidate summary are written as JSON to
+    `results_path` (default: `output_path` with a .search.json suffix).
+    Returns that results dict. Raises ValueError when a class has fewer than
+    `cv` rows, since every fold needs both passing and failing tests.
+    """
+    import joblib
+    import numpy as np
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import ParameterGrid, StratifiedKFold
+
+    if scoring not in SCORINGS:
+        raise ValueError(f'Unknown scoring {scoring!r}; expected one of {SCORINGS}')
+    X_frame = feature_matrix(features)
+    X = X_frame.to_numpy()
+    y = features[LABEL_COLUMN].to_numpy()
+    if cv < 2:
+        raise ValueError(f'cv must be at least 2, got {cv}')
+    classes, counts = np.unique(y, return_counts=True)
+    names = ['failed' if label else 'passed' for label in classes]
+    if len(classes) < 2:
+        raise ValueError(f'Cross-validation needs passing and failing tests; all {len(y)} tests {names[0]}')
+    if counts.min() < cv:
+        raise ValueError(f'{cv}-fold cross-validation needs at least {cv} tests of each class; only '
+                         f'{counts.min()} {names[counts.argmin()]} (lower --cv or add reports)')
+    candidates = list(ParameterGrid(grid or DEFAULT_GRID))
+    folds = list(StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state).split(X, y))
+
+    start = time.perf_counter()
+    fold_results = joblib.Parallel(n_jobs=n_jobs)(
+        joblib.delayed(_evaluate_fold)(params, fold, X, y, train_idx, test_idx, scoring, random_state)
+        for params in candidates for fold, (train_idx, test_idx) in enumerate(folds))
+    search_time = time.perf_counter() - start
+
+    summary = []
+    for index, params in enumerate(candidates):
+        runs = fold_results[index * cv:(index + 1) * cv]
+        scores = np.array([run['score'] for run in runs])
+        summary.append({
+            'params': params,
+            'mean_score': float(scores.mean()),
+            'std_score': float(scores.std()),
+            'mean_fit_time': float(np.mean([run['fit_time'] for run in runs])),
+            'mean_predict_time': float(np.mean([run['predict_time'] for run in runs])),
+        })
+    summary.sort(key=lambda c: (-c['mean_score'], c['mean_fit_time']))
+    best = summary[0]
+
+    start = time.perf_counter()
+    model = RandomForestClassifier(random_state=random_state, n_jobs=n_jobs, **best['params'])
+    # fitted on the frame so the model records its feature names for `ai.predict`
+    model.fit(X_frame, y)
+    refit_time = time.perf_counter() - start
+    _dump(model, output_path)
+
+    results = {
+        'scoring': scoring,
+        'cv': cv,
+        'rows': int(len(y)),
+        'features': list(X_frame.columns),
+        'best': best,
+        'refit_time': refit_time,
+        'search_time': search_time,
+        'candidates': summary,
+        'folds': fold_results,
+        'model': output_path,
+    }
+    results_path = results_path or f'{os.path.splitext(output_path)[0]}.search.json'
+    if os.path.dirname(results_path):
+        os.makedirs(os.path.dirname(results_path), exist_ok=True)
+    with open(results_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, default=str)
+    results['results_path'] = results_path
+    return results
+
+
+def iter_feature_batches(paths: Iterable[str], batch_size: int = 50000, matchers=None,
+                         skip: Optional[Dict[str, int]] = None,
+                         store: Any = None) -> Iterator[Tuple[str, int, 'pd.DataFrame']]:
+    """Yield (path, batch number, features) for consecutive batches of at most `batch_size` tests.
+
+    Each report is streamed with `ra.stream_report`, so only one batch of tests is
+    held in memory at a time. `skip` maps a path to the number of its leading
+    batches to pass over without extracting features (used when resuming). With a
+    `feature_store.FeatureStore` as `store` (which then supplies the matchers) the
+    batches are slices of the report's stored, memory-mapped training columns.
+    """
+    skip = skip or {}
+    for path in paths:
+        if store is not None:
+            frame = store.load(path, columns=[c for c in store.columns if c not in ID_COLUMNS])
+            for number, start in enumerate(range(0, len(frame), batch_size)):
+                if number >= skip.get(path, 0):
+                    yield path, number, frame.iloc[start:start + batch_size]
+            continue
+        tests = iter(ra.stream_report(path))
+        number = 0
+        while True:
+            chunk = list(itertools.islice(tests, batch_size))
+            if not chunk:
+                break
+            if number >= skip.get(path, 0):
+                yield path, number, extract_feature_frame(chunk, matchers)
+            number += 1
+
+
+def _new_learner(learner: str, random_state: int) -> Any:
+    if learner == 'sgd':
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+
+        return Pipeline([('scale', StandardScaler()),
+                         ('clf', SGDClassifier(loss='log_loss', random_state=random_state))])
+    from sklearn.ensemble import RandomForestClassifier
+
+    # n_estimators grows by trees_per_batch before each warm-started fit
+    return RandomForestClassifier(n_estimators=0, warm_start=True, random_state=random_state)
+
+
+def _fit_batch(model: Any, learner: str, X: 'pd.DataFrame', y: 'pd.Series', trees_per_batch: int) -> bool:
+    """Update `model` with one batch; returns False when the batch cannot be used."""
+    if learner == 'sgd':
+        scaler = model.named_steps['scale']
+        scaler.partial_fit(X)
+        model.named_steps['clf'].partial_fit(scaler.transform(X), y, classes=list(CLASSES))
+        return True
+    # trees fitted on a single class would disagree with the others on predict_proba's shape
+    if y.nunique() < len(CLASSES):
+        return False
+    model.n_estimators += trees_per_batch
+    model.fit(X, y)
+    return True
+
+
+def _dump(obj: Any, path: str) -> None:
+    """joblib.dump to `path` atomically, so an interrupted run never leaves a truncated file."""
+    import joblib
+
+    out_dir = os.path.dirname(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    tmp = f'{path}.tmp'
+    joblib.dump(obj, tmp)
+    os.replace(tmp, path)
+
+
+def train_incremental(paths: Iterable[str], output_path: str, learner: str = 'sgd', batch_size: int = 50000,
+                      trees_per_batch: int = 10, checkpoint_path: Optional[str] = None, checkpoint_every: int = 1,
+                      resume: bool = False, random_state: int = 42, matchers=None, store: Any = None) -> Dict[str, Any]:
+    """Train on many reports batch by batch, with memory bounded by `batch_size` tests.
+
+    `learner` is 'sgd' (scaled logistic-loss SGDClassifier, updated with
+    partial_fit) or 'forest' (RandomForestClassifier warm-started with
+    `trees_per_batch` new trees per batch; single-class batches are skipped).
+    Each batch is scored before the model learns from it, giving a progressive
+    validation accuracy without a held-out set. Every `checkpoint_every` batches
+    and after each report the model and progress are written to
+    `checkpoint_path` (default: `output_path` + '.ckpt'); with `resume`, reports
+    already trained on (by content hash) and the finished batches of the current
+    one are skipped. With a `feature_store.FeatureStore` as `store`, features are
+    read from it instead of being extracted. Returns a summary dict; the final
+    model goes to `output_path`.
+    """
+    import joblib
+
+    if learner not in LEARNERS:
+        raise ValueError(f'Unknown learner {learner!r}; expected one of {LEARNERS}')
+    paths = list(paths)
+    checkpoint_path = checkpoint_path or f'{output_path}.ckpt'
+    digest = ra.report_digest if store is None else store.digest
+    digests = {path: digest(path) for path in paths}
+
+    state = joblib.load(checkpoint_path) if resume and os.path.exists(checkpoint_path) else None
+    if state is not None:
+        progress = state['progress']
+        if (progress['learner'], progress['batch_size']) != (learner, batch_size):
+            raise ValueError(f"Checkpoint {checkpoint_path} was written with learner={progress['learner']} "
+                             f"batch_size={progress['batch_size']}; pass the same options or drop --resume")
+        model = state['model']
+        logger.info(f"Resuming from {checkpoint_path}: {progress['batches']} batches, {progress['rows']} rows")
+    else:
+        model = _new_learner(learner, random_state)
+        progress = {'learner': learner, 'batch_size': batch_size, 'columns': None, 'done': [], 'current': None,
+                    'batches': 0, 'rows': 0, 'skipped_batches': 0, 'evaluated': 0, 'correct': 0}
+
+    done = set(progress['done'])
+    pending = [path for path in paths if digests[path] not in done]
+    current = progress['current']
+    skip = {path: current['batches'] for path in pending
+            if current and digests[path] == current['digest']}
+
+    def save_checkpoint():
+        _dump({'model': model, 'progress': progress}, checkpoint_path)
+
+    start = time.perf_counter()
+    since_checkpoint = 0
+    last_path = None
+    for path, number, features in iter_feature_batches(pending, batch_size, matchers, skip, store):
+        if path != last_path:
+            if last_path is not None:
+                progress['done'].append(digests[last_path])
+                progress['current'] = None
+                save_checkpoint()
+                since_checkpoint = 0
+            last_path = path
+        X = feature_matrix(features)
+        y = features[LABEL_COLUMN]
+        columns = list(X.columns)
+        if progress['columns'] is None:
+            progress['columns'] = columns
+        elif columns != progress['columns']:
+            raise ValueError(f'{path}: feature columns changed (matchers differ from the checkpoint)')
+
+        if progress['batches'] > 0:
+            # progressive validation: score the batch before learning from it
+            progress['evaluated'] += len(y)
+            progress['correct'] += int((model.predict(X) == y.to_numpy()).sum())
+        if _fit_batch(model, learner, X, y, trees_per_batch):
+            progress['batches'] += 1
+            progress['rows'] += len(y)
+        else:
+            progress['skipped_batches'] += 1
+        progress['current'] = {'path': path, 'digest': digests[path], 'batches': number + 1}
+        since_checkpoint += 1
+        if since_checkpoint >= checkpoint_every:
+            save_checkpoint()
+            since_checkpoint = 0
+        logger.info(f"{path} batch {number}: {len(y)} rows ({progress['rows']} total)")
+    if last_path is not None:
+        progress['done'].append(digests[last_path])
+        progress['current'] = None
+        save_checkpoint()
+
+    summary = {
+        'reports': len(paths),
+        'trained_reports': len(set(progress['done']) - done),
+        'batches': progress['batches'],
+        'rows': progress['rows'],
+        'skipped_batches': progress['skipped_batches'],
+        'progressive_accuracy': progress['correct'] / progress['evaluated'] if progress['evaluated'] else None,
+        'elapsed': time.perf_counter() - start,
+        'output': output_path,
+    }
+    if progress['batches']:
+        _dump(model, output_path)
+    return summary
+
+
 def main():
     parser = argparse.ArgumentParser(description='Train a small failure-prediction model from test reports')
-    parser.add_argument('--report', required=True, help='Path to a test report (JSON or XML)')
+    parser.add_argument('--report', help='Path to a test report (JSON or XML)')
+    parser.add_argument('--reports', nargs='+',
+                        help='Train incrementally on these report files, directories or globs instead')
     parser.add_argument('--output', default='ai/models/model.pkl', help='Path to write the trained model')
     parser.add_argument('--test-size', type=float, default=0.2)
     parser.add_argument('--random-state', type=int, default=42)
+    parser.add_argument('--stream', action='store_true', help='Read the report incrementally (bounded memory for very large reports)')
+    parser.add_argument('--feature-store', metavar='DIR',
+                        help='Read features from (and materialize them into) this ai.feature_store directory')
+    parser.add_argument('--learner', choices=LEARNERS, default='sgd', help='Incremental learner for --reports')
+    parser.add_argument('--batch-size', type=int, default=50000, help='Tests per training batch for --reports')
+    parser.add_argument('--trees-per-batch', type=int, default=10, help='Trees added per batch with --learner forest')
+    parser.add_argument('--checkpoint', help='Checkpoint path for --reports (default: OUTPUT.ckpt)')
+    parser.add_argument('--checkpoint-every', type=int, default=1, help='Batches between checkpoints')
+    parser.add_argument('--resume', action='store_true', help='Continue from the checkpoint of an interrupted run')
+    parser.add_argument('--search', action='store_true', help='Cross-validated hyperparameter search for --report')
+    parser.add_argument('--grid', type=json.loads, help='Search grid as JSON (default: estimators x depth x max_features)')
+    parser.add_argument('--cv', type=int, default=5, help='Folds for --search')
+    parser.add_argument('--scoring', choices=SCORINGS, default='f1', help='Metric ranking --search candidates')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Parallel jobs for tree building and --search (-1: all cores)')
+    parser.add_argument('--results', help='Where --search writes its JSON results (default: OUTPUT.search.json)')
     args = parser.parse_args()
 
-    print(f'Loading report: {args.report}')
-    parsed = load_parsed(args.report)
-    if parsed is None:
-        print('No report data found or failed to parse. Exiting.')
+    store = None
+    if args.feature_store:
+        from ai.feature_store import FeatureStore
+
+        store = FeatureStore(args.feature_store)
+
+    if args.reports:
+        from ai.healing.batch_analyzer import find_reports
+
+        logging.basicConfig(level=logging.INFO, format='%(message)s')
+        paths = [path for target in args.reports for path in find_reports(target)]
+        if not paths:
+            print('No reports found. Nothing to train.')
+            return
+        summary = train_incremental(paths, args.output, learner=args.learner, batch_size=args.batch_size,
+                                    trees_per_batch=args.trees_per_batch, checkpoint_path=args.checkpoint,
+                                    checkpoint_every=args.checkpoint_every, resume=args.resume,
+                                    random_state=args.random_state, store=store)
+        accuracy = summary['progressive_accuracy']
+        print(f"Model trained on {summary['rows']} tests in {summary['batches']} batches "
+              f"({summary['trained_reports']} of {summary['reports']} reports new this run, {summary['elapsed']:.1f}s)"
+              + (f', progressive accuracy {accuracy:.3f}' if accuracy is not None else ''))
+        if summary['skipped_batches']:
+            print(f"Skipped {summary['skipped_batches']} single-class batches")
+        if summary['batches']:
+            print(f'Wrote model to {args.output}')
         return
+    if not args.report:
+        parser.error('one of --report or --reports is required')
 
-    rows = extract_features(parsed)
-    if not rows:
+    print(f'Loading report: {args.report}')
+    if store is not None:
+        features = store.load(args.report, columns=[c for c in store.columns if c not in ID_COLUMNS])
+    elif args.stream:
+        features = extract_feature_frame(ra.stream_report(args.report))
+    else:
+        parsed = load_parsed(args.report)
+        if parsed is None:
+            print('No report data found or failed to parse. Exiting.')
+            return
+        features = extract_feature_frame(parsed)
+    if features.empty:
         print('No test cases found in the report. Nothing to train.')
         return
 
-    df = pd.DataFrame(rows)
-    # drop identifier columns and ensure numeric
-    df_numeric = df.copy()
-    df_numeric.fillna(0, inplace=True)
-    numeric_cols = [c for c in df_numeric.columns if c not in ('suite', 'test_title')]
-    df_numeric[numeric_cols] = df_numeric[numeric_cols].apply(pd.to_numeric, errors='coerce').fillna(0)
-
-    train(df_numeric, args.output, test_size=args.test_size, random_state=args.random_state)
+    # every feature column is already numeric with no missing values
+    if args.search:
+        try:
+            results = search(features, args.output, grid=args.grid, cv=args.cv, scoring=args.scoring,
+                             n_jobs=args.n_jobs, random_state=args.random_state, results_path=args.results)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"\nSearched {len(results['candidates'])} candidates x {results['cv']} folds "
+              f"in {results['search_time']:.1f}s")
+        print(f"{'mean ' + results['scoring']:>14} {'std':>7} {'fit s':>8} {'predict s':>10}  params")
+        for candidate in results['candidates'][:10]:
+            print(f"{candidate['mean_score']:14.4f} {candidate['std_score']:7.4f} {candidate['mean_fit_time']:8.3f} "
+                  f"{candidate['mean_predict_time']:10.4f}  {candidate['params']}")
+        print(f"\nWrote best model to {args.output} and results to {results['results_path']}")
+        return
+    train(features, args.output, test_size=args.test_size, random_state=args.random_state, n_jobs=args.n_jobs)
 
 
 if __name__ == '__main__':
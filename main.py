@@ -1,9 +1,15 @@
+import os
 import sys
-from ai.dashboard.app import st
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ai', 'dashboard', 'app.py')
 
 if __name__ == "__main__":
     try:
-        st.run()
+        # the dashboard is a Streamlit script: hand it to Streamlit's runner instead of importing it here
+        from streamlit.web import cli as stcli
+
+        sys.argv = ['streamlit', 'run', APP_PATH] + sys.argv[1:]
+        sys.exit(stcli.main())
     except Exception as e:
         print(f"Error running the application: {e}")
         sys.exit(1)
@@ -1,10 +1,22 @@
 import { defineConfig, devices } from '@playwright/test';
+import fs from 'fs';
+
+// One shard of a plan written by `python -m ai.planner`:
+// TEST_PLAN=reports/plan.json TEST_SHARD=1 TEST_PHASE=all|head|tail
+// A phase missing from the plan has no tests (run with --pass-with-no-tests); shard 1
+// selects by exclusion so tests the plan does not know about still run.
+const plan = process.env.TEST_PLAN ? JSON.parse(fs.readFileSync(process.env.TEST_PLAN, 'utf-8')) : null;
+const planShard = plan ? plan.shards[Number(process.env.TEST_SHARD || '1') - 1] : null;
+const planPhase = process.env.TEST_PHASE || 'all';
+const planExclude = planShard?.grep_invert?.[planPhase];
 
 export default defineConfig({
   testDir: './tests',
   fullyParallel: true,
   retries: 0,
   workers: 2,
+  grep: planShard && !planExclude ? new RegExp(planShard.grep[planPhase] ?? '(?!)') : undefined,
+  grepInvert: planExclude ? new RegExp(planExclude) : undefined,
   reporter: [
   ['list'],
   ['html', { outputFolder: 'reports/html', open: 'never' }],